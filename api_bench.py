@@ -0,0 +1,505 @@
+"""
+API Bench - Reproduzierbare Performance-Messungen
+
+Misst die zeitkritischen Pfade des API Testers gegen einen lokalen HTTP-Server
+im selben Prozess (Payload-Größe und Latenz über Query-Parameter steuerbar):
+Request-Durchsatz, Variablen-Ersetzung, JSON/XML-Formatierung, Response-Rendering,
+History-Suche und das Laden von Collections.
+
+    python api_bench.py                          # alle Benchmarks
+    python api_bench.py --quick --only json      # kleine Datenmengen, nur Namen mit "json"
+    python api_bench.py --save baseline.json     # Ergebnisse als Baseline speichern
+    python api_bench.py --compare baseline.json  # mit einer Baseline vergleichen
+
+Mit --compare und --fail-on-regression ist der Exit-Code 1, wenn ein Benchmark
+um mehr als --threshold (Standard 10 %) langsamer geworden ist.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+BASELINE_VERSION = 1
+
+# Registrierte Benchmarks: (Name, Beschreibung, Setup-Funktion)
+BENCHMARKS = []
+
+
+def benchmark(name, description):
+    """Registriert eine Setup-Funktion.
+
+    Die Funktion bekommt den BenchContext und gibt (run, ops) zurück: run() ist
+    der gemessene Aufruf, ops die Anzahl Operationen pro Aufruf (für ops/s).
+    """
+
+    def register(setup):
+        BENCHMARKS.append((name, description, setup))
+        return setup
+
+    return register
+
+
+# ---- Testdaten ----
+
+
+def make_json_payload(items, seed=1):
+    """Deterministischer JSON-Body mit verschachtelten Objekten"""
+    rng = random.Random(seed)
+    data = {
+        "items": [
+            {
+                "id": i,
+                "name": f"item-{i}",
+                "price": round(rng.uniform(1, 1000), 2),
+                "active": rng.random() > 0.5,
+                "tags": [f"tag{rng.randint(0, 50)}" for _ in range(3)],
+                "owner": {"id": rng.randint(1, 10000), "email": f"user{i}@example.com"},
+            }
+            for i in range(items)
+        ],
+        "total": items,
+    }
+    return json.dumps(data).encode("utf-8")
+
+
+def make_xml_payload(items, seed=1):
+    rng = random.Random(seed)
+    rows = "".join(
+        f'<item id="{i}"><name>item-{i}</name><price>{rng.uniform(1, 1000):.2f}</price>'
+        f"<tags><tag>a</tag><tag>b</tag></tags></item>"
+        for i in range(items)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><items total="{items}">{rows}</items>'.encode("utf-8")
+
+
+def payload_for_size(kind, size):
+    # Ungefähr size Bytes (ein JSON-Item sind ca. 190 Bytes, ein XML-Item ca. 120)
+    if kind == "xml":
+        return make_xml_payload(max(1, size // 120))
+    return make_json_payload(max(1, size // 190))
+
+
+# ---- Lokaler Server ----
+
+
+class _BenchHandler(BaseHTTPRequestHandler):
+    """GET/POST /payload?kind=json|xml&size=BYTES&delay=MS&status=CODE"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        query = {key: values[-1] for key, values in parse_qs(urlsplit(self.path).query).items()}
+        kind = query.get("kind", "json")
+        size = int(query.get("size", 1024))
+        delay = float(query.get("delay", 0)) / 1000
+        status = int(query.get("status", 200))
+
+        body = self.server.payload(kind, size)
+        if delay:
+            time.sleep(delay)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/xml" if kind == "xml" else "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        # Request-Body verwerfen, Antwort wie bei GET
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BenchServer(ThreadingHTTPServer):
+    """HTTP-Server im Hintergrund-Thread, Payloads werden je (Art, Größe) einmal erzeugt"""
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), _BenchHandler)
+        self._payloads = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def payload(self, kind, size):
+        with self._lock:
+            key = (kind, size)
+            if key not in self._payloads:
+                self._payloads[key] = payload_for_size(kind, size)
+            return self._payloads[key]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="bench-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class BenchContext:
+    """Gemeinsame Ressourcen der Benchmarks: Server, Temp-Verzeichnis, Aufräumaktionen"""
+
+    def __init__(self, server, quick=False):
+        self.server = server
+        self.base_url = server.base_url
+        self.quick = quick
+        self.directory = tempfile.mkdtemp(prefix="api_bench_")
+        self._cleanups = []
+
+    def scale(self, full, quick):
+        return quick if self.quick else full
+
+    def on_cleanup(self, function):
+        self._cleanups.append(function)
+
+    def cleanup(self):
+        while self._cleanups:
+            self._cleanups.pop()()
+
+    def close(self):
+        self.cleanup()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _response(content, content_type):
+    from api_engine import ApiResponse
+
+    return ApiResponse.from_content("GET", "http://bench/", 200, "OK", {"Content-Type": content_type}, content, 0.0)
+
+
+# ---- Benchmarks ----
+
+
+def _throughput(ctx, count, size, delay, concurrency):
+    from api_engine import AsyncEngine, SessionManager
+
+    engine = AsyncEngine(concurrency=concurrency, session_manager=SessionManager(concurrency))
+    ctx.on_cleanup(engine.close)
+    specs = [{"method": "GET", "url": f"{ctx.base_url}/payload?size={size}&delay={delay}"}] * count
+
+    def run():
+        for result in asyncio.run(engine.run_many(specs)):
+            if isinstance(result, Exception):
+                raise result
+            result.close()
+
+    return run, count
+
+
+@benchmark("request_throughput_1kb", "GET mit 1 KB Body, 20 parallel, ohne Latenz")
+def bench_request_throughput(ctx):
+    return _throughput(ctx, ctx.scale(2000, 200), 1024, 0, 20)
+
+
+@benchmark("request_throughput_latency_20ms", "GET mit 20 ms Server-Latenz, 50 parallel")
+def bench_request_latency(ctx):
+    return _throughput(ctx, ctx.scale(1000, 100), 1024, 20, 50)
+
+
+@benchmark("request_download_5mb", "Downloads von je 5 MB nacheinander (Streaming in Spool-Datei)")
+def bench_request_download(ctx):
+    return _throughput(ctx, ctx.scale(5, 2), 5 * 1024 * 1024, 0, 1)
+
+
+@benchmark("template_render", "Variablen-Ersetzung in einem Request mit 50 Variablen")
+def bench_template_render(ctx):
+    from api_engine import prepare_request
+
+    env_vars = {f"var{i}": f"value-{i}" for i in range(200)}
+    spec = {
+        "method": "POST",
+        "url": "https://{{var1}}.example.com/{{var2}}/items?x={{var3}}",
+        "headers": {f"X-Header-{i}": f"{{{{var{i}}}}}" for i in range(20)},
+        "params": {f"p{i}": f"{{{{var{i + 20}}}}}" for i in range(20)},
+        "body": json.dumps({**{f"field{i}": f"{{{{var{i + 40}}}}}" for i in range(10)}, "pad": "x" * 20000}),
+        "body_type": "json",
+    }
+    count = ctx.scale(2000, 200)
+
+    def run():
+        for _ in range(count):
+            prepare_request(spec, env_vars)
+
+    return run, count
+
+
+@benchmark("format_json_pretty", "Streaming-Formatierung eines JSON-Bodys (ca. 10 MB)")
+def bench_format_json(ctx):
+    from api_formatters import iter_pretty_json
+
+    body = payload_for_size("json", ctx.scale(10, 1) * 1024 * 1024)
+    chunks = [body[i : i + 65536] for i in range(0, len(body), 65536)]
+
+    def run():
+        for _ in iter_pretty_json(chunks):
+            pass
+
+    return run, len(body)
+
+
+@benchmark("format_xml_pretty", "Streaming-Formatierung eines XML-Bodys (ca. 10 MB)")
+def bench_format_xml(ctx):
+    from api_formatters import iter_pretty_xml
+
+    body = payload_for_size("xml", ctx.scale(10, 1) * 1024 * 1024)
+    chunks = [body[i : i + 65536] for i in range(0, len(body), 65536)]
+
+    def run():
+        for _ in iter_pretty_xml(chunks):
+            pass
+
+    return run, len(body)
+
+
+@benchmark("render_response_small", "Rendering-Pfad der GUI für 200 kleine JSON-Responses (Pretty, Tests)")
+def bench_render_small(ctx):
+    from api_runner import run_checks
+    from api_tester import APITester
+
+    body = payload_for_size("json", 20 * 1024)
+    count = ctx.scale(200, 20)
+
+    def run():
+        for _ in range(count):
+            response = _response(body, "application/json")
+            for _ in APITester._render_body(response, "pretty", 1024 * 1024, 100000):
+                pass
+            run_checks(response, 0.1, max_json_size=1024 * 1024)
+            response.close()
+
+    return run, count
+
+
+@benchmark("render_response_large", "Rendering-Pfad der GUI für eine große JSON-Response (Streaming, Zeilenlimit)")
+def bench_render_large(ctx):
+    from api_tester import APITester
+
+    body = payload_for_size("json", ctx.scale(50, 5) * 1024 * 1024)
+    response = _response(body, "application/json")
+    ctx.on_cleanup(response.close)
+
+    def run():
+        for _ in APITester._render_body(response, "pretty", 1024 * 1024, 100000):
+            pass
+
+    return run, 1
+
+
+@benchmark("history_search", "Suche in der History (100.000 Einträge, 6 Suchbegriffe)")
+def bench_history_search(ctx):
+    from api_history import HistoryStore
+
+    entries = ctx.scale(100000, 10000)
+    path = os.path.join(ctx.directory, "history.db")
+    store = HistoryStore(path, max_entries=0, max_days=0)
+    ctx.on_cleanup(store.close)
+    rng = random.Random(1)
+    methods = ["GET", "POST", "PUT", "DELETE"]
+    for i in range(entries):
+        store.add(
+            {
+                "method": rng.choice(methods),
+                "url": f"https://api{rng.randint(1, 20)}.example.com/v1/users/{rng.randint(1, 5000)}/orders",
+                "status": rng.choice([200, 201, 404, 500]),
+                "time": rng.random(),
+                "request": {"body": f'{{"customer": "cust{i}"}}'},
+            }
+        )
+    store.flush()
+    queries = ["users", "api7", "POST 500", "orders/12", "cust4711", "xyz"]
+
+    def run():
+        for query in queries:
+            store.ids(query)
+
+    return run, len(queries)
+
+
+@benchmark("collection_load", "Laden einer Konfiguration mit 400 Requests inkl. Abhängigkeitsanalyse")
+def bench_collection_load(ctx):
+    from api_config import load_config
+    from api_runner import collect_run_items
+
+    requests = [
+        {
+            "name": f"Request {i}",
+            "type": "request",
+            "data": {
+                "method": "GET",
+                "url": f"{{{{base_url}}}}/items/{i}?token={{{{token{i % 10}}}}}",
+                "headers": {"Accept": "application/json"},
+                "extract": {f"token{i % 10}": "$.token"} if i % 40 == 0 else {},
+            },
+        }
+        for i in range(400)
+    ]
+    folders = [
+        {"name": f"Folder {f}", "type": "folder", "sequential": f % 2 == 0, "items": requests[f * 40 : (f + 1) * 40]}
+        for f in range(10)
+    ]
+    path = os.path.join(ctx.directory, "config.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"collections": [{"name": "Suite", "type": "collection", "items": folders}]}, f)
+    count = ctx.scale(50, 5)
+
+    def run():
+        for _ in range(count):
+            config = load_config(path)
+            collect_run_items(config["collections"][0])
+
+    return run, count
+
+
+# ---- Ausführung und Vergleich ----
+
+
+def measure(run, repeat, warmup=1):
+    """Führt run() aus und gibt die Laufzeiten in Sekunden zurück"""
+    for _ in range(warmup):
+        run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_benchmarks(selected=None, quick=False, repeat=5, log=print):
+    """Führt die (ausgewählten) Benchmarks aus und gibt die Ergebnisse als Dict zurück"""
+    server = BenchServer().start()
+    ctx = BenchContext(server, quick=quick)
+    results = {}
+    try:
+        for name, description, setup in BENCHMARKS:
+            if selected and not any(part in name for part in selected):
+                continue
+            try:
+                run, ops = setup(ctx)
+                times = measure(run, repeat)
+            except ImportError as e:
+                log(f"{name:<34} übersprungen ({e})")
+                continue
+            finally:
+                ctx.cleanup()
+            median = statistics.median(times)
+            results[name] = {
+                "description": description,
+                "median": median,
+                "min": min(times),
+                "max": max(times),
+                "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+                "repeat": repeat,
+                "ops": ops,
+                "ops_per_sec": ops / median if median else None,
+            }
+            log(f"{name:<34} {median * 1000:10.1f} ms  {ops / median:14,.0f} ops/s")
+    finally:
+        ctx.close()
+        server.stop()
+    return results
+
+
+def make_baseline(results, quick):
+    return {
+        "version": BASELINE_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "quick": quick,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(results, baseline):
+    """Vergleicht Ergebnisse mit einer Baseline.
+
+    Gibt eine Liste (name, baseline_median, median, änderung) zurück, änderung
+    ist relativ (0.25 = 25 % langsamer), None wenn der Benchmark neu ist.
+    """
+    rows = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            rows.append((name, None, result["median"], None))
+        else:
+            rows.append((name, previous["median"], result["median"], result["median"] / previous["median"] - 1))
+    return rows
+
+
+def print_comparison(rows, threshold, log=print):
+    log("")
+    log(f"{'Benchmark':<34} {'Baseline':>10} {'Aktuell':>10} {'Änderung':>10}")
+    for name, before, after, change in rows:
+        if change is None:
+            log(f"{name:<34} {'-':>10} {after * 1000:8.1f}ms {'neu':>10}")
+            continue
+        marker = "  LANGSAMER" if change > threshold else ("  schneller" if change < -threshold else "")
+        log(f"{name:<34} {before * 1000:8.1f}ms {after * 1000:8.1f}ms {change * 100:+9.1f}%{marker}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="api_bench", description="Performance-Benchmarks des API Testers")
+    parser.add_argument("--only", action="append", metavar="TEIL", help="Nur Benchmarks, deren Name TEIL enthält")
+    parser.add_argument("--quick", action="store_true", help="Kleine Datenmengen (schneller, ungenauer)")
+    parser.add_argument("--repeat", type=int, default=5, help="Messungen pro Benchmark (Standard: %(default)s)")
+    parser.add_argument("--save", metavar="DATEI", help="Ergebnisse als Baseline (JSON) speichern")
+    parser.add_argument("--compare", metavar="DATEI", help="Mit einer gespeicherten Baseline vergleichen")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Schwelle für Regressionen (Standard: 0.10)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit-Code 1 bei Regressionen")
+    parser.add_argument("--list", action="store_true", help="Benchmarks auflisten")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.list:
+        for name, description, _ in BENCHMARKS:
+            print(f"{name:<34} {description}")
+        return 0
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("quick") != args.quick:
+            print("Warnung: Baseline und Lauf verwenden unterschiedliche Datenmengen (--quick)", file=sys.stderr)
+
+    results = run_benchmarks(args.only, args.quick, max(1, args.repeat))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(make_baseline(results, args.quick), f, indent=2, ensure_ascii=False)
+
+    if baseline is not None:
+        rows = compare(results, baseline)
+        print_comparison(rows, args.threshold)
+        regressions = [row for row in rows if row[3] is not None and row[3] > args.threshold]
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+"""
+API Cache - Privater HTTP-Cache für GET-Responses nach RFC 9111
+
+Die Engine fragt den Cache vor jedem GET: frische Einträge werden ohne Netz
+beantwortet, veraltete mit If-None-Match/If-Modified-Since revalidiert; bei
+304 Not Modified kommt der Body aus dem Cache. Beachtet werden Cache-Control
+(max-age, no-cache, no-store, must-revalidate), Expires, Age, Vary und die
+heuristische Frische über Last-Modified. Erfolgreiche POST/PUT/PATCH/DELETE
+auf eine URL verwerfen deren Eintrag. Ein Eintrag gilt nur für dieselben
+Zugangsdaten (Authorization, Cookie, API-Key-Header, Basic Auth): mit anderen
+oder ohne Zugangsdaten wird neu angefragt.
+
+Zwei Stufen mit LRU-Verdrängung: kleine Bodies zusätzlich im Speicher, alle
+Bodies mit Metadaten als Dateien im Cache-Verzeichnis (Größenbudget):
+
+    engine.cache = ResponseCache("api_tester_cache", disk_budget=200 * 1024 * 1024)
+    response = engine.send_sync({"url": "https://api.example.com/items"})
+    response.cache_status   # "hit", "revalidated", "miss" oder None (nicht cachebar)
+"""
+
+import email.utils
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+from requests.structures import CaseInsensitiveDict
+
+from api_engine import TIMING_PHASES, ApiResponse
+from api_redact import SENSITIVE_HEADERS
+
+
+# Status-Codes, die ohne explizite Freigabe heuristisch gecacht werden dürfen (RFC 9110, 15.1)
+HEURISTIC_STATUS = {200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501}
+# Heuristische Frische: 10 % des Alters seit Last-Modified, höchstens ein Tag
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX = 24 * 3600
+
+# Werden nicht gespeichert: Verbindung und Übertragung betreffen nur die ursprüngliche Antwort
+HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "transfer-encoding",
+    "content-encoding",
+    "content-length",
+    "set-cookie",
+    "proxy-authenticate",
+    "trailer",
+    "upgrade",
+}
+# Header, die eine 304-Antwort nicht überschreiben darf
+PROTECTED_HEADERS = {"content-type", "content-range"}
+
+
+def parse_cache_control(value):
+    """Cache-Control als Dict ("max-age=60, no-cache" -> {"max-age": "60", "no-cache": None})"""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def _seconds(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _http_date(value):
+    # Ungültige Datumsangaben zählen wie fehlende (Expires: 0 bedeutet bereits abgelaufen)
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def cache_key(url):
+    parts = urlsplit(url)
+    normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def freshness_lifetime(entry):
+    """Wie lange ein Eintrag ab seiner Erzeugung frisch ist (Sekunden)"""
+    headers = CaseInsensitiveDict(entry["headers"])
+    directives = parse_cache_control(headers.get("Cache-Control"))
+    max_age = _seconds(directives.get("max-age"))
+    if max_age is not None:
+        return max_age
+    if "Expires" in headers:
+        expires = _http_date(headers["Expires"])
+        date = _http_date(headers.get("Date")) or entry["response_time"]
+        return max(0, expires - date) if expires is not None else 0
+    last_modified = _http_date(headers.get("Last-Modified"))
+    if last_modified is not None and entry["status"] in HEURISTIC_STATUS:
+        date = _http_date(headers.get("Date")) or entry["response_time"]
+        return min(HEURISTIC_MAX, max(0, (date - last_modified) * HEURISTIC_FRACTION))
+    return 0
+
+
+def current_age(entry, now=None):
+    now = time.time() if now is None else now
+    age = _seconds(CaseInsensitiveDict(entry["headers"]).get("Age"))
+    return (age or 0) + max(0, now - entry["response_time"])
+
+
+class ResponseCache:
+    """Privater Cache mit Speicher- und Plattenstufe, thread-sicher für Engine-Worker"""
+
+    MEMORY_ITEM_LIMIT = 256 * 1024  # größere Bodies liegen nur auf der Platte
+
+    def __init__(self, directory, disk_budget=200 * 1024 * 1024, memory_budget=16 * 1024 * 1024):
+        self.directory = directory
+        self.disk_budget = disk_budget
+        self.memory_budget = memory_budget
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.bytes_saved = 0
+        self._memory = OrderedDict()  # key -> Body (bytes)
+        self._memory_size = 0
+        self._entries = OrderedDict()  # key -> Metadaten, älteste Nutzung zuerst
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            key = name[:-5]
+            try:
+                with open(self._path(key, ".json"), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                used = os.path.getmtime(self._path(key, ".body"))
+            except (OSError, ValueError):
+                self._remove_files(key)
+                continue
+            entries.append((used, key, entry))
+        for _, key, entry in sorted(entries, key=lambda item: item[0]):
+            self._entries[key] = entry
+            self._disk_size += entry["size"]
+        self._evict()
+
+    # --- Anfragen -------------------------------------------------------------
+
+    def lookup(self, method, url, headers, credentials=""):
+        """Passender Eintrag für einen Request oder None.
+
+        credentials ist credentials() des Requests; Einträge anderer
+        Zugangsdaten werden nicht verwendet.
+        """
+        if method != "GET":
+            return None
+        if "no-store" in parse_cache_control(CaseInsensitiveDict(headers).get("Cache-Control")):
+            return None
+        key = cache_key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.get("credentials") != credentials:
+                return None
+            # Vary: alle genannten Request-Header müssen übereinstimmen
+            lower = {name.lower(): str(value) for name, value in headers.items()}
+            if any(lower.get(name) != value for name, value in entry["vary"].items()):
+                return None
+            self._entries.move_to_end(key)
+        return entry
+
+    def is_fresh(self, entry, headers):
+        """Darf der Eintrag ohne Rückfrage beim Server verwendet werden?"""
+        headers = CaseInsensitiveDict(headers)
+        request_directives = parse_cache_control(headers.get("Cache-Control"))
+        if "no-cache" in request_directives or headers.get("Pragma", "").lower() == "no-cache":
+            return False
+        if "no-cache" in parse_cache_control(CaseInsensitiveDict(entry["headers"]).get("Cache-Control")):
+            return False
+        lifetime = freshness_lifetime(entry)
+        request_max_age = _seconds(request_directives.get("max-age"))
+        if request_max_age is not None:
+            lifetime = min(lifetime, request_max_age)
+        return current_age(entry) < lifetime
+
+    @staticmethod
+    def credentials(kwargs):
+        """Hash der Zugangsdaten eines Requests (Argumente von prepare_request()), "" ohne Zugangsdaten"""
+        names = kwargs.get("redact", SENSITIVE_HEADERS)
+        secrets = sorted(
+            (name.lower(), str(value)) for name, value in kwargs.get("headers", {}).items() if name.lower() in names
+        )
+        if kwargs.get("auth"):
+            secrets.append(("auth", repr(kwargs["auth"])))
+        if not secrets:
+            return ""
+        return hashlib.sha256(json.dumps(secrets).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def conditional_headers(entry, headers):
+        """Request-Header um die Validatoren des Eintrags ergänzt (oder None ohne Validatoren)"""
+        stored = CaseInsensitiveDict(entry["headers"])
+        validators = {}
+        if stored.get("ETag"):
+            validators["If-None-Match"] = stored["ETag"]
+        if stored.get("Last-Modified"):
+            validators["If-Modified-Since"] = stored["Last-Modified"]
+        if not validators:
+            return None
+        return {**headers, **validators}
+
+    def respond(self, entry, method, cache_status, elapsed=0.0, timings=None, connection_reused=False):
+        """ApiResponse aus einem Eintrag; der Body kommt aus dem Speicher oder der Datei"""
+        key = entry["key"]
+        with self._lock:
+            content = self._memory.get(key)
+            if content is not None:
+                self._memory.move_to_end(key)
+        if content is not None:
+            body = io.BytesIO(content)
+        else:
+            body = open(self._path(key, ".body"), "rb")
+            try:
+                os.utime(self._path(key, ".body"))
+            except OSError:
+                pass
+
+        response = ApiResponse(
+            method=method,
+            url=entry["url"],
+            status_code=entry["status"],
+            reason=entry["reason"],
+            headers=CaseInsensitiveDict(entry["headers"]),
+            body=body,
+            size=entry["size"],
+            elapsed=elapsed,
+            encoding=entry["encoding"],
+            connection_reused=connection_reused,
+            timings=timings if timings is not None else dict.fromkeys(TIMING_PHASES, 0.0),
+            wire_size=0,
+        )
+        response.cache_status = cache_status
+        response.bytes_saved = entry["size"]
+        with self._lock:
+            self.bytes_saved += entry["size"]
+            if cache_status == "hit":
+                self.hits += 1
+            else:
+                self.revalidated += 1
+        return response
+
+    # --- Speichern ------------------------------------------------------------
+
+    def store(self, method, url, headers, response, credentials=""):
+        """Nimmt eine Response aus dem Netz auf, sofern sie cachebar ist (setzt cache_status)"""
+        if method in ("POST", "PUT", "PATCH", "DELETE") and response.status_code < 400:
+            # RFC 9111, 4.4: erfolgreiche unsichere Methoden machen den Eintrag ungültig
+            self.invalidate(url)
+            return
+        if not self._cacheable(method, headers, response):
+            return
+
+        vary = {}
+        for name in response.headers.get("Vary", "").split(","):
+            name = name.strip().lower()
+            if name:
+                vary[name] = next((str(v) for k, v in headers.items() if k.lower() == name), None)
+
+        key = cache_key(url)
+        entry = {
+            "key": key,
+            "url": response.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in HOP_HEADERS},
+            "encoding": response.encoding,
+            "size": response.size,
+            "vary": vary,
+            "credentials": credentials,
+            "response_time": time.time() - response.elapsed,
+        }
+
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_bytes():
+                    f.write(chunk)
+            os.replace(temp_path, self._path(key, ".body"))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        with self._lock:
+            self._write_meta(entry)
+            self._drop_memory(key)
+            if response.size <= self.MEMORY_ITEM_LIMIT:
+                self._memory[key] = response.content
+                self._memory_size += response.size
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._disk_size -= old["size"]
+            self._entries[key] = entry
+            self._disk_size += entry["size"]
+            self.misses += 1
+            self._evict()
+        response.cache_status = "miss"
+
+    def revalidate(self, entry, not_modified_headers):
+        """Übernimmt die Header einer 304-Antwort und macht den Eintrag wieder frisch"""
+        headers = dict(entry["headers"])
+        for name, value in not_modified_headers.items():
+            if name.lower() not in HOP_HEADERS and name.lower() not in PROTECTED_HEADERS:
+                existing = next((k for k in headers if k.lower() == name.lower()), name)
+                headers[existing] = value
+        entry = {**entry, "headers": headers, "response_time": time.time()}
+        with self._lock:
+            if entry["key"] in self._entries:
+                self._entries[entry["key"]] = entry
+                self._write_meta(entry)
+        return entry
+
+    def _cacheable(self, method, headers, response):
+        if method != "GET" or response.replayed:
+            return False
+        if "no-store" in parse_cache_control(CaseInsensitiveDict(headers).get("Cache-Control")):
+            return False
+        directives = parse_cache_control(response.headers.get("Cache-Control"))
+        if "no-store" in directives or response.headers.get("Vary", "").strip() == "*":
+            return False
+        if self.disk_budget and response.size > self.disk_budget:
+            return False
+        explicit = "max-age" in directives or "Expires" in response.headers or "public" in directives
+        validators = "ETag" in response.headers or "Last-Modified" in response.headers
+        return explicit or (response.status_code in HEURISTIC_STATUS and validators)
+
+    def _write_meta(self, entry):
+        with open(self._path(entry["key"], ".json"), "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+
+    # --- Verwaltung -----------------------------------------------------------
+
+    def _drop_memory(self, key):
+        content = self._memory.pop(key, None)
+        if content is not None:
+            self._memory_size -= len(content)
+
+    def _remove_files(self, key):
+        for suffix in (".json", ".body"):
+            try:
+                os.remove(self._path(key, suffix))
+            except OSError:
+                # Fehlt schon oder ist (unter Windows) gerade zum Lesen geöffnet
+                pass
+
+    def _evict(self):
+        # Aufrufer hält den Lock
+        while self._memory_size > self.memory_budget and self._memory:
+            _, content = self._memory.popitem(last=False)
+            self._memory_size -= len(content)
+        while self.disk_budget and self._disk_size > self.disk_budget and self._entries:
+            key, entry = self._entries.popitem(last=False)
+            self._disk_size -= entry["size"]
+            self._drop_memory(key)
+            self._remove_files(key)
+
+    def invalidate(self, url):
+        key = cache_key(url)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._disk_size -= entry["size"]
+                self._drop_memory(key)
+                self._remove_files(key)
+
+    def configure(self, disk_budget=None):
+        with self._lock:
+            if disk_budget is not None:
+                self.disk_budget = disk_budget
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._remove_files(key)
+            self._entries.clear()
+            self._memory.clear()
+            self._memory_size = self._disk_size = 0
+
+    @property
+    def size(self):
+        return self._disk_size
+
+    def __len__(self):
+        return len(self._entries)
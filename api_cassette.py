@@ -0,0 +1,251 @@
+"""
+API Cassette - Aufnahme und Wiedergabe von Request/Response-Paaren
+
+Eine Cassette ist eine gzip-komprimierte JSON-Datei mit allen aufgenommenen
+Interaktionen. Die Engine spielt passende Responses daraus ab, statt das Netz zu
+benutzen; Status, Headers, Body und auch die aufgenommenen Zeiten bleiben dabei
+gleich, sodass Checks und Rendering reproduzierbar laufen:
+
+    from api_cassette import Cassette
+
+    engine.cassette = Cassette("suite.cassette", mode="record")
+    ...                         # Requests wie gewohnt senden
+    engine.cassette.save()
+
+    engine.cassette = Cassette("suite.cassette", mode="replay", match_on=("method", "url", "body"))
+
+Modi:
+    record  jeder Request geht ins Netz und wird aufgenommen (bestehende Datei wird ersetzt)
+    replay  nur Wiedergabe; ein Request ohne Aufnahme löst CassetteMiss aus
+    auto    Wiedergabe, wenn vorhanden, sonst Netz und Aufnahme
+
+Gleiche Requests werden in der aufgenommenen Reihenfolge abgespielt, danach
+wiederholt sich die letzte Aufnahme. Zugangsdaten werden nicht gespeichert:
+Werte sensibler Header (Authorization, Cookie, Set-Cookie, ...), Cookie-Werte
+und ein API-Key (als Header oder Query-Parameter) erscheinen als "***".
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from requests.structures import CaseInsensitiveDict
+
+from api_engine import ApiResponse, TIMING_PHASES, UploadBody
+from api_redact import REDACTED_VALUE, SENSITIVE_HEADERS, redact_headers, redact_url
+
+
+CASSETTE_VERSION = 1
+MODES = ("record", "replay", "auto")
+MATCH_FIELDS = ("method", "url", "body", "headers")
+DEFAULT_MATCH_ON = ("method", "url")
+
+# Der Body wird dekodiert gespeichert, Angaben zur Übertragung passen dazu nicht mehr
+TRANSFER_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+# Größere Response-Bodies werden nicht aufgenommen
+MAX_BODY_SIZE = 10 * 1024 * 1024
+
+
+class CassetteMiss(LookupError):
+    """Im Replay-Modus wurde keine passende Aufnahme gefunden"""
+
+
+def _encode_body(content):
+    try:
+        return {"body": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(data):
+    if "body_base64" in data:
+        return base64.b64decode(data["body_base64"])
+    return data.get("body", "").encode("utf-8")
+
+
+def request_body(kwargs):
+    """Request-Body aus den Argumenten von prepare_request() als bytes (JSON kanonisch sortiert)"""
+    if kwargs.get("json") is not None:
+        return json.dumps(kwargs["json"], sort_keys=True, separators=(",", ":")).encode("utf-8")
+    data = kwargs.get("data")
+    if data is None:
+        return b""
+    if isinstance(data, dict):
+        return urlencode(sorted(data.items())).encode("utf-8")
+    if isinstance(data, UploadBody):
+        # Dateiinhalte werden weder gelesen noch gespeichert
+        return data.fingerprint()
+    return data.encode("utf-8") if isinstance(data, str) else bytes(data)
+
+
+def normalize_url(url):
+    # Reihenfolge der Query-Parameter spielt beim Vergleich keine Rolle
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+class Cassette:
+    """Aufgenommene Interaktionen einer Datei, thread-sicher für Engine-Worker"""
+
+    def __init__(self, path, mode="auto", match_on=DEFAULT_MATCH_ON, max_body_size=MAX_BODY_SIZE):
+        if mode not in MODES:
+            raise ValueError(f"Unbekannter Cassette-Modus: {mode}")
+        unknown = set(match_on) - set(MATCH_FIELDS)
+        if unknown:
+            raise ValueError(f"Unbekannte Vergleichsfelder: {', '.join(sorted(unknown))}")
+        self.path = path
+        self.mode = mode
+        self.match_on = tuple(match_on)
+        self.max_body_size = max_body_size
+        self.interactions = []
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.dirty = False
+        self._index = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+        if mode != "record":
+            if os.path.exists(path):
+                self._load()
+            elif mode == "replay":
+                raise FileNotFoundError(f"Cassette nicht gefunden: {path}")
+
+    @property
+    def recording(self):
+        return self.mode != "replay"
+
+    @property
+    def playing(self):
+        return self.mode != "record"
+
+    def match_key(self, method, url, headers, body, redact=SENSITIVE_HEADERS):
+        """Vergleichsschlüssel aus den Feldern in match_on (geheime Werte zählen nicht)"""
+        key = []
+        for field in self.match_on:
+            if field == "method":
+                key.append(method.upper())
+            elif field == "url":
+                key.append(normalize_url(redact_url(url, redact)))
+            elif field == "body":
+                key.append(hashlib.sha256(body).hexdigest())
+            else:
+                headers = redact_headers(headers, redact)
+                key.append(tuple(sorted((name.lower(), value) for name, value in headers.items())))
+        return tuple(key)
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Nicht unterstützte Cassette-Version: {data.get('version')}")
+        for interaction in data.get("interactions", []):
+            self._add(interaction)
+
+    def _add(self, interaction):
+        request = interaction["request"]
+        key = self.match_key(request["method"], request["url"], request.get("headers", {}), _decode_body(request))
+        self._index.setdefault(key, []).append(len(self.interactions))
+        self.interactions.append(interaction)
+
+    def play(self, method, url, kwargs):
+        """Aufgenommene Response als ApiResponse oder None (im Replay-Modus CassetteMiss)"""
+        if not self.playing:
+            return None
+        redact = kwargs.get("redact", SENSITIVE_HEADERS)
+        key = self.match_key(method, url, kwargs.get("headers", {}), request_body(kwargs), redact)
+        with self._lock:
+            positions = self._index.get(key)
+            if not positions:
+                self.misses += 1
+                if self.mode == "replay":
+                    raise CassetteMiss(f"Keine Aufnahme für {method} {url} in {os.path.basename(self.path)}")
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = min(cursor + 1, len(positions) - 1)
+            self.hits += 1
+            interaction = self.interactions[positions[cursor]]
+
+        data = interaction["response"]
+        content = _decode_body(data)
+        return ApiResponse.from_content(
+            method.upper(),
+            data.get("url", url),
+            data["status"],
+            data.get("reason", ""),
+            CaseInsensitiveDict(data.get("headers", {})),
+            content,
+            data.get("elapsed", 0.0),
+            encoding=data.get("encoding"),
+            cookies=data.get("cookies", {}),
+            timings={**dict.fromkeys(TIMING_PHASES, 0.0), **data.get("timings", {})},
+            replayed=True,
+            http_version=data.get("http_version", "HTTP/1.1"),
+        )
+
+    def record(self, method, url, kwargs, response):
+        """Nimmt eine Interaktion auf (liest den Body der Response erneut aus der Ablage)"""
+        if not self.recording:
+            return
+        if response.size > self.max_body_size:
+            with self._lock:
+                self.skipped += 1
+            return
+        redact = kwargs.get("redact", SENSITIVE_HEADERS)
+        response_headers = {
+            key: value for key, value in response.headers.items() if key.lower() not in TRANSFER_HEADERS
+        }
+        interaction = {
+            "request": {
+                "method": method.upper(),
+                "url": redact_url(url, redact),
+                "headers": redact_headers(kwargs.get("headers", {}), redact),
+                **_encode_body(request_body(kwargs)),
+            },
+            "response": {
+                "url": redact_url(response.url, redact),
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": redact_headers(response_headers, redact),
+                "encoding": response.encoding,
+                "cookies": dict.fromkeys(response.cookies, REDACTED_VALUE),
+                "elapsed": response.elapsed,
+                "timings": response.timings,
+                "http_version": response.http_version,
+                **_encode_body(response.content),
+            },
+        }
+        with self._lock:
+            self._add(interaction)
+            self.dirty = True
+
+    def save(self):
+        """Schreibt die Cassette atomar (temporäre Datei, dann umbenennen)"""
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "interactions": list(self.interactions)}
+            self.dirty = False
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def summary(self):
+        parts = [f"{len(self.interactions)} Aufnahmen"]
+        if self.playing:
+            parts.append(f"{self.hits} abgespielt, {self.misses} ohne Treffer")
+        if self.skipped:
+            parts.append(f"{self.skipped} zu groß zum Aufnehmen")
+        return ", ".join(parts)
@@ -0,0 +1,271 @@
+"""
+API CLI - Führt gespeicherte Requests und Collections ohne GUI aus
+
+Lädt Environment und Collections aus api_tester_config.json (oder einer anderen
+Konfiguration) und führt sie über den Collection Runner parallel aus. Importiert
+weder tkinter noch ttkbootstrap und läuft daher auch in CI und auf Servern:
+
+    python api_cli.py --list
+    python api_cli.py "My API" "Other API/Smoke" --env base_url=http://localhost:8000
+    python api_cli.py exported_request.json --junit-report report.xml
+    python api_cli.py "My API" --record suite.cassette      # aufnehmen ...
+    python api_cli.py "My API" --replay suite.cassette      # ... und ohne Netz wiederholen
+    python api_cli.py "My API" --http2 --concurrency 100    # HTTP/2, ein Connection pro Host
+
+Exit-Code 0 wenn alle Checks bestanden sind, 1 bei fehlgeschlagenen Requests oder
+Checks, 2 bei Aufruf- oder Konfigurationsfehlern.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from xml.etree import ElementTree
+
+from api_cassette import DEFAULT_MATCH_ON, Cassette
+from api_config import CONFIG_FILE, find_node, iter_paths, load_config
+from api_engine import HTTP2_AVAILABLE, HTTP2_MISSING, AsyncEngine, SessionManager
+from api_runner import CollectionRunner
+
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="api_cli", description="Führt API-Tester-Collections ohne GUI aus")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help="Pfad einer Collection, eines Ordners oder Requests (z.B. 'My API/Users') oder eine JSON-Datei; "
+        "ohne Angabe alle Collections",
+    )
+    parser.add_argument("--config", default=CONFIG_FILE, help="Konfigurationsdatei (Standard: %(default)s)")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=WERT", help="Variable setzen/überschreiben")
+    parser.add_argument("--env-file", help="JSON-Datei mit zusätzlichen Variablen")
+    parser.add_argument("--concurrency", type=int, default=10, help="Parallele Requests (Standard: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=30, help="Timeout pro Request in Sekunden")
+    parser.add_argument(
+        "--http2", action="store_true", help="HTTP/2 mit Multiplexing über eine Verbindung pro Host (httpx[http2])"
+    )
+    parser.add_argument("--json-report", metavar="DATEI", help="Ergebnisse als JSON schreiben")
+    parser.add_argument("--junit-report", metavar="DATEI", help="Ergebnisse als JUnit-XML schreiben")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", metavar="DATEI", help="Alle Requests/Responses in eine Cassette aufnehmen")
+    cassette.add_argument("--replay", metavar="DATEI", help="Responses aus einer Cassette abspielen statt zu senden")
+    cassette.add_argument("--cassette", metavar="DATEI", help="Abspielen, fehlende Requests senden und aufnehmen")
+    parser.add_argument(
+        "--match-on",
+        default=",".join(DEFAULT_MATCH_ON),
+        help="Vergleichsfelder für die Wiedergabe: method,url,body,headers (Standard: %(default)s)",
+    )
+    parser.add_argument("--list", action="store_true", help="Gespeicherte Collections und Requests auflisten")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Nur die Zusammenfassung ausgeben")
+    return parser.parse_args(argv)
+
+
+def resolve_target(target, collections):
+    """Wandelt ein Ziel (Pfad in den Collections oder JSON-Datei) in einen Collection-Baum"""
+    node = find_node(collections, target)
+    if node is None and os.path.isfile(target):
+        with open(target, "r", encoding="utf-8") as f:
+            node = json.load(f)
+        if "type" not in node:
+            # Exportierter Einzel-Request
+            node = {"name": os.path.basename(target), "type": "request", "data": node}
+    if node is None:
+        raise LookupError(f"Nicht gefunden: {target}")
+    if node.get("type") == "request":
+        return {"name": target, "type": "folder", "items": [node]}
+    return node
+
+
+def load_env_vars(config, args):
+    env_vars = dict(config.get("env_vars", {}))
+    if args.env_file:
+        with open(args.env_file, "r", encoding="utf-8") as f:
+            env_vars.update(json.load(f))
+    for assignment in args.env:
+        name, separator, value = assignment.partition("=")
+        if not separator:
+            raise ValueError(f"Ungültige Variable (erwartet NAME=WERT): {assignment}")
+        env_vars[name.strip()] = value
+    return env_vars
+
+
+def open_cassette(args):
+    """Cassette aus --record/--replay/--cassette oder None"""
+    for mode, path in (("record", args.record), ("replay", args.replay), ("auto", args.cassette)):
+        if path:
+            match_on = [field.strip() for field in args.match_on.split(",") if field.strip()]
+            return Cassette(path, mode, match_on)
+    return None
+
+
+async def run_targets(
+    nodes, env_vars, concurrency, timeout, keep_alive=True, on_result=None, cassette=None, http2=False
+):
+    """Führt alle Collection-Bäume auf einer gemeinsamen Engine aus und gibt die RunReports zurück"""
+    engine = AsyncEngine(
+        concurrency=concurrency,
+        timeout=timeout,
+        session_manager=SessionManager(concurrency, keep_alive, http2),
+        cassette=cassette,
+    )
+    try:
+        runner = CollectionRunner(engine, env_vars)
+        return await asyncio.gather(*(runner.run(node, on_result=on_result) for node in nodes))
+    finally:
+        engine.close()
+
+
+def result_to_dict(result):
+    return {
+        "name": result.item.display_name,
+        "method": result.method,
+        "url": result.url,
+        "status": result.status_code,
+        "http_version": result.http_version,
+        "time": result.elapsed,
+        "passed": result.passed,
+        "error": result.error,
+        "checks": [{"status": status, "message": message} for status, message in result.checks],
+        "extracted": result.extracted,
+    }
+
+
+def write_json_report(reports, path):
+    data = {
+        "passed": sum(report.passed for report in reports),
+        "failed": sum(report.failed for report in reports),
+        "collections": [
+            {
+                "name": report.name,
+                "passed": report.passed,
+                "failed": report.failed,
+                "wall_time": report.wall_time,
+                "total_request_time": report.total_request_time,
+                "results": [result_to_dict(result) for result in report.results],
+            }
+            for report in reports
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def write_junit_report(reports, path):
+    results = [result for report in reports for result in report.results]
+    suites = ElementTree.Element(
+        "testsuites",
+        tests=str(len(results)),
+        failures=str(sum(1 for result in results if result.error is None and not result.passed)),
+        errors=str(sum(1 for result in results if result.error is not None)),
+        time=f"{sum(report.wall_time for report in reports):.3f}",
+    )
+    for report in reports:
+        suite = ElementTree.SubElement(
+            suites,
+            "testsuite",
+            name=report.name,
+            tests=str(len(report.results)),
+            failures=str(sum(1 for result in report.results if result.error is None and not result.passed)),
+            errors=str(sum(1 for result in report.results if result.error is not None)),
+            time=f"{report.wall_time:.3f}",
+        )
+        for result in report.results:
+            case = ElementTree.SubElement(
+                suite,
+                "testcase",
+                classname=report.name,
+                name=result.item.display_name,
+                time=f"{result.elapsed:.3f}",
+            )
+            if result.error is not None:
+                ElementTree.SubElement(case, "error", message=result.error).text = f"{result.method} {result.url}"
+            elif not result.passed:
+                messages = result.failures
+                ElementTree.SubElement(case, "failure", message=messages[0]).text = "\n".join(messages)
+            ElementTree.SubElement(case, "system-out").text = "\n".join(
+                f"[{status}] {message}" for status, message in result.checks
+            )
+    ElementTree.ElementTree(suites).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def print_result(result):
+    status = result.status_code if result.status_code is not None else "---"
+    marker = "PASS" if result.passed else "FAIL"
+    protocol = result.http_version or "---"
+    print(
+        f"{marker} {status} {protocol:<8} {result.elapsed * 1000:7.0f}ms  "
+        f"{result.item.display_name}  ({result.method} {result.url})"
+    )
+    for message in result.failures:
+        print(f"       - {message}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+        env_vars = load_env_vars(config, args)
+        cassette = open_cassette(args)
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.http2 and not HTTP2_AVAILABLE:
+        print(f"Fehler: {HTTP2_MISSING}", file=sys.stderr)
+        return EXIT_USAGE
+    collections = config.get("collections", [])
+
+    if args.list:
+        for path, node in iter_paths(collections):
+            print(f"{node.get('type', 'folder'):<10} {path}")
+        return EXIT_OK
+
+    try:
+        nodes = [resolve_target(target, collections) for target in args.targets] or list(collections)
+    except (LookupError, OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if not nodes:
+        print("Keine Collections gefunden", file=sys.stderr)
+        return EXIT_USAGE
+
+    on_result = None if args.quiet else print_result
+    reports = asyncio.run(
+        run_targets(
+            nodes,
+            env_vars,
+            max(1, args.concurrency),
+            args.timeout,
+            on_result=on_result,
+            cassette=cassette,
+            http2=args.http2,
+        )
+    )
+
+    for report in reports:
+        print(
+            f"{report.name}: {report.passed} bestanden, {report.failed} fehlgeschlagen "
+            f"in {report.wall_time:.2f}s (Summe Requests {report.total_request_time:.2f}s)"
+        )
+
+    if cassette is not None:
+        if cassette.dirty:
+            cassette.save()
+        print(f"Cassette {cassette.path}: {cassette.summary()}")
+
+    if args.json_report:
+        write_json_report(reports, args.json_report)
+    if args.junit_report:
+        write_junit_report(reports, args.junit_report)
+
+    return EXIT_FAILED if any(report.failed for report in reports) else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+API Config - Gespeicherte Einstellungen, Environment und Collections
+
+Gemeinsam genutzt von GUI (api_tester.py) und Kommandozeile (api_cli.py), daher
+ohne Abhängigkeit zu tkinter. Die Datei api_tester_config.json hat das Format:
+
+    {
+        "env_vars": {"base_url": "https://api.example.com"},
+        "headers": {"Accept": "application/json"},
+        "settings": {"pool_size": 10, ...},
+        "collections": [
+            {"name": "My API", "type": "collection", "sequential": False, "items": [...]}
+        ]
+    }
+
+Collections sind verschachtelte Dicts wie in api_runner beschrieben.
+"""
+
+import json
+import os
+
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_tester_config.json")
+
+
+def load_config(path=CONFIG_FILE):
+    """Liest die Konfiguration; fehlende Datei ergibt eine leere Konfiguration"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_config(data, path=CONFIG_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def find_node(collections, path):
+    """Sucht eine Collection, einen Ordner oder Request über seinen Pfad ("My API/Users/Login").
+
+    Gibt None zurück, wenn kein Element mit diesem Pfad existiert.
+    """
+    parts = [part for part in path.strip("/").split("/") if part]
+    nodes = collections
+    node = None
+    for part in parts:
+        node = next((child for child in nodes if child.get("name") == part), None)
+        if node is None:
+            return None
+        nodes = node.get("items", [])
+    return node
+
+
+def iter_paths(collections, prefix=""):
+    """Liefert (pfad, knoten) für alle Elemente der Collections"""
+    for node in collections:
+        path = f"{prefix}/{node.get('name', '')}" if prefix else node.get("name", "")
+        yield path, node
+        yield from iter_paths(node.get("items", []), path)
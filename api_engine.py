@@ -0,0 +1,1149 @@
+"""
+API Engine - Request-Ausführung unabhängig vom Tk-Fenster
+
+Nimmt Request-Spezifikationen im Format von APITester.get_current_request_data()
+entgegen und liefert ApiResponse-Objekte zurück. Die GUI ist nur ein Client
+dieser Engine, Skripte können sie direkt verwenden:
+
+    import asyncio
+    from api_engine import AsyncEngine
+
+    async def main():
+        engine = AsyncEngine(concurrency=50, env_vars={"base_url": "https://api.example.com"})
+        specs = [{"method": "GET", "url": "{{base_url}}/items/%d" % i} for i in range(1000)]
+        results = await engine.run_many(specs)
+        engine.close()
+
+    asyncio.run(main())
+"""
+
+import asyncio
+import functools
+import gzip
+import importlib.util
+import io
+import json
+import mimetypes
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.utils import select_proxy
+from urllib3 import HTTPHeaderDict
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import (
+    ConnectTimeoutError,
+    DecodeError,
+    NewConnectionError,
+    ProtocolError,
+    ReadTimeoutError,
+    SSLError,
+)
+from urllib3.util.connection import allowed_gai_family
+
+from api_formatters import iter_pretty_xml
+from api_redact import sensitive_names
+from api_templates import UnresolvedVariablesError, render_template
+
+
+# Zählt pro Thread neu aufgebaute Verbindungen (für "warm"/"neu" Anzeige) und
+# sammelt die Zeiten des Verbindungsaufbaus für den laufenden Request
+_connection_tracking = threading.local()
+
+# Phasen eines Requests in zeitlicher Reihenfolge (Sekunden, über time.perf_counter gemessen)
+TIMING_PHASES = ("dns", "connect", "tls", "ttfb", "download")
+
+# Request-Bodies ab dieser Größe werden mit "compress_body" gzip-komprimiert gesendet
+COMPRESS_MIN_SIZE = 1024
+
+# Dateien werden beim Upload in Stücken dieser Größe gelesen
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Body-Typen, deren Body als Ganzes gesendet wird (und daher auch aus einer Datei kommen kann)
+RAW_BODY_TYPES = {"json": "application/json", "xml": "application/xml", "graphql": "application/json"}
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content-Encodings, die dekodiert werden können (br und zstd nur mit brotli bzw. zstandard)
+SUPPORTED_ENCODINGS = ("gzip", "deflate") + (("br",) if brotli else ()) + (("zstd",) if zstandard else ())
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# HTTP/2 braucht httpx samt h2 (pip install "httpx[http2]")
+HTTP2_AVAILABLE = httpx is not None and importlib.util.find_spec("h2") is not None
+HTTP2_MISSING = 'HTTP/2 benötigt httpx mit h2: pip install "httpx[http2]"'
+
+# Protokollversion aus urllib3 (HTTPResponse.version) bzw. httpx
+HTTP_VERSIONS = {9: "HTTP/0.9", 10: "HTTP/1.0", 11: "HTTP/1.1", 20: "HTTP/2", 30: "HTTP/3"}
+
+# Verbindungsbezogene Header sind in HTTP/2 verboten
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"}
+
+
+class _ZlibDecoder:
+    """gzip (auch mehrteilig) und deflate (mit oder ohne zlib-Header)"""
+
+    def __init__(self, wbits):
+        self._wbits = wbits
+        self._probe = wbits == zlib.MAX_WBITS
+        self._obj = zlib.decompressobj(wbits)
+
+    def decompress(self, data):
+        if self._probe:
+            # Manche Server senden "deflate" ohne zlib-Header
+            self._probe = False
+            try:
+                return self.decompress(data)
+            except zlib.error:
+                self._wbits = -zlib.MAX_WBITS
+                self._obj = zlib.decompressobj(self._wbits)
+        out = self._obj.decompress(data)
+        while self._obj.eof and self._obj.unused_data:
+            rest = self._obj.unused_data
+            self._obj = zlib.decompressobj(self._wbits)
+            out += self._obj.decompress(rest)
+        return out
+
+    def flush(self):
+        return self._obj.flush()
+
+
+class _BrotliDecoder:
+    def __init__(self):
+        self._obj = brotli.Decompressor()
+
+    def decompress(self, data):
+        return self._obj.process(data) if hasattr(self._obj, "process") else self._obj.decompress(data)
+
+    def flush(self):
+        return b""
+
+
+class _ZstdDecoder:
+    def __init__(self):
+        self._obj = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data):
+        return self._obj.decompress(data)
+
+    def flush(self):
+        return b""
+
+
+class ContentDecoder:
+    """Dekodiert einen Body mit einem oder mehreren Content-Encodings stückweise"""
+
+    FACTORIES = {
+        "gzip": lambda: _ZlibDecoder(16 + zlib.MAX_WBITS),
+        "x-gzip": lambda: _ZlibDecoder(16 + zlib.MAX_WBITS),
+        "deflate": lambda: _ZlibDecoder(zlib.MAX_WBITS),
+        "br": _BrotliDecoder,
+        "zstd": _ZstdDecoder,
+    }
+
+    def __init__(self, encodings):
+        # Zuletzt angewendete Kodierung zuerst rückgängig machen
+        self._decoders = [self.FACTORIES[encoding]() for encoding in reversed(encodings)]
+
+    @classmethod
+    def for_header(cls, content_encoding):
+        """Decoder für einen Content-Encoding-Header oder None (identity oder nicht unterstützt)"""
+        encodings = [part.strip().lower() for part in content_encoding.split(",")]
+        encodings = [encoding for encoding in encodings if encoding and encoding != "identity"]
+        supported = SUPPORTED_ENCODINGS + ("x-gzip",)
+        if not encodings or any(encoding not in supported for encoding in encodings):
+            return None
+        return cls(encodings)
+
+    def decompress(self, data):
+        for decoder in self._decoders:
+            data = decoder.decompress(data)
+        return data
+
+    def flush(self):
+        data = b""
+        for decoder in self._decoders:
+            if data:
+                data = decoder.decompress(data)
+            data += decoder.flush()
+        return data
+
+
+class _TrackingConnectionMixin:
+    def _new_conn(self):
+        _connection_tracking.new_connections = getattr(_connection_tracking, "new_connections", 0) + 1
+        timings = getattr(_connection_tracking, "timings", None)
+        if timings is None:
+            return super()._new_conn()
+
+        # Namensauflösung getrennt messen, danach die aufgelösten Adressen der Reihe nach
+        # probieren wie urllib3 (allowed_gai_family, bei Fehlschlag nächste Adresse)
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host.strip("[]"), self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except (OSError, UnicodeError):
+            addresses = []  # den Fehler meldet der reguläre Verbindungsaufbau
+        resolved = time.perf_counter()
+        timings["dns"] += resolved - start
+
+        try:
+            if not addresses:
+                return super()._new_conn()
+            error = None
+            for *_, sockaddr in addresses:
+                self._dns_host = sockaddr[0]
+                try:
+                    return super()._new_conn()
+                except (ConnectTimeoutError, NewConnectionError) as e:
+                    error = e
+            raise error
+        finally:
+            self._dns_host = host
+            timings["connect"] += time.perf_counter() - resolved
+
+
+class TrackingHTTPConnection(_TrackingConnectionMixin, HTTPConnection):
+    pass
+
+
+class TrackingHTTPSConnection(_TrackingConnectionMixin, HTTPSConnection):
+    def connect(self):
+        timings = getattr(_connection_tracking, "timings", None)
+        if timings is None:
+            return super().connect()
+
+        # TLS = gesamter connect() abzüglich DNS und TCP-Verbindung aus _new_conn()
+        setup_before = timings["dns"] + timings["connect"]
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            setup = timings["dns"] + timings["connect"] - setup_before
+            timings["tls"] += max(0.0, time.perf_counter() - start - setup)
+
+
+class TrackingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TrackingHTTPConnection
+
+
+class TrackingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TrackingHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter, dessen Verbindungen neue Verbindungsaufbauten melden"""
+
+    POOL_CLASSES = {"http": TrackingHTTPConnectionPool, "https": TrackingHTTPSConnectionPool}
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self.POOL_CLASSES
+
+    def proxy_manager_for(self, *args, **kwargs):
+        manager = super().proxy_manager_for(*args, **kwargs)
+        manager.pool_classes_by_scheme = self.POOL_CLASSES
+        return manager
+
+
+def _trace_http2(event, info):
+    # httpcore meldet den Verbindungsaufbau als Trace-Ereignisse (DNS steckt in connect_tcp)
+    if event == "connection.connect_tcp.started":
+        _connection_tracking.new_connections = getattr(_connection_tracking, "new_connections", 0) + 1
+    timings = getattr(_connection_tracking, "timings", None)
+    phase = {"connection.connect_tcp": "connect", "connection.start_tls": "tls"}.get(event.rpartition(".")[0])
+    if timings is None or phase is None:
+        return
+    if event.endswith(".started"):
+        _connection_tracking.phase_start = time.perf_counter()
+    elif event.endswith(".complete"):
+        timings[phase] += time.perf_counter() - _connection_tracking.phase_start
+
+
+def _requests_error(error):
+    """Übersetzt httpx-Fehler in die requests-Ausnahmen, die Engine und GUI erwarten"""
+    if isinstance(error, httpx.ProxyError):
+        return requests.exceptions.ProxyError(error)
+    if isinstance(error, httpx.ConnectTimeout):
+        return requests.exceptions.ConnectTimeout(error)
+    if isinstance(error, httpx.TimeoutException):
+        return requests.exceptions.ReadTimeout(error)
+    if isinstance(error, httpx.DecodingError):
+        return requests.exceptions.ContentDecodingError(error)
+    if isinstance(error, (httpx.NetworkError, httpx.ProtocolError)):
+        return requests.exceptions.ConnectionError(error)
+    return requests.exceptions.RequestException(error)
+
+
+class _Http2Raw:
+    """httpx-Response mit der Schnittstelle einer urllib3-Response, soweit requests und _iter_raw sie nutzen"""
+
+    def __init__(self, response):
+        self._response = response
+        self.status = response.status_code
+        self.reason = response.reason_phrase
+        self.version = {"HTTP/1.0": 10, "HTTP/1.1": 11, "HTTP/2": 20}.get(response.http_version, 11)
+        self.headers = HTTPHeaderDict()
+        for key, value in response.headers.multi_items():
+            self.headers.add(key, value)
+        # requests liest Set-Cookie über _original_response.msg.get_all()
+        self.msg = self.headers
+        self._original_response = self
+
+    def stream(self, chunk_size, decode_content=True):
+        response = self._response
+        try:
+            yield from response.iter_bytes(chunk_size) if decode_content else response.iter_raw(chunk_size)
+        except httpx.HTTPError as e:
+            raise _requests_error(e) from e
+
+    def close(self):
+        self._response.close()
+
+
+class Http2Adapter(BaseAdapter):
+    """Transport-Adapter für requests, der über httpx sendet.
+
+    Per ALPN wird HTTP/2 ausgehandelt (sonst HTTP/1.1); parallele Requests an einen
+    Host laufen dann als Streams über eine gemeinsame Verbindung statt über eine
+    Verbindung pro Request. Cookies, Redirects und Auth bleiben bei requests.
+    Proxies (aus der Session oder der Umgebung) wählt requests wie gewohnt aus,
+    httpx verbindet dann über den Proxy (bei https per CONNECT-Tunnel).
+    """
+
+    build_response = HTTPAdapter.build_response
+
+    def __init__(self, pool_maxsize=10):
+        if not HTTP2_AVAILABLE:
+            raise RuntimeError(HTTP2_MISSING)
+        super().__init__()
+        self.pool_maxsize = pool_maxsize
+        # verify, cert und Proxy gelten in httpx pro Transport, daher ein Transport je Kombination
+        self._transports = {}
+        self._lock = threading.Lock()
+
+    def _transport(self, verify, cert, proxy):
+        key = (verify, cert if not isinstance(cert, list) else tuple(cert), proxy)
+        with self._lock:
+            transport = self._transports.get(key)
+            if transport is None:
+                limits = httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize)
+                try:
+                    transport = httpx.HTTPTransport(http2=True, verify=verify, cert=cert, limits=limits, proxy=proxy)
+                except (ImportError, ValueError) as e:
+                    # z.B. socks5:// ohne das Paket socksio
+                    raise requests.exceptions.InvalidProxyURL(f"Proxy {proxy} mit HTTP/2 nicht nutzbar: {e}") from e
+                self._transports[key] = transport
+        return transport
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        else:
+            timeout = httpx.Timeout(timeout)
+        headers = [(key, value) for key, value in request.headers.items() if key.lower() not in HOP_BY_HOP_HEADERS]
+        outgoing = httpx.Request(
+            request.method,
+            request.url,
+            headers=headers,
+            content=request.body,
+            extensions={"timeout": timeout.as_dict(), "trace": _trace_http2},
+        )
+        proxy = select_proxy(request.url, proxies) if proxies else None
+        try:
+            response = self._transport(verify, cert, proxy).handle_request(outgoing)
+        except httpx.HTTPError as e:
+            raise _requests_error(e) from e
+        response.request = outgoing
+
+        # Ohne stream liest Session.send() den Body selbst ein
+        return self.build_response(request, _Http2Raw(response))
+
+    def close(self):
+        with self._lock:
+            transports = list(self._transports.values())
+            self._transports.clear()
+        for transport in transports:
+            transport.close()
+
+
+class SessionManager:
+    """Hält pro Scheme/Host/Port eine gepoolte Keep-Alive Session.
+
+    Mit http2 gehen die Requests über Http2Adapter (httpx) statt über urllib3.
+    """
+
+    DEFAULT_PORTS = {"http": 80, "https": 443}
+
+    def __init__(self, pool_size=10, keep_alive=True, http2=False):
+        if http2 and not HTTP2_AVAILABLE:
+            raise RuntimeError(HTTP2_MISSING)
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.http2 = http2
+        # Gemeinsamer Cookie-Jar, überlebt auch ein Zurücksetzen der Verbindungen
+        self.cookies = requests.cookies.RequestsCookieJar()
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _session_key(self, url):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or self.DEFAULT_PORTS.get(scheme)
+        return (scheme, (parts.hostname or "").lower(), port)
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = Http2Adapter(self.pool_size) if self.http2 else PooledAdapter(pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.cookies = self.cookies
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def get_session(self, url):
+        """Liefert die Session für Scheme/Host/Port der URL (legt sie bei Bedarf an)"""
+        key = self._session_key(url)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self._create_session()
+        return session
+
+    def request(self, method, url, timings=None, **kwargs):
+        """Sendet einen Request über die Session des Hosts.
+
+        Gibt (response, reused) zurück. reused ist True, wenn keine neue
+        Verbindung aufgebaut werden musste. Ein timings-Dict mit den Schlüsseln
+        "dns", "connect" und "tls" wird um die Dauer des Verbindungsaufbaus erhöht.
+        """
+        session = self.get_session(url)
+        _connection_tracking.new_connections = 0
+        _connection_tracking.timings = timings
+        try:
+            response = session.request(method, url, **kwargs)
+        finally:
+            _connection_tracking.timings = None
+        return response, _connection_tracking.new_connections == 0
+
+    def configure(self, pool_size=None, keep_alive=None, http2=None):
+        """Übernimmt neue Pool-Einstellungen (bestehende Verbindungen werden geschlossen)"""
+        if http2 and not HTTP2_AVAILABLE:
+            raise RuntimeError(HTTP2_MISSING)
+        if pool_size is not None:
+            self.pool_size = pool_size
+        if keep_alive is not None:
+            self.keep_alive = keep_alive
+        if http2 is not None:
+            self.http2 = http2
+        self.reset()
+
+    def reset(self):
+        """Schließt alle offenen Verbindungen, Cookies bleiben erhalten"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def clear_cookies(self):
+        self.cookies.clear()
+
+
+def replace_env_vars(text, env_vars):
+    """Ersetzt Environment Variables ({{name}}) in Text (siehe api_templates)"""
+    return render_template(text, env_vars)
+
+
+def prepare_request(spec, env_vars=None, timeout=30, strict=True):
+    """Baut aus einer Request-Spezifikation Methode, URL und requests-Argumente.
+
+    spec hat das Format von APITester.get_current_request_data(); nur "url" ist
+    Pflicht. Environment Variables werden in URL, Parametern, Headers, Body und
+    Auth-Daten ersetzt. Mit strict löst eine nicht definierte Variable
+    UnresolvedVariablesError aus, statt unverändert gesendet zu werden.
+
+    Optional: "accept_encoding" setzt den Accept-Encoding-Header (sofern nicht
+    schon in den Headers), "compress_body" sendet Bodies ab COMPRESS_MIN_SIZE
+    gzip-komprimiert.
+
+    Dateien: "body_file" ersetzt bei Raw-Bodies den Text durch den Inhalt einer
+    Datei, "files" ({Feld: Pfad}) macht aus form-data einen multipart-Body. Beide
+    werden als UploadBody erst beim Senden stückweise gelesen und nicht
+    komprimiert; Variablen werden nur in Pfaden und Feldnamen ersetzt.
+
+    kwargs["redact"] enthält die (kleingeschriebenen) Header- und Parameternamen,
+    deren Werte nicht aufgenommen werden dürfen, inkl. des Namens eines API-Keys;
+    die Engine gibt es nicht an requests weiter.
+    """
+    env_vars = env_vars or {}
+    missing = set()
+
+    def resolve(value):
+        return render_template(str(value), env_vars, missing)
+
+    method = spec.get("method", "GET").upper()
+    url = resolve(spec["url"].strip())
+    headers = {key: resolve(value) for key, value in spec.get("headers", {}).items()}
+    params = {key: resolve(value) for key, value in spec.get("params", {}).items()}
+    kwargs = {"headers": headers, "timeout": timeout, "verify": True, "redact": sensitive_names(spec)}
+
+    accept_encoding = spec.get("accept_encoding")
+    if accept_encoding and not any(key.lower() == "accept-encoding" for key in headers):
+        headers["Accept-Encoding"] = accept_encoding
+
+    # Authentication
+    auth_type = spec.get("auth_type", "none")
+    auth_data = spec.get("auth_data", {})
+    if auth_type == "Basic Auth":
+        kwargs["auth"] = (resolve(auth_data.get("username", "")), resolve(auth_data.get("password", "")))
+    elif auth_type == "Bearer Token" and auth_data.get("bearer_token"):
+        headers["Authorization"] = f"Bearer {resolve(auth_data['bearer_token'])}"
+    elif auth_type == "API Key" and auth_data.get("api_key_name"):
+        target = params if auth_data.get("api_key_location") == "Query Params" else headers
+        target[auth_data["api_key_name"]] = resolve(auth_data.get("api_key_value", ""))
+
+    # Query Parameters hinzufügen
+    if params:
+        separator = "&" if "?" in url else "?"
+        url = f"{url}{separator}{urlencode(params)}"
+
+    body = spec.get("body")
+    body_type = spec.get("body_type")
+    body_file = files = None
+    if method in ["POST", "PUT", "PATCH"]:
+        if body_type in RAW_BODY_TYPES and spec.get("body_file"):
+            body_file = resolve(spec["body_file"])
+        elif body_type == "form-data" and spec.get("files"):
+            files = {resolve(key): resolve(path) for key, path in spec["files"].items()}
+    if body and method in ["POST", "PUT", "PATCH"] and body_file is None:
+        if isinstance(body, dict):
+            body = {key: resolve(value) for key, value in body.items()}
+        elif isinstance(body, str):
+            body = resolve(body)
+    else:
+        body = None
+
+    # Vor dem JSON-Parsen prüfen: ein übrig gebliebenes {{name}} wäre sonst ein Parse-Fehler
+    if strict and missing:
+        raise UnresolvedVariablesError(missing)
+
+    upload = None
+    if body_file is not None:
+        upload = UploadBody.from_file(body_file, RAW_BODY_TYPES[body_type])
+    elif files is not None:
+        upload = UploadBody.multipart(body or {}, files)
+    if upload is not None:
+        kwargs["data"] = upload
+        # Der Boundary gehört zum Body, daher ersetzt er einen Content-Type aus den Headers
+        if upload.boundary or not any(key.lower() == "content-type" for key in headers):
+            for key in [key for key in headers if key.lower() == "content-type"]:
+                del headers[key]
+            headers["Content-Type"] = upload.content_type
+    elif body is not None:
+        if spec.get("body_type") == "json":
+            kwargs["json"] = json.loads(body) if isinstance(body, str) else body
+        else:
+            kwargs["data"] = body
+        if spec.get("compress_body"):
+            _compress_body(kwargs)
+
+    return method, url, kwargs
+
+
+def _compress_body(kwargs):
+    # Body wie requests ihn senden würde, aber gzip-komprimiert (mtime=0: gleiche Bytes bei gleichem Body)
+    headers = kwargs["headers"]
+    content_type = None
+    if "json" in kwargs:
+        data = json.dumps(kwargs["json"]).encode("utf-8")
+        content_type = "application/json"
+    elif isinstance(kwargs["data"], dict):
+        data = urlencode(kwargs["data"]).encode("utf-8")
+        content_type = "application/x-www-form-urlencoded"
+    else:
+        data = kwargs["data"].encode("utf-8") if isinstance(kwargs["data"], str) else kwargs["data"]
+    if len(data) < COMPRESS_MIN_SIZE:
+        return
+    kwargs.pop("json", None)
+    kwargs["data"] = gzip.compress(data, mtime=0)
+    headers["Content-Encoding"] = "gzip"
+    if content_type and not any(key.lower() == "content-type" for key in headers):
+        headers["Content-Type"] = content_type
+
+
+class RequestCancelled(requests.exceptions.RequestException):
+    """Request wurde während der Übertragung abgebrochen"""
+
+
+def _quote_param(value):
+    # Wie Browser in multipart-Headern: Anführungszeichen und Zeilenumbrüche prozent-kodieren
+    return value.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+class UploadBody:
+    """Request-Body aus Bytes und Dateien, der erst beim Senden gelesen wird.
+
+    parts ist eine Liste aus bytes und Dateipfaden (str). Dateien werden bei jedem
+    Senden neu geöffnet und in UPLOAD_CHUNK_SIZE-Stücken gelesen, der Speicherbedarf
+    hängt also nicht von der Dateigröße ab und derselbe Body kann mehrfach gesendet
+    werden (Load Test, Runner). Die Gesamtgröße ist bekannt, gesendet wird daher mit
+    Content-Length statt chunked.
+    """
+
+    def __init__(self, parts, content_type="application/octet-stream", boundary=None):
+        self.parts = list(parts)
+        self.content_type = content_type
+        self.boundary = boundary
+        for part in self.parts:
+            if isinstance(part, str) and not os.path.isfile(part):
+                raise FileNotFoundError(f"Datei nicht gefunden: {part}")
+
+    @classmethod
+    def from_file(cls, path, content_type=None):
+        return cls([path], content_type or mimetypes.guess_type(path)[0] or "application/octet-stream")
+
+    @classmethod
+    def multipart(cls, fields, files, boundary=None):
+        """multipart/form-data aus Textfeldern ({Name: Wert}) und Dateien ({Name: Pfad})"""
+        boundary = boundary or uuid.uuid4().hex
+        parts = []
+        for name, value in fields.items():
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{_quote_param(name)}"\r\n\r\n'.encode("utf-8")
+                + str(value).encode("utf-8")
+                + b"\r\n"
+            )
+        for name, path in files.items():
+            filename = os.path.basename(path)
+            file_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{_quote_param(name)}"; '
+                f'filename="{_quote_param(filename)}"\r\nContent-Type: {file_type}\r\n\r\n'.encode("utf-8")
+            )
+            parts.append(path)
+            parts.append(b"\r\n")
+        parts.append(f"--{boundary}--\r\n".encode("ascii"))
+        return cls(parts, f"multipart/form-data; boundary={boundary}", boundary)
+
+    @property
+    def len(self):
+        # Wird von requests für Content-Length gelesen (erst beim Senden, damit die aktuelle Dateigröße zählt)
+        return sum(len(part) if isinstance(part, bytes) else os.path.getsize(part) for part in self.parts)
+
+    def __iter__(self):
+        for part in self.parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+            with open(part, "rb") as f:
+                while True:
+                    chunk = f.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def fingerprint(self):
+        """Bytes zum Vergleichen und Aufnehmen: Dateien nur mit Name und Größe, ohne zufälligen Boundary"""
+        data = b"".join(
+            part if isinstance(part, bytes) else f"<{os.path.basename(part)}: {os.path.getsize(part)} bytes>".encode()
+            for part in self.parts
+        )
+        return data.replace(self.boundary.encode("ascii"), b"boundary") if self.boundary else data
+
+
+class _UploadStream:
+    """Ein Sendevorgang eines UploadBody mit Fortschritt und Abbruch"""
+
+    def __init__(self, body, transfer, progress=None):
+        self.body = body
+        self.len = body.len
+        self._transfer = transfer
+        self._progress = progress
+
+    def __iter__(self):
+        transfer = self._transfer
+        for chunk in self.body:
+            if transfer.cancel.is_set():
+                raise RequestCancelled("Upload abgebrochen")
+            yield chunk
+            transfer.uploaded += len(chunk)
+            if self._progress:
+                self._progress(transfer.uploaded, self.len)
+
+
+class ApiResponse:
+    """Ergebnis eines Requests, unabhängig von Transport und GUI.
+
+    Der Body liegt in einer dateiähnlichen Ablage (SpooledTemporaryFile): kleine
+    Bodies bleiben im Speicher, große werden auf die Platte ausgelagert. Für große
+    Bodies iter_bytes(), preview() oder save() statt content verwenden.
+
+    text, json() und render() werden nur einmal berechnet und dann zwischengespeichert,
+    damit Anzeige, Tests, Extraktion und Formatwechsel denselben Parse teilen.
+    """
+
+    def __init__(
+        self,
+        method,
+        url,
+        status_code,
+        reason,
+        headers,
+        body,
+        size,
+        elapsed,
+        encoding=None,
+        cookies=None,
+        connection_reused=False,
+        timings=None,
+        replayed=False,
+        wire_size=None,
+        decode_time=0.0,
+        http_version="HTTP/1.1",
+    ):
+        self.method = method
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.size = size
+        # Übertragene Body-Bytes (vor dem Dekomprimieren) und Dauer des Dekomprimierens
+        self.wire_size = size if wire_size is None else wire_size
+        self.decode_time = decode_time
+        self.elapsed = elapsed
+        self.encoding = encoding
+        self.cookies = cookies or {}
+        self.connection_reused = connection_reused
+        # Aus einer Cassette abgespielt statt über das Netz geladen (siehe api_cassette)
+        self.replayed = replayed
+        # Ausgehandeltes Protokoll ("HTTP/1.1", "HTTP/2")
+        self.http_version = http_version
+        # Vom HTTP-Cache gesetzt (siehe api_cache): "hit", "revalidated", "miss" oder None
+        self.cache_status = None
+        self.bytes_saved = 0
+        # Dauer je Phase in Sekunden (siehe TIMING_PHASES), die GUI ergänzt "render"
+        self.timings = timings if timings is not None else {}
+        self._body = body
+        self._body_lock = threading.Lock()
+        self._holds = 0
+        self._close_pending = False
+        self._cache_lock = threading.RLock()
+        self._text = None
+        self._json = None
+        self._json_error = None
+        self._renderings = {}
+        # Grund, warum "pretty" auf Rohtext zurückgefallen ist (z.B. Position eines XML-Fehlers)
+        self.format_error = None
+
+    @classmethod
+    def from_content(cls, method, url, status_code, reason, headers, content, elapsed, **kwargs):
+        """Erzeugt eine Response aus einem Body, der bereits als bytes vorliegt"""
+        return cls(method, url, status_code, reason, headers, io.BytesIO(content), len(content), elapsed, **kwargs)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def content(self):
+        """Kompletter Body als bytes"""
+        return b"".join(self.iter_bytes())
+
+    @property
+    def content_type(self):
+        return self.headers.get("Content-Type", "")
+
+    @property
+    def text(self):
+        with self._cache_lock:
+            if self._text is None:
+                self._text = self.content.decode(self.encoding or "utf-8", errors="replace")
+            return self._text
+
+    def json(self):
+        """Geparster JSON-Body; das Ergebnis (auch ein Fehler) wird zwischengespeichert.
+
+        Das zurückgegebene Objekt wird geteilt und darf nicht verändert werden.
+        """
+        with self._cache_lock:
+            if self._json is None and self._json_error is None:
+                try:
+                    self._json = json.loads(self.text)
+                except ValueError as e:
+                    self._json_error = e
+            if self._json_error is not None:
+                raise self._json_error
+            return self._json
+
+    def render(self, fmt="pretty"):
+        """Body als Anzeige-Text: "pretty" formatiert JSON/XML, sonst Rohtext"""
+        with self._cache_lock:
+            if fmt not in self._renderings:
+                self._renderings[fmt] = self._pretty_text() if fmt == "pretty" else self.text
+            return self._renderings[fmt]
+
+    def _pretty_text(self):
+        content_type = self.content_type
+        try:
+            if "json" in content_type:
+                return json.dumps(self.json(), indent=2, ensure_ascii=False)
+            if "xml" in content_type:
+                return "".join(iter_pretty_xml(self.iter_bytes()))
+        except ValueError as e:
+            self.format_error = f"Ungültiges JSON: {e}" if "json" in content_type else str(e)
+        return self.text
+
+    def iter_bytes(self, chunk_size=64 * 1024, limit=None):
+        """Liest den Body stückweise (optional nur die ersten limit Bytes)"""
+        position = 0
+        while limit is None or position < limit:
+            size = chunk_size if limit is None else min(chunk_size, limit - position)
+            with self._body_lock:
+                self._body.seek(position)
+                chunk = self._body.read(size)
+            if not chunk:
+                break
+            position += len(chunk)
+            yield chunk
+
+    def preview(self, limit):
+        """Die ersten limit Bytes des Bodys"""
+        return b"".join(self.iter_bytes(limit=limit))
+
+    def preview_text(self, limit):
+        return self.preview(limit).decode(self.encoding or "utf-8", errors="replace")
+
+    def save(self, filename):
+        """Schreibt den kompletten Body in eine Datei, ohne ihn in den Speicher zu laden"""
+        with open(filename, "wb") as f:
+            for chunk in self.iter_bytes():
+                f.write(chunk)
+
+    def hold(self):
+        """Hält den Body offen, bis release() aufgerufen wird (close() wird bis dahin verschoben)"""
+        with self._body_lock:
+            self._holds += 1
+
+    def release(self):
+        with self._body_lock:
+            self._holds -= 1
+            close = self._holds == 0 and self._close_pending
+        if close:
+            self.close()
+
+    def close(self):
+        """Gibt den Body (ggf. die temporäre Datei) und die Zwischenspeicher frei"""
+        # Lock: der Render-Worker kann den Body gerade noch lesen
+        with self._body_lock:
+            if self._holds:
+                self._close_pending = True
+                return
+            self._body.close()
+        with self._cache_lock:
+            self._text = self._json = self._json_error = None
+            self._renderings = {}
+            self.format_error = None
+
+    def __repr__(self):
+        return f"<ApiResponse {self.method} {self.url} [{self.status_code}]>"
+
+
+def _iter_raw(response, chunk_size, decode_content):
+    """Liest den Body über urllib3 und übersetzt Fehler wie requests' iter_content()"""
+    try:
+        yield from response.raw.stream(chunk_size, decode_content=decode_content)
+    except ProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(e)
+    except DecodeError as e:
+        raise requests.exceptions.ContentDecodingError(e)
+    except ReadTimeoutError as e:
+        raise requests.exceptions.ConnectionError(e)
+    except SSLError as e:
+        raise requests.exceptions.SSLError(e)
+
+
+class _Transfer:
+    """Zustand eines laufenden Requests zwischen Eventloop und Worker-Thread"""
+
+    def __init__(self):
+        self.cancel = threading.Event()
+        self.headers_received = False
+        self.uploaded = 0
+
+
+def _discard_result(future):
+    # Ergebnis eines abgebrochenen Requests abholen und den Body freigeben
+    if future.cancelled() or future.exception() is not None:
+        return
+    future.result().close()
+
+
+class AsyncEngine:
+    """Asynchrone Request-Engine mit begrenzter Parallelität, Timeouts und Abbruch.
+
+    Die eigentlichen HTTP-Aufrufe laufen über gepoolte requests-Sessions in einem
+    Thread-Pool mit `concurrency` Workern; asyncio übernimmt Scheduling, Timeouts
+    und Abbruch. Coroutinen können mit asyncio.run() oder über submit() auf der
+    Hintergrund-Eventloop der Engine ausgeführt werden (z.B. aus der GUI).
+    """
+
+    def __init__(
+        self,
+        concurrency=10,
+        timeout=30,
+        env_vars=None,
+        session_manager=None,
+        spool_size=1024 * 1024,
+        chunk_size=64 * 1024,
+        cassette=None,
+        cache=None,
+    ):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        # Bodies bis spool_size bleiben im Speicher, größere gehen in eine temporäre Datei
+        self.spool_size = spool_size
+        self.chunk_size = chunk_size
+        self.env_vars = env_vars if env_vars is not None else {}
+        self.sessions = session_manager or SessionManager(pool_size=concurrency)
+        # Optionale Cassette (api_cassette.Cassette) für Aufnahme und Wiedergabe
+        self.cassette = cassette
+        # Optionaler HTTP-Cache (api_cache.ResponseCache) für GET-Requests
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="api-engine")
+        # asyncio-Primitive gehören zu einer Eventloop, daher ein Semaphore pro Loop
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    def _send_blocking(self, method, url, kwargs, transfer, progress=None, upload_progress=None):
+        timings = dict.fromkeys(TIMING_PHASES, 0.0)
+        start_time = time.perf_counter()
+
+        send_kwargs = {key: value for key, value in kwargs.items() if key != "redact"}
+
+        # Frischer Cache-Eintrag: kein Netz; veralteter: mit Validatoren nachfragen. Die
+        # Validatoren gehen nur ins Netz, Cache und Cassette sehen die ursprünglichen Headers.
+        cache = self.cache
+        entry = None
+        if cache is not None:
+            headers = kwargs.get("headers", {})
+            credentials = cache.credentials(kwargs)
+            entry = cache.lookup(method, url, headers, credentials)
+            if entry is not None:
+                if cache.is_fresh(entry, headers):
+                    return cache.respond(entry, method, "hit", time.perf_counter() - start_time)
+                conditional = cache.conditional_headers(entry, headers)
+                if conditional is None:
+                    entry = None
+                else:
+                    send_kwargs["headers"] = conditional
+
+        if isinstance(kwargs.get("data"), UploadBody):
+            send_kwargs["data"] = _UploadStream(kwargs["data"], transfer, upload_progress)
+        response, reused = self.sessions.request(method, url, stream=True, timings=timings, **send_kwargs)
+        headers_time = time.perf_counter()
+        transfer.headers_received = True
+        # Wartezeit auf die Antwort ohne Verbindungsaufbau (Server-Bearbeitung plus Latenz)
+        timings["ttfb"] = max(0.0, headers_time - start_time - timings["dns"] - timings["connect"] - timings["tls"])
+
+        if entry is not None and response.status_code == 304:
+            response.close()
+            entry = cache.revalidate(entry, response.headers)
+            return cache.respond(entry, method, "revalidated", headers_time - start_time, timings, reused)
+
+        # Content-Length zählt die übertragenen (ggf. komprimierten) Bytes
+        length = response.headers.get("Content-Length", "")
+        total = int(length) if length.isdigit() else None
+        decoder = ContentDecoder.for_header(response.headers.get("Content-Encoding", ""))
+
+        # Rohe Bytes lesen und selbst dekodieren, um Übertragungsgröße und Dekomprimierzeit zu messen
+        body = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        size = wire_size = 0
+        decode_time = 0.0
+        try:
+            for chunk in _iter_raw(response, self.chunk_size, decoder is None):
+                if transfer.cancel.is_set():
+                    raise RequestCancelled(f"Request abgebrochen: {method} {url}")
+                wire_size += len(chunk)
+                if decoder is not None:
+                    decode_start = time.perf_counter()
+                    chunk = decoder.decompress(chunk)
+                    decode_time += time.perf_counter() - decode_start
+                body.write(chunk)
+                size += len(chunk)
+                if progress:
+                    progress(wire_size, total)
+            if decoder is not None:
+                chunk = decoder.flush()
+                body.write(chunk)
+                size += len(chunk)
+        except zlib.error as e:
+            body.close()
+            raise requests.exceptions.ContentDecodingError(f"Body nicht dekodierbar: {e}") from e
+        except BaseException:
+            body.close()
+            raise
+        finally:
+            response.close()
+
+        end_time = time.perf_counter()
+        timings["download"] = end_time - headers_time
+        result = ApiResponse(
+            method=response.request.method,
+            url=response.url,
+            status_code=response.status_code,
+            reason=response.reason,
+            headers=response.headers,
+            body=body,
+            size=size,
+            elapsed=end_time - start_time,
+            encoding=response.encoding,
+            cookies=response.cookies.get_dict(),
+            connection_reused=reused,
+            timings=timings,
+            wire_size=wire_size,
+            decode_time=decode_time,
+            http_version=HTTP_VERSIONS.get(response.raw.version, "HTTP/1.1"),
+        )
+        if cache is not None:
+            try:
+                cache.store(method, url, kwargs.get("headers", {}), result, credentials)
+            except OSError:
+                # Ein voller oder gesperrter Cache darf den Request nicht scheitern lassen
+                pass
+        cassette = self.cassette
+        if cassette is not None and cassette.recording:
+            cassette.record(method, url, kwargs, result)
+        return result
+
+    async def send(self, spec, timeout=None):
+        """Sendet einen Request im Format von get_current_request_data()"""
+        timeout = timeout or self.timeout
+        method, url, kwargs = prepare_request(spec, self.env_vars, timeout)
+        return await self.send_prepared(method, url, kwargs, timeout)
+
+    async def send_prepared(self, method, url, kwargs, timeout=None, progress=None, upload_progress=None):
+        """Sendet einen bereits mit prepare_request() vorbereiteten Request.
+
+        Der Body wird stückweise gelesen; progress(bytes_gelesen, gesamt_oder_None)
+        wird dabei aus dem Worker-Thread aufgerufen, bei einem UploadBody ebenso
+        upload_progress(bytes_gesendet, gesamt). Kommen die Response-Header
+        nicht innerhalb von timeout Sekunden, wird requests.exceptions.Timeout
+        ausgelöst. Ein bereits laufender Up- oder Download wird nur noch durch den
+        Socket-Timeout begrenzt, damit große Bodies vollständig ankommen.
+
+        Mit einer Cassette werden passende Aufnahmen ohne Netzzugriff abgespielt.
+        """
+        cassette = self.cassette
+        if cassette is not None and cassette.playing:
+            response = cassette.play(method, url, kwargs)
+            if response is not None:
+                return response
+
+        timeout = timeout or kwargs.get("timeout") or self.timeout
+        kwargs = dict(kwargs, timeout=timeout)
+        transfer = _Transfer()
+
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            call = functools.partial(self._send_blocking, method, url, kwargs, transfer, progress, upload_progress)
+            future = loop.run_in_executor(self._executor, call)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                if transfer.headers_received or transfer.uploaded:
+                    return await future
+                transfer.cancel.set()
+                future.add_done_callback(_discard_result)
+                raise requests.exceptions.Timeout(f"Request nach {timeout}s abgebrochen: {method} {url}")
+            except asyncio.CancelledError:
+                transfer.cancel.set()
+                future.add_done_callback(_discard_result)
+                raise
+
+    async def run_many(self, specs, timeout=None):
+        """Sendet viele Requests parallel.
+
+        Liefert die Ergebnisse in Eingabereihenfolge; fehlgeschlagene Requests
+        erscheinen als Exception-Objekt in der Liste.
+        """
+        return await asyncio.gather(*(self.send(spec, timeout) for spec in specs), return_exceptions=True)
+
+    async def iter_completed(self, specs, timeout=None):
+        """Liefert (index, ergebnis) in der Reihenfolge, in der Requests fertig werden"""
+
+        async def indexed(index, spec):
+            try:
+                return index, await self.send(spec, timeout)
+            except Exception as e:
+                return index, e
+
+        for future in asyncio.as_completed([indexed(i, spec) for i, spec in enumerate(specs)]):
+            yield await future
+
+    def _ensure_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="api-engine-loop", daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+
+    def submit(self, coro):
+        """Führt eine Coroutine auf der Hintergrund-Eventloop aus.
+
+        Gibt ein concurrent.futures.Future zurück; future.cancel() bricht ab.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def send_sync(self, spec, timeout=None):
+        """Blockierende Variante von send()"""
+        return self.submit(self.send(spec, timeout)).result()
+
+    def close(self):
+        """Stoppt die Hintergrund-Eventloop und schließt alle Verbindungen"""
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not threading.current_thread():
+                thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+        self.sessions.reset()
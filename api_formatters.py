@@ -0,0 +1,489 @@
+"""
+API Formatters - Streaming-Formatierung von Response-Bodies
+
+Die Formatter arbeiten auf einem Iterator von Body-Chunks (bytes oder str) und
+liefern den formatierten Text wiederum stückweise. Der Speicherbedarf hängt nur
+von der Verschachtelungstiefe ab, nicht von der Größe des Bodys:
+
+    from api_formatters import iter_pretty_json, iter_pretty_xml
+
+    for chunk in iter_pretty_json(response.iter_bytes(), max_lines=10000):
+        viewer.append(chunk)
+
+Ungültige Eingaben lösen ValueError mit der Fehlerposition aus.
+"""
+
+import codecs
+import queue
+import re
+import threading
+from xml.parsers import expat
+from xml.sax.saxutils import escape, quoteattr
+
+
+# Bausteine für den inkrementellen JSON-Scanner; jeder Chunk wird nur einmal durchlaufen
+# Als "unrolled loop": eindeutig zerlegbar, daher kein exponentielles Backtracking bei offenen Strings
+JSON_STRING_BODY = r'[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*'
+JSON_TOKEN_PATTERN = re.compile(r'[ \t\r\n]*(?:([{}\[\],:])|("' + JSON_STRING_BODY + r'")|([^\s{}\[\],:"]+))')
+JSON_WHITESPACE = re.compile(r"[ \t\r\n]*")
+JSON_STRING_PART = re.compile(JSON_STRING_BODY)
+JSON_ESCAPE_PREFIX = re.compile(r"\\(?:u[0-9a-fA-F]{0,3})?")
+JSON_LITERAL_PART = re.compile(r'[^\s{}\[\],:"]*')
+JSON_LITERAL = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null")
+JSON_CLOSERS = {"{": "}", "[": "]"}
+
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
+
+def _decode_chunks(chunks, encoding):
+    # bytes-Chunks inkrementell dekodieren (Multibyte-Zeichen dürfen auf Chunk-Grenzen liegen)
+    decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    for chunk in chunks:
+        yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+    yield decoder.decode(b"", final=True)
+
+
+class _JsonPrettyPrinter:
+    """Zustandsautomat für iter_pretty_json, der Text in beliebigen Stücken annimmt.
+
+    Nur ein String oder Literal am Ende eines Stücks bleibt offen: der String wird
+    fortlaufend ausgegeben, das Literal aus seinen Teilen zusammengesetzt. Kein
+    Zeichen wird ein zweites Mal gescannt. expect ist "value", "key", "colon",
+    "after" (Komma oder schließende Klammer) oder "done".
+    """
+
+    def __init__(self, indent):
+        self.indent = indent
+        self.out = []
+        self.out_size = 0
+        self.lines = 1
+        self.stack = []
+        self.breaks = ["\n"]  # Zeilenumbruch plus Einrückung je Tiefe
+        self.expect = "value"
+        self.pending_open = False  # geöffneter Container, dessen Zeilenumbruch noch aussteht
+        self.in_string = False
+        self.string_is_key = False
+        self.carry = ""  # angefangene Escape-Sequenz am Ende eines Stücks
+        self.literal = []  # Teile eines Literals, das im nächsten Stück weitergehen kann
+        self.position = 0  # Zeichen vor dem aktuellen Stück
+
+    def _error(self, message, pos):
+        return ValueError(f"{message} an Position {self.position + pos}")
+
+    def _value_done(self):
+        self.expect = "after" if self.stack else "done"
+
+    def _finish_literal(self, token, pos):
+        if not JSON_LITERAL.fullmatch(token):
+            raise self._error(f"Ungültiger Wert '{token[:20]}'", pos)
+        self.out.append(token)
+        self.out_size += len(token)
+        self._value_done()
+
+    def _scan_string(self, text, pos):
+        # Gibt den String bis zum Stückende bzw. bis zum schließenden Anführungszeichen aus
+        stop = JSON_STRING_PART.match(text, pos).end()
+        if stop > pos:
+            self.out.append(text[pos:stop])
+            self.out_size += stop - pos
+        if stop == len(text):
+            return stop
+        char = text[stop]
+        if char == '"':
+            self.out.append('"')
+            self.in_string = False
+            if self.string_is_key:
+                self.expect = "colon"
+            else:
+                self._value_done()
+            return stop + 1
+        if char == "\\" and JSON_ESCAPE_PREFIX.fullmatch(text, stop):
+            # Escape-Sequenz über die Stückgrenze: mit dem nächsten Stück fortsetzen
+            self.carry = text[stop:]
+            return len(text)
+        if char == "\\":
+            raise self._error("Ungültige Escape-Sequenz", stop)
+        raise self._error("Steuerzeichen im String", stop)
+
+    def feed(self, text):
+        if self.carry:
+            text, self.carry = self.carry + text, ""
+        end = len(text)
+        pos = 0
+        if self.in_string:
+            pos = self._scan_string(text, pos)
+        elif self.literal:
+            match = JSON_LITERAL_PART.match(text)
+            self.literal.append(match.group())
+            pos = match.end()
+            if pos < end:
+                self._finish_literal("".join(self.literal), pos)
+                self.literal = []
+        if pos < end and not self.in_string and not self.literal:
+            self._feed_tokens(text, pos)
+        self.position += end - len(self.carry)
+
+    def _feed_tokens(self, text, pos):
+        # Heiße Schleife: Zustand in lokalen Variablen, ein Regex-Match pro Token
+        out = self.out
+        append = out.append
+        stack = self.stack
+        breaks = self.breaks
+        expect = self.expect
+        pending_open = self.pending_open
+        lines = self.lines
+        out_size = self.out_size
+        end = len(text)
+        match_token = JSON_TOKEN_PATTERN.match
+        try:
+            while True:
+                match = match_token(text, pos)
+                if match is None:
+                    pos = JSON_WHITESPACE.match(text, pos).end()
+                    if pos == end:
+                        return
+                    if text[pos] != '"':
+                        raise self._error(f"Ungültiges Zeichen {text[pos]!r}", pos)
+                    # String geht über das Stückende hinaus (oder ist ungültig)
+                    token, kind = '"', 2
+                else:
+                    kind = match.lastindex
+                    token = match.group(kind)
+                    pos = match.end()
+                first = token[0]
+                if expect == "done":
+                    raise self._error(f"Unerwartetes '{first}' nach dem Ende", pos - len(token))
+
+                if pending_open:
+                    pending_open = False
+                    if first == JSON_CLOSERS[stack[-1]]:
+                        # Leerer Container bleibt auf einer Zeile
+                        stack.pop()
+                        append(first)
+                        expect = "after" if stack else "done"
+                        continue
+                    depth = len(stack)
+                    if depth >= len(breaks):
+                        breaks.append("\n" + " " * (self.indent * depth))
+                    append(breaks[depth])
+                    lines += 1
+
+                if kind == 2:
+                    if expect == "key":
+                        expect = "colon"
+                    elif expect == "value":
+                        expect = "after" if stack else "done"
+                    else:
+                        raise self._error("Unerwarteter String", pos - len(token))
+                    if match is None:
+                        self.string_is_key = expect == "colon"
+                        self.in_string = True
+                        append('"')
+                        pos += 1
+                        break
+                    append(token)
+                    out_size += len(token)
+                elif kind == 3:
+                    if expect != "value":
+                        message = "Schlüssel muss ein String sein" if expect == "key" else "Unerwarteter Wert"
+                        raise self._error(message, pos - len(token))
+                    if pos == end:
+                        # Literal kann im nächsten Stück weitergehen
+                        pos -= len(token)
+                        break
+                    if not JSON_LITERAL.fullmatch(token):
+                        raise self._error(f"Ungültiger Wert '{token[:20]}'", pos - len(token))
+                    append(token)
+                    out_size += len(token)
+                    expect = "after" if stack else "done"
+                elif first == "{" or first == "[":
+                    if expect != "value":
+                        raise self._error(f"Unerwartetes '{first}'", pos - 1)
+                    stack.append(first)
+                    append(first)
+                    pending_open = True
+                    expect = "key" if first == "{" else "value"
+                elif first == "}" or first == "]":
+                    if expect != "after" or JSON_CLOSERS[stack[-1]] != first:
+                        raise self._error(f"Unerwartetes '{first}'", pos - 1)
+                    stack.pop()
+                    append(breaks[len(stack)])
+                    append(first)
+                    lines += 1
+                    expect = "after" if stack else "done"
+                elif first == ",":
+                    if expect != "after":
+                        raise self._error("Unerwartetes ','", pos - 1)
+                    append(",")
+                    append(breaks[len(stack)])
+                    lines += 1
+                    expect = "key" if stack[-1] == "{" else "value"
+                else:
+                    if expect != "colon":
+                        raise self._error("Unerwartetes ':'", pos - 1)
+                    append(": ")
+                    expect = "value"
+        finally:
+            self.expect = expect
+            self.pending_open = pending_open
+            self.lines = lines
+            self.out_size = out_size
+
+        # Offenes Literal oder offener String am Stückende
+        if self.in_string:
+            self._scan_string(text, pos)
+        else:
+            self.literal = [text[pos:]]
+
+    def close(self):
+        if self.literal:
+            self._finish_literal("".join(self.literal), 0)
+            self.literal = []
+        if self.in_string:
+            raise ValueError(f"Unvollständiges JSON: String nicht abgeschlossen (Position {self.position})")
+        if self.stack:
+            raise ValueError("Unvollständiges JSON: nicht geschlossene Klammern")
+        if self.expect != "done" and self.out:
+            raise ValueError(f"Unvollständiges JSON an Position {self.position}")
+
+
+def iter_pretty_json(chunks, indent=2, max_lines=None, encoding=None):
+    """Formatiert einen JSON-Body stückweise mit Einrückung.
+
+    Liefert Strings von ca. OUTPUT_CHUNK_SIZE Zeichen, auch innerhalb langer
+    Strings. Mit max_lines endet die Ausgabe nach so vielen Zeilen. Löst
+    ValueError bei ungültigem JSON aus; bis dahin erzeugte Chunks wurden dann
+    bereits geliefert. Ein leerer Body ergibt keine Ausgabe.
+    """
+    printer = _JsonPrettyPrinter(indent)
+    for text in _decode_chunks(chunks, encoding):
+        # Große Stücke aufteilen, damit regelmäßig etwas geliefert wird (Abbruch im Render-Worker)
+        for start in range(0, len(text), OUTPUT_CHUNK_SIZE):
+            printer.feed(text[start : start + OUTPUT_CHUNK_SIZE])
+            if max_lines is not None and printer.lines > max_lines:
+                yield "".join(printer.out).rsplit("\n", printer.lines - max_lines)[0]
+                return
+            if printer.out_size >= OUTPUT_CHUNK_SIZE:
+                yield "".join(printer.out)
+                printer.out.clear()
+                printer.out_size = 0
+    printer.close()
+    if printer.out:
+        yield "".join(printer.out)
+
+
+class _XmlPrettyPrinter:
+    """Expat-Handler, die eingerückten XML-Text in eine Ausgabeliste schreiben"""
+
+    def __init__(self, indent):
+        self.indent = indent
+        self.out = []
+        self.started = False
+        self.depth = 0
+        self.open_tag = False  # Start-Tag ohne schließendes ">" (noch kein Inhalt)
+        self.has_children = []
+        self.text = []
+        self.in_cdata = False
+
+    def bind(self, parser):
+        parser.ordered_attributes = True
+        parser.XmlDeclHandler = self.xml_decl
+        parser.StartDoctypeDeclHandler = self.doctype
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.characters
+        parser.CommentHandler = self.comment
+        parser.ProcessingInstructionHandler = self.processing_instruction
+        parser.StartCdataSectionHandler = self.start_cdata
+        parser.EndCdataSectionHandler = self.end_cdata
+
+    def _line(self, content):
+        if self.started:
+            self.out.append("\n")
+        self.started = True
+        self.out.append(" " * (self.indent * self.depth) + content)
+
+    def _close_open_tag(self):
+        if self.open_tag:
+            self.out.append(">")
+            self.open_tag = False
+
+    def _flush_text(self):
+        # Text zwischen Kind-Elementen bekommt eine eigene Zeile, reiner Leerraum entfällt
+        text = "".join(self.text).strip()
+        self.text = []
+        if text:
+            self._close_open_tag()
+            self._line(text)
+
+    def _child(self, content):
+        self._flush_text()
+        self._close_open_tag()
+        if self.has_children:
+            self.has_children[-1] = True
+        self._line(content)
+
+    def xml_decl(self, version, encoding, standalone):
+        decl = f'<?xml version="{version or "1.0"}"'
+        if encoding:
+            decl += f' encoding="{encoding}"'
+        if standalone != -1:
+            decl += f' standalone="{"yes" if standalone else "no"}"'
+        self._line(decl + "?>")
+
+    def doctype(self, name, system_id, public_id, has_internal_subset):
+        if public_id:
+            self._line(f'<!DOCTYPE {name} PUBLIC "{public_id}" "{system_id}">')
+        elif system_id:
+            self._line(f'<!DOCTYPE {name} SYSTEM "{system_id}">')
+        else:
+            self._line(f"<!DOCTYPE {name}>")
+
+    def start(self, name, attributes):
+        attrs = "".join(
+            f" {attributes[i]}={quoteattr(attributes[i + 1])}" for i in range(0, len(attributes), 2)
+        )
+        self._child(f"<{name}{attrs}")
+        self.open_tag = True
+        self.depth += 1
+        self.has_children.append(False)
+
+    def end(self, name):
+        if not self.has_children.pop():
+            # Blatt-Element: Text bleibt auf derselben Zeile
+            text = "".join(self.text).strip()
+            self.text = []
+            self.depth -= 1
+            self.out.append(f">{text}</{name}>" if text else "/>")
+            self.open_tag = False
+            return
+        self._flush_text()
+        self.depth -= 1
+        self._line(f"</{name}>")
+
+    def characters(self, data):
+        self.text.append(data if self.in_cdata else escape(data))
+
+    def start_cdata(self):
+        self.in_cdata = True
+        self.text.append("<![CDATA[")
+
+    def end_cdata(self):
+        self.in_cdata = False
+        self.text.append("]]>")
+
+    def comment(self, data):
+        self._child(f"<!--{data}-->")
+
+    def processing_instruction(self, target, data):
+        self._child(f"<?{target} {data}?>" if data else f"<?{target}?>")
+
+
+def iter_pretty_xml(chunks, indent=2, max_lines=None, encoding=None):
+    """Formatiert einen XML-Body stückweise mit Einrückung (ereignisbasiert über expat).
+
+    Ohne encoding erkennt expat die Kodierung aus BOM bzw. XML-Deklaration.
+    Löst ValueError mit Zeile und Spalte aus, wenn das XML ungültig ist; bis
+    dahin erzeugte Chunks wurden dann bereits geliefert.
+    """
+    parser = expat.ParserCreate(encoding)
+    printer = _XmlPrettyPrinter(indent)
+    printer.bind(parser)
+    lines = 1
+
+    def feed(data, final=False):
+        try:
+            parser.Parse(data, final)
+        except expat.ExpatError as e:
+            raise ValueError(
+                f"Ungültiges XML in Zeile {e.lineno}, Spalte {e.offset + 1}: {expat.ErrorString(e.code)}"
+            ) from None
+
+    for chunk in chunks:
+        feed(chunk)
+        if sum(map(len, printer.out)) < OUTPUT_CHUNK_SIZE:
+            continue
+        text = "".join(printer.out)
+        printer.out.clear()
+        # Das letzte Element kann noch ein offenes Start-Tag sein, es wird im nächsten Chunk fortgesetzt
+        lines += text.count("\n")
+        if max_lines is not None and lines > max_lines:
+            yield text.rsplit("\n", lines - max_lines)[0]
+            return
+        yield text
+
+    feed(b"", final=True)
+    text = "".join(printer.out)
+    lines += text.count("\n")
+    if max_lines is not None and lines > max_lines:
+        text = text.rsplit("\n", lines - max_lines)[0]
+    if text:
+        yield text
+
+
+class RenderWorker:
+    """Führt Formatierungs-Aufträge in einem Hintergrund-Thread aus.
+
+    Ein Auftrag ist eine Funktion, die einen Generator von (art, daten)-Paaren
+    liefert. Die Paare landen als (generation, art, daten) in `results`, das die
+    GUI pollt. Jeder neue Auftrag (und cancel()) macht ältere ungültig: sie werden
+    beim nächsten Schritt abgebrochen, ihre restlichen Ergebnisse sind veraltet.
+    Nach jedem Auftrag folgt ("done", fehler_oder_None).
+    """
+
+    def __init__(self, max_pending=64):
+        self.results = queue.Queue(maxsize=max_pending)
+        self._jobs = queue.Queue()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="render-worker", daemon=True)
+        self._thread.start()
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def submit(self, job):
+        """Plant einen Auftrag ein und gibt seine Generation zurück"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._jobs.put((generation, job))
+        return generation
+
+    def cancel(self):
+        """Macht alle laufenden und wartenden Aufträge ungültig"""
+        with self._lock:
+            self._generation += 1
+
+    def close(self):
+        self.cancel()
+        self._jobs.put(None)
+
+    def _put(self, generation, kind, data):
+        # Volle Queue bremst den Worker, ein veralteter Auftrag gibt dabei auf
+        while generation == self._generation:
+            try:
+                self.results.put((generation, kind, data), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self):
+        while True:
+            entry = self._jobs.get()
+            if entry is None:
+                return
+            generation, job = entry
+            if generation != self._generation:
+                continue
+
+            error = None
+            try:
+                for kind, data in job():
+                    if not self._put(generation, kind, data):
+                        break
+            except Exception as e:
+                error = e
+            self._put(generation, "done", error)
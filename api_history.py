@@ -0,0 +1,599 @@
+"""
+API History - Persistente Request-History in SQLite
+
+Einträge werden über eine Queue an einen Writer-Thread übergeben und dort
+gebündelt in einer Transaktion geschrieben, damit das Senden von Requests nie
+auf die Platte warten muss. Gelesen wird über eine eigene Verbindung (WAL-Modus,
+Lesen blockiert das Schreiben nicht):
+
+    store = HistoryStore("history.db", max_entries=10000, max_days=30)
+    entry = store.add({"method": "GET", "url": "https://api.example.com/users", "status": 200})
+    store.flush()
+    store.search("users")
+
+Für große Listen liefert ids() nur die passenden IDs; die Einträge selbst werden
+mit get_many() seitenweise nachgeladen.
+
+Request- und Response-Bodies liegen komprimiert in einem BodyStore: gleiche
+Bodies (z.B. beim wiederholten Abfragen eines Endpunkts) werden nur einmal
+gespeichert, bei vollem Speicherbudget fallen die am längsten unbenutzten weg.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
+
+from api_redact import REDACTED_VALUE, redact_headers, redact_request, redact_url, sensitive_names
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    status INTEGER,
+    time REAL,
+    timings TEXT,
+    request TEXT,
+    request_body TEXT,
+    response TEXT,
+    response_body TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_created ON history (created);
+CREATE INDEX IF NOT EXISTS idx_history_method ON history (method);
+CREATE INDEX IF NOT EXISTS idx_history_host ON history (host);
+CREATE INDEX IF NOT EXISTS idx_history_status ON history (status);
+CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5 (url, body);
+CREATE VIRTUAL TABLE IF NOT EXISTS history_trigram USING fts5 (method, url, status, tokenize = 'trigram');
+CREATE TABLE IF NOT EXISTS bodies (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bodies_last_used ON bodies (last_used);
+"""
+
+# Tabellen, aus denen ein Eintrag beim Löschen entfernt wird (Spalte mit der Eintrags-ID)
+TABLES = (("history_fts", "rowid"), ("history_trigram", "rowid"), ("history", "id"))
+
+COLUMNS = (
+    "id",
+    "created",
+    "method",
+    "url",
+    "host",
+    "status",
+    "time",
+    "timings",
+    "request",
+    "request_body",
+    "response",
+    "response_body",
+)
+
+# Spalten, die als JSON gespeichert werden
+JSON_COLUMNS = ("timings", "request", "response")
+
+# Response-Bodies dieser Content-Types kommen in die Volltextsuche, höchstens die ersten MAX_INDEXED_RESPONSE Bytes
+INDEXED_CONTENT_TYPES = ("text/", "json", "xml", "javascript", "x-www-form-urlencoded", "graphql")
+MAX_INDEXED_RESPONSE = 256 * 1024
+
+
+def search_condition(text):
+    """WHERE-Bedingung für die Suche: jedes Wort muss vorkommen.
+
+    Ein Wort passt als Teilstring in Methode, URL oder Status (Trigram-Index, bei
+    weniger als drei Zeichen per LIKE) oder als Wortanfang im Request- oder
+    Response-Body (nur Text-Bodies, siehe INDEXED_CONTENT_TYPES).
+    """
+    conditions, params = [], []
+    for term in text.replace('"', " ").split():
+        if len(term) >= 3:
+            substring = "h.id IN (SELECT rowid FROM history_trigram WHERE history_trigram MATCH ?)"
+            params.append(f'"{term}"')
+        else:
+            pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            substring = (
+                "(h.method LIKE ? ESCAPE '\\' OR h.url LIKE ? ESCAPE '\\' "
+                "OR CAST(h.status AS TEXT) LIKE ? ESCAPE '\\')"
+            )
+            params.extend((pattern, pattern, pattern))
+        conditions.append(
+            f"({substring} OR h.id IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?))"
+        )
+        params.append(f'body : "{term}"*')
+    return " AND ".join(conditions) or "1", params
+
+
+class BodyStore:
+    """Content-addressed Ablage für Bodies.
+
+    Jeder Body wird über seinen SHA-256 adressiert und zlib-komprimiert als Datei
+    abgelegt; die Metadaten (Größe, letzte Nutzung) stehen in der Tabelle
+    "bodies". Schreiben und Aufräumen laufen nur im Writer-Thread der History.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, directory, db, budget):
+        self.directory = directory
+        self.db = db
+        self.budget = budget
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".z")
+
+    def put(self, open_chunks):
+        """Speichert einen Body und gibt seinen Hash zurück.
+
+        open_chunks() liefert bei jedem Aufruf einen neuen Iterator über die bytes:
+        zuerst wird nur gehasht, komprimiert wird nur, was noch nicht vorhanden ist.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in open_chunks():
+            digest.update(chunk)
+            size += len(chunk)
+        key = digest.hexdigest()
+        path = self._path(key)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    compressor = zlib.compressobj(6)
+                    for chunk in open_chunks():
+                        f.write(compressor.compress(chunk))
+                    f.write(compressor.flush())
+                os.replace(temp_path, path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+
+        self.db.execute(
+            "INSERT INTO bodies (hash, size, stored_size, last_used) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (hash) DO UPDATE SET last_used = excluded.last_used",
+            (key, size, os.path.getsize(path), time.time()),
+        )
+        return key
+
+    def touch(self, key):
+        self.db.execute("UPDATE bodies SET last_used = ? WHERE hash = ?", (time.time(), key))
+
+    def iter_bytes(self, key):
+        """Liest einen Body stückweise dekomprimiert (auch aus anderen Threads)"""
+        decompressor = zlib.decompressobj()
+        with open(self._path(key), "rb") as f:
+            while True:
+                chunk = f.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                data = decompressor.decompress(chunk)
+                if data:
+                    yield data
+        rest = decompressor.flush()
+        if rest:
+            yield rest
+
+    def _remove(self, keys):
+        for key in keys:
+            self.db.execute("DELETE FROM bodies WHERE hash = ?", (key,))
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def collect_garbage(self):
+        """Entfernt Bodies ohne History-Eintrag"""
+        rows = self.db.execute(
+            "SELECT hash FROM bodies WHERE hash NOT IN ("
+            "SELECT request_body FROM history WHERE request_body IS NOT NULL "
+            "UNION SELECT response_body FROM history WHERE response_body IS NOT NULL)"
+        ).fetchall()
+        self._remove(row[0] for row in rows)
+
+    def evict(self):
+        """Verwirft die am längsten unbenutzten Bodies, bis das Budget eingehalten ist.
+
+        Zuerst nur Response-Bodies; Request-Bodies erst, wenn das Budget anders nicht
+        erreichbar ist, denn ohne sie lässt sich ein Request nicht erneut senden.
+        """
+        total = self.db.execute("SELECT COALESCE(SUM(stored_size), 0) FROM bodies").fetchone()[0]
+        if not self.budget or total <= self.budget:
+            return
+        passes = (
+            "SELECT hash, stored_size FROM bodies WHERE hash NOT IN "
+            "(SELECT request_body FROM history WHERE request_body IS NOT NULL) ORDER BY last_used",
+            "SELECT hash, stored_size FROM bodies ORDER BY last_used",
+        )
+        evicted = set()
+        for sql in passes:
+            for key, stored_size in self.db.execute(sql):
+                if total <= self.budget:
+                    break
+                if key not in evicted:
+                    evicted.add(key)
+                    total -= stored_size
+        self._remove(evicted)
+
+    def clear(self):
+        self._remove([row[0] for row in self.db.execute("SELECT hash FROM bodies").fetchall()])
+
+
+class HistoryStore:
+    """History-Datenbank mit gebündeltem Schreiben im Hintergrund"""
+
+    BATCH_SIZE = 500
+    BATCH_DELAY = 0.2  # Sekunden, die der Writer auf weitere Einträge wartet
+
+    def __init__(self, path, max_entries=10000, max_days=30, body_budget=200 * 1024 * 1024, body_dir=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_days = max_days
+        self._queue = queue.Queue()
+
+        # Eigene Verbindung für den Writer-Thread, Lesen über _db
+        self._write_db = sqlite3.connect(path, check_same_thread=False)
+        self._write_db.execute("PRAGMA journal_mode=WAL")
+        self._write_db.executescript(SCHEMA)
+        self._migrate()
+        self.bodies = BodyStore(body_dir or os.path.splitext(path)[0] + "_bodies", self._write_db, body_budget)
+        self._removed = False
+        with self._write_db:
+            # Trigram-Index für Datenbanken aus älteren Versionen nachträglich aufbauen
+            if not self._write_db.execute("SELECT 1 FROM history_trigram LIMIT 1").fetchone():
+                self._write_db.execute(
+                    "INSERT INTO history_trigram (rowid, method, url, status) "
+                    "SELECT id, method, url, status FROM history"
+                )
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        # IDs werden sofort vergeben, damit Einträge vor dem Schreiben referenziert werden können
+        self._next_id = (self._db.execute("SELECT MAX(id) FROM history").fetchone()[0] or 0) + 1
+        self._id_lock = threading.Lock()
+        # Übergebene, aber noch nicht geschriebene Einträge (für get_many)
+        self._pending = {}
+
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+
+    def _migrate(self):
+        # Spalten, die in älteren Datenbanken noch fehlen
+        existing = {row[1] for row in self._write_db.execute("PRAGMA table_info(history)")}
+        with self._write_db:
+            for column in COLUMNS:
+                if column not in existing:
+                    self._write_db.execute(f"ALTER TABLE history ADD COLUMN {column} TEXT")
+
+    # ---- Schreiben (asynchron) ----
+
+    def add(self, entry, response=None):
+        """Legt einen Eintrag an und gibt ihn mit "id", "created" und "host" zurück.
+
+        entry enthält method, url, status, time und optional timings (Dict) sowie
+        request (Request-Daten im Format von get_current_request_data()). Eine
+        ApiResponse wird samt Body gespeichert; sie bleibt bis dahin offen, auch
+        wenn sie zwischenzeitlich geschlossen wird. Zugangsdaten (Auth-Daten,
+        Authorization, Cookies, API-Key) werden vorher ersetzt, siehe api_redact.
+        """
+        with self._id_lock:
+            entry_id = self._next_id
+            self._next_id += 1
+        # Zugangsdaten gelangen weder in die Datenbank noch in die Anzeige
+        request = entry.get("request") or {}
+        entry = dict(entry, id=entry_id, url=redact_url(entry["url"], sensitive_names(request)))
+        if request:
+            entry["request"] = redact_request(request)
+        entry.setdefault("created", time.time())
+        entry.setdefault("host", (urlsplit(entry["url"]).hostname or "").lower())
+        self._pending[entry_id] = entry
+        if response is not None:
+            response.hold()
+        self._queue.put(("add", (entry, response)))
+        return entry
+
+    def update_timings(self, entry_id, timings):
+        """Aktualisiert die gespeicherten Phasen-Zeiten (z.B. nach dem Rendern)"""
+        self._queue.put(("timings", (entry_id, dict(timings))))
+
+    def delete(self, entry_id):
+        self._queue.put(("delete", entry_id))
+
+    def clear(self):
+        self._queue.put(("clear", None))
+
+    def configure(self, max_entries=None, max_days=None, body_budget=None):
+        """Übernimmt neue Aufbewahrungsregeln (angewendet beim nächsten Schreiben)"""
+        if max_entries is not None:
+            self.max_entries = max_entries
+        if max_days is not None:
+            self.max_days = max_days
+        if body_budget is not None:
+            self.bodies.budget = body_budget
+        self._queue.put(("prune", None))
+
+    def flush(self):
+        """Wartet, bis alle bisher übergebenen Änderungen geschrieben sind"""
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        done.wait()
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+        self._write_db.close()
+        self._db.close()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            # Weitere Einträge kurz sammeln und gemeinsam schreiben
+            deadline = time.monotonic() + self.BATCH_DELAY
+            while batch[-1] is not None and len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            events = []
+            added = []
+            with self._write_db:
+                for item in batch:
+                    if item is None:
+                        break
+                    action, data = item
+                    if action == "flush":
+                        events.append(data)
+                    else:
+                        self._apply(action, data)
+                    if action == "add":
+                        added.append(data[0]["id"])
+                self._prune()
+                if self._removed:
+                    self.bodies.collect_garbage()
+                    self._removed = False
+                self.bodies.evict()
+            for entry_id in added:
+                self._pending.pop(entry_id, None)
+            for event in events:
+                event.set()
+            if batch[-1] is None:
+                return
+
+    def _apply(self, action, data):
+        db = self._write_db
+        if action == "add":
+            self._insert(*data)
+        elif action == "timings":
+            entry_id, timings = data
+            db.execute("UPDATE history SET timings = ? WHERE id = ?", (json.dumps(timings), entry_id))
+        elif action == "touch":
+            self.bodies.touch(data)
+        elif action == "delete":
+            self._delete_where("= ?", (data,))
+        elif action == "clear":
+            for table, _ in TABLES:
+                db.execute(f"DELETE FROM {table}")
+            self.bodies.clear()
+
+    def _insert(self, entry, response):
+        request = dict(entry.get("request") or {})
+        body = request.pop("body", None) or ""
+        if not isinstance(body, str):
+            body = json.dumps(body)
+        encoded = body.encode("utf-8")
+        request_body = self.bodies.put(lambda: [encoded]) if body else None
+
+        response_meta, response_body, response_text = None, None, ""
+        if response is not None:
+            try:
+                response_body = self.bodies.put(response.iter_bytes)
+                content_type = response.content_type.lower()
+                if any(kind in content_type for kind in INDEXED_CONTENT_TYPES):
+                    response_text = response.preview_text(MAX_INDEXED_RESPONSE)
+                response_meta = {
+                    "reason": response.reason,
+                    "headers": redact_headers(response.headers, sensitive_names(request)),
+                    "encoding": response.encoding,
+                    "cookies": dict.fromkeys(response.cookies, REDACTED_VALUE),
+                    "size": response.size,
+                    "wire_size": response.wire_size,
+                    "decode_time": response.decode_time,
+                    "http_version": response.http_version,
+                }
+            except (OSError, ValueError):
+                pass  # Body nicht mehr lesbar, der Eintrag wird ohne Response gespeichert
+            finally:
+                response.release()
+
+        self._write_db.execute(
+            f"INSERT INTO history ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+            (
+                entry["id"],
+                entry["created"],
+                entry["method"],
+                entry["url"],
+                entry["host"],
+                entry.get("status"),
+                entry.get("time"),
+                json.dumps(entry.get("timings") or {}),
+                json.dumps(request),
+                request_body,
+                json.dumps(response_meta),
+                response_body,
+            ),
+        )
+        self._write_db.execute(
+            "INSERT INTO history_fts (rowid, url, body) VALUES (?, ?, ?)",
+            (entry["id"], entry["url"], f"{body}\n{response_text}" if response_text else body),
+        )
+        self._write_db.execute(
+            "INSERT INTO history_trigram (rowid, method, url, status) VALUES (?, ?, ?, ?)",
+            (entry["id"], entry["method"], entry["url"], entry.get("status")),
+        )
+
+    def _delete_where(self, condition, params):
+        # Löscht Einträge, deren ID die Bedingung erfüllt, aus History und beiden Suchindizes
+        for table, column in TABLES:
+            cursor = self._write_db.execute(f"DELETE FROM {table} WHERE {column} {condition}", params)
+            self._removed = self._removed or cursor.rowcount > 0
+
+    def _prune(self):
+        # Aufbewahrung: zuerst nach Alter, dann nach Anzahl
+        db = self._write_db
+        if self.max_days:
+            cutoff = time.time() - self.max_days * 86400
+            self._delete_where("IN (SELECT id FROM history WHERE created < ?)", (cutoff,))
+        if self.max_entries:
+            row = db.execute(
+                "SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?", (self.max_entries,)
+            ).fetchone()
+            if row:
+                self._delete_where("<= ?", (row[0],))
+
+    # ---- Lesen ----
+
+    def _rows(self, sql, params=()):
+        with self._db_lock:
+            rows = self._db.execute(sql, params).fetchall()
+        entries = []
+        for row in rows:
+            entry = dict(zip(COLUMNS, row))
+            for column in JSON_COLUMNS:
+                entry[column] = json.loads(entry[column] or "null") or {}
+            entries.append(entry)
+        return entries
+
+    def recent(self, limit=100, offset=0):
+        """Neueste Einträge zuerst"""
+        return self._rows(
+            f"SELECT {', '.join(COLUMNS)} FROM history ORDER BY id DESC LIMIT ? OFFSET ?", (limit, offset)
+        )
+
+    def ids(self, text=""):
+        """IDs aller (zum Suchtext passenden) Einträge, neueste zuerst"""
+        condition, params = search_condition(text)
+        with self._db_lock:
+            rows = self._db.execute(f"SELECT h.id FROM history h WHERE {condition} ORDER BY h.id DESC", params)
+            return [row[0] for row in rows]
+
+    def get_many(self, ids):
+        """Einträge zu den IDs in derselben Reihenfolge (gelöschte fehlen)"""
+        found = {entry_id: self._pending[entry_id] for entry_id in ids if entry_id in self._pending}
+        missing = [entry_id for entry_id in ids if entry_id not in found]
+        # In Blöcken abfragen, SQLite begrenzt die Anzahl der Parameter
+        for start in range(0, len(missing), 500):
+            block = missing[start : start + 500]
+            placeholders = ", ".join("?" * len(block))
+            for entry in self._rows(f"SELECT {', '.join(COLUMNS)} FROM history WHERE id IN ({placeholders})", block):
+                found[entry["id"]] = entry
+        return [found[entry_id] for entry_id in ids if entry_id in found]
+
+    def search(self, text, limit=100):
+        """Suche über Methode, URL, Status sowie Request- und Response-Body, neueste Treffer zuerst"""
+        condition, params = search_condition(text)
+        columns = ", ".join(f"h.{column}" for column in COLUMNS)
+        return self._rows(
+            f"SELECT {columns} FROM history h WHERE {condition} ORDER BY h.id DESC LIMIT ?", (*params, limit)
+        )
+
+    def query(self, method=None, host=None, status=None, since=None, limit=100):
+        """Filtert über die indizierten Spalten (z.B. alle 5xx eines Hosts der letzten Woche)"""
+        conditions, params = [], []
+        if method:
+            conditions.append("method = ?")
+            params.append(method.upper())
+        if host:
+            conditions.append("host = ?")
+            params.append(host.lower())
+        if status is not None:
+            low, high = status if isinstance(status, tuple) else (status, status)
+            conditions.append("status BETWEEN ? AND ?")
+            params.extend((low, high))
+        if since is not None:
+            conditions.append("created >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._rows(
+            f"SELECT {', '.join(COLUMNS)} FROM history {where} ORDER BY id DESC LIMIT ?", (*params, limit)
+        )
+
+    def count(self):
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    # ---- Wiederherstellen ----
+
+    def _stored(self, entry):
+        # Noch nicht geschriebene Einträge erst schreiben lassen
+        if entry["id"] in self._pending:
+            self.flush()
+        entries = self.get_many([entry["id"]])
+        return entries[0] if entries else entry
+
+    def load_request(self, entry):
+        """Vollständige Request-Daten eines Eintrags (inkl. Body).
+
+        Wurde der Body inzwischen verdrängt, ist "body_missing" gesetzt.
+        """
+        entry = self._stored(entry)
+        request = dict(entry.get("request") or {})
+        key = entry.get("request_body")
+        if key:
+            try:
+                request["body"] = b"".join(self.bodies.iter_bytes(key)).decode("utf-8")
+            except FileNotFoundError:
+                request["body_missing"] = True
+        return request
+
+    def load_response(self, entry, spool_size=1024 * 1024):
+        """Stellt die gespeicherte Response als ApiResponse wieder her (None, wenn verworfen)"""
+        # Erst hier importiert: die History soll beim Start nicht requests nachladen
+        from requests.structures import CaseInsensitiveDict
+
+        from api_engine import ApiResponse
+
+        entry = self._stored(entry)
+        meta, key = entry.get("response"), entry.get("response_body")
+        if not meta or not key:
+            return None
+
+        body = tempfile.SpooledTemporaryFile(max_size=spool_size)
+        size = 0
+        try:
+            for chunk in self.bodies.iter_bytes(key):
+                body.write(chunk)
+                size += len(chunk)
+        except FileNotFoundError:
+            # Verdrängt (der Writer-Thread räumt unabhängig vom Lesen auf)
+            body.close()
+            return None
+        self._queue.put(("touch", key))
+        return ApiResponse(
+            method=entry["method"],
+            url=entry["url"],
+            status_code=entry["status"],
+            reason=meta.get("reason", ""),
+            headers=CaseInsensitiveDict(meta.get("headers", {})),
+            body=body,
+            size=size,
+            elapsed=entry.get("time") or 0.0,
+            encoding=meta.get("encoding"),
+            cookies=meta.get("cookies", {}),
+            timings=entry.get("timings") or {},
+            wire_size=meta.get("wire_size"),
+            decode_time=meta.get("decode_time", 0.0),
+            http_version=meta.get("http_version", "HTTP/1.1"),
+        )
@@ -0,0 +1,523 @@
+"""
+API Loadgen - Lastgenerator mit fester Ankunftsrate (offenes Modell)
+
+Der Load Test im Fenster arbeitet geschlossen: C Worker senden jeweils erst nach
+der vorherigen Antwort erneut. Wird der Server langsamer, sinkt damit auch die
+Last, und genau die langsamen Antworten fehlen in der Statistik (Coordinated
+Omission). Hier werden Requests dagegen nach Fahrplan gestartet, unabhängig von
+den Antwortzeiten; die Latenz zählt ab dem geplanten Sendezeitpunkt und landet in
+HDR-Histogrammen mit fester relativer Genauigkeit:
+
+    profile = LoadProfile.parse("ramp:10:200:60s")
+    generator = LoadGenerator(engine, method, url, kwargs, profile)
+    stats = await generator.run()
+    print(stats.latency.percentile(99.9))
+
+Oder eigenständig:
+
+    python api_loadgen.py "My API/Users/List" --profile constant:100:30s
+    python api_loadgen.py --url http://localhost:8000/health --profile spike:50:500:60s:20s:5s
+
+Profile (Raten in Requests pro Sekunde, Dauern in s oder m):
+    constant:RATE:DAUER
+    ramp:START:ZIEL:DAUER
+    step:START:SCHRITT:STUFENDAUER:STUFEN
+    spike:BASIS:SPITZE:DAUER:BEGINN:SPITZENDAUER
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import threading
+import time
+
+from api_config import CONFIG_FILE, load_config
+
+
+# Kürzeste und längste messbare Latenz in Mikrosekunden
+HISTOGRAM_LOWEST = 1
+HISTOGRAM_HIGHEST = 3600 * 1000 * 1000
+
+# Perzentile im Report
+REPORT_PERCENTILES = (50, 90, 99, 99.9, 99.99)
+
+
+class LatencyHistogram:
+    """HDR-Histogramm für Latenzen: log-lineare Buckets mit fester relativer Genauigkeit.
+
+    Werte werden in Mikrosekunden gezählt; mit significant_digits=3 liegt jeder
+    gemeldete Wert höchstens 0,1 % neben dem gemessenen, unabhängig von der
+    Größenordnung. Der Speicherbedarf ist fest (rund 23.000 Zähler für 1 µs bis 1 h)
+    und wächst nicht mit der Anzahl der Messungen.
+    """
+
+    def __init__(self, lowest=HISTOGRAM_LOWEST, highest=HISTOGRAM_HIGHEST, significant_digits=3):
+        self.lowest = lowest
+        self.highest = highest
+        self.significant_digits = significant_digits
+        self._unit_magnitude = int(math.log2(lowest))
+        sub_bucket_count_magnitude = math.ceil(math.log2(2 * 10**significant_digits))
+        self._sub_bucket_half_count_magnitude = sub_bucket_count_magnitude - 1
+        self._sub_bucket_count = 1 << sub_bucket_count_magnitude
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = (self._sub_bucket_count - 1) << self._unit_magnitude
+
+        bucket_count = 1
+        smallest_untrackable = self._sub_bucket_count << self._unit_magnitude
+        while smallest_untrackable <= highest:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self.counts = [0] * ((bucket_count + 1) * self._sub_bucket_half_count)
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.sum = 0
+        # Werte über highest werden als highest gezählt
+        self.clipped = 0
+
+    def _index(self, value):
+        bucket = (value | self._sub_bucket_mask).bit_length() - self._unit_magnitude
+        bucket -= self._sub_bucket_half_count_magnitude + 1
+        sub_bucket = value >> (bucket + self._unit_magnitude)
+        return ((bucket + 1) << self._sub_bucket_half_count_magnitude) + sub_bucket - self._sub_bucket_half_count
+
+    def _value_at(self, index):
+        bucket = (index >> self._sub_bucket_half_count_magnitude) - 1
+        sub_bucket = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket < 0:
+            sub_bucket -= self._sub_bucket_half_count
+            bucket = 0
+        return sub_bucket << (bucket + self._unit_magnitude)
+
+    def _highest_equivalent(self, index):
+        # Obere Grenze des Buckets: so werden Perzentile nie zu optimistisch gemeldet
+        return self._value_at(index + 1) - 1
+
+    def record(self, seconds, count=1):
+        """Zählt eine Latenz (in Sekunden)"""
+        value = max(int(seconds * 1_000_000), 0)
+        if value > self.highest:
+            value = self.highest
+            self.clipped += count
+        self.counts[self._index(value)] += count
+        self.total += count
+        self.sum += value * count
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def add(self, other):
+        """Addiert ein Histogramm mit gleicher Konfiguration (z.B. mehrerer Läufe)"""
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+        self.sum += other.sum
+        self.clipped += other.clipped
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def percentile(self, percent):
+        """Latenz in Sekunden, unter der percent Prozent der Messungen liegen"""
+        if not self.total:
+            return 0.0
+        target = max(1, math.ceil(percent / 100 * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    @property
+    def mean(self):
+        return self.sum / self.total / 1_000_000 if self.total else 0.0
+
+    def summary(self, percentiles=REPORT_PERCENTILES):
+        return {
+            "count": self.total,
+            "min": (self.min or 0) / 1_000_000,
+            "mean": self.mean,
+            "max": self.max / 1_000_000,
+            "percentiles": {str(percent): self.percentile(percent) for percent in percentiles},
+        }
+
+    def percentile_distribution(self, ticks_per_half_distance=5):
+        """Verteilung im Textformat von HdrHistogram (für den HdrHistogram-Plotter), Werte in ms"""
+        lines = [f"{'Value':>12} {'Percentile':>14} {'TotalCount':>10} {'1/(1-Percentile)':>14}", ""]
+        if not self.total:
+            return "\n".join(lines) + "\n"
+        seen = 0
+        percent = 0.0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            reached = 100.0 * seen / self.total
+            value = min(self._highest_equivalent(index), self.max) / 1000
+            # Schrittweite halbiert sich mit jeder Halbierung des Rests; 100 % meldet die Schlusszeile
+            while percent <= reached and seen < self.total:
+                inverse = 1 / (1 - percent / 100)
+                lines.append(f"{value:12.3f} {percent / 100:14.12f} {seen:10d} {inverse:14.2f}")
+                half_distance = 2 ** (int(math.log2(100 / (100 - percent))) + 1)
+                percent += 100 / (half_distance * ticks_per_half_distance)
+        lines.append(f"{self.max / 1000:12.3f} {1:14.12f} {self.total:10d}")
+        lines.append(
+            f"#[Mean    = {self.mean * 1000:12.3f}, Max = {self.max / 1000:12.3f}]\n"
+            f"#[Total count    = {self.total:12d}]"
+        )
+        return "\n".join(lines) + "\n"
+
+
+def parse_duration(text):
+    """Dauer in Sekunden aus "30", "30s", "1.5m" oder "500ms" """
+    text = text.strip().lower()
+    for suffix, factor in (("ms", 0.001), ("s", 1), ("m", 60), ("h", 3600)):
+        if text.endswith(suffix):
+            return float(text[: -len(suffix)]) * factor
+    return float(text)
+
+
+class LoadProfile:
+    """Ziel-Ankunftsrate über die Zeit, stückweise linear.
+
+    segments ist eine Liste aus (Beginn, Ende, Rate am Beginn, Rate am Ende) mit
+    Zeiten in Sekunden ab Start und Raten in Requests pro Sekunde.
+    """
+
+    KINDS = ("constant", "ramp", "step", "spike")
+
+    def __init__(self, name, segments):
+        self.name = name
+        self.segments = segments
+        self.duration = segments[-1][1] if segments else 0.0
+
+    @classmethod
+    def constant(cls, rate, duration):
+        return cls(f"constant {rate:g}/s für {duration:g}s", [(0.0, duration, rate, rate)])
+
+    @classmethod
+    def ramp(cls, start_rate, end_rate, duration):
+        return cls(f"ramp {start_rate:g} → {end_rate:g}/s über {duration:g}s", [(0.0, duration, start_rate, end_rate)])
+
+    @classmethod
+    def step(cls, start_rate, step_rate, step_duration, steps):
+        segments = []
+        for index in range(steps):
+            rate = start_rate + index * step_rate
+            segments.append((index * step_duration, (index + 1) * step_duration, rate, rate))
+        name = f"step {start_rate:g}/s +{step_rate:g}/s alle {step_duration:g}s ×{steps}"
+        return cls(name, segments)
+
+    @classmethod
+    def spike(cls, base_rate, spike_rate, duration, spike_start, spike_duration):
+        spike_end = min(spike_start + spike_duration, duration)
+        segments = [
+            (0.0, spike_start, base_rate, base_rate),
+            (spike_start, spike_end, spike_rate, spike_rate),
+            (spike_end, duration, base_rate, base_rate),
+        ]
+        name = f"spike {base_rate:g}/s, {spike_rate:g}/s ab {spike_start:g}s für {spike_duration:g}s"
+        return cls(name, [segment for segment in segments if segment[1] > segment[0]])
+
+    @classmethod
+    def parse(cls, text):
+        """Profil aus der Kurzform, z.B. "constant:100:30s" (siehe Moduldokumentation)"""
+        kind, *values = [part.strip() for part in text.split(":")]
+        arity = {"constant": 2, "ramp": 3, "step": 4, "spike": 5}
+        if kind not in arity:
+            raise ValueError(f"Unbekanntes Profil: {kind} (erlaubt: {', '.join(cls.KINDS)})")
+        if len(values) != arity[kind]:
+            raise ValueError(f"Profil {kind} erwartet {arity[kind]} Werte: {text}")
+        try:
+            if kind == "constant":
+                profile = cls.constant(float(values[0]), parse_duration(values[1]))
+            elif kind == "ramp":
+                profile = cls.ramp(float(values[0]), float(values[1]), parse_duration(values[2]))
+            elif kind == "step":
+                profile = cls.step(float(values[0]), float(values[1]), parse_duration(values[2]), int(values[3]))
+            else:
+                profile = cls.spike(
+                    float(values[0]),
+                    float(values[1]),
+                    parse_duration(values[2]),
+                    parse_duration(values[3]),
+                    parse_duration(values[4]),
+                )
+        except ValueError:
+            raise ValueError(f"Ungültige Zahl im Profil: {text}") from None
+        if profile.duration <= 0 or any(rate < 0 for segment in profile.segments for rate in segment[2:]):
+            raise ValueError(f"Profil braucht eine positive Dauer und Raten >= 0: {text}")
+        return profile
+
+    def rate_at(self, offset):
+        for start, end, start_rate, end_rate in self.segments:
+            if start <= offset < end:
+                return start_rate + (end_rate - start_rate) * (offset - start) / (end - start)
+        return 0.0
+
+    def arrivals(self):
+        """Geplante Sendezeitpunkte (Sekunden ab Start): Request k, sobald das Integral der Rate k erreicht"""
+        count = 0.0
+        target = 0
+        for start, end, start_rate, end_rate in self.segments:
+            slope = (end_rate - start_rate) / (end - start)
+            segment_count = (start_rate + end_rate) / 2 * (end - start)
+            while target < count + segment_count:
+                needed = target - count
+                if slope == 0:
+                    offset = needed / start_rate
+                else:
+                    # start_rate * u + slope / 2 * u² = needed nach u aufgelöst
+                    offset = (math.sqrt(start_rate**2 + 2 * slope * needed) - start_rate) / slope
+                yield start + offset
+                target += 1
+            count += segment_count
+
+    def expected_requests(self):
+        return sum((end - start) * (start_rate + end_rate) / 2 for start, end, start_rate, end_rate in self.segments)
+
+
+class LoadGenStats:
+    """Ergebnisse eines Laufs (thread-sicher, die GUI liest während des Laufs mit)"""
+
+    def __init__(self, profile):
+        self.profile = profile
+        # Ab geplantem Sendezeitpunkt (das, was Nutzer erleben) ...
+        self.latency = LatencyHistogram()
+        # ... und reine Antwortzeit des Servers (wie ein geschlossenes Modell messen würde);
+        # der Unterschied ist Wartezeit, z.B. auf einen freien Worker der Engine
+        self.service = LatencyHistogram()
+        # Verspätung beim Starten gegenüber dem Fahrplan (Eventloop des Lastgenerators ausgelastet)
+        self.send_lag = LatencyHistogram()
+        self.scheduled = 0
+        self.completed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.status_counts = {}
+        self.error_counts = {}
+        self.start_time = time.perf_counter()
+        self.end_time = None
+        self._lock = threading.Lock()
+
+    def record(self, intended, finished, service, status_code=None, error=None):
+        with self._lock:
+            self.completed += 1
+            self.latency.record(finished - intended)
+            self.service.record(service)
+            if error is not None:
+                self.errors += 1
+                self.error_counts[error] = self.error_counts.get(error, 0) + 1
+            else:
+                self.status_counts[status_code] = self.status_counts.get(status_code, 0) + 1
+                if status_code >= 400:
+                    self.errors += 1
+
+    def record_send(self, intended, sent):
+        with self._lock:
+            self.scheduled += 1
+            self.send_lag.record(sent - intended)
+
+    def record_dropped(self):
+        with self._lock:
+            self.scheduled += 1
+            self.dropped += 1
+
+    def finish(self):
+        self.end_time = time.perf_counter()
+
+    def summary(self):
+        with self._lock:
+            duration = (self.end_time or time.perf_counter()) - self.start_time
+            return {
+                "profile": self.profile.name,
+                "duration": duration,
+                "target_rate": self.profile.rate_at(duration) if self.end_time is None else 0.0,
+                "expected": round(self.profile.expected_requests()),
+                "scheduled": self.scheduled,
+                "completed": self.completed,
+                "in_flight": self.scheduled - self.completed - self.dropped,
+                "dropped": self.dropped,
+                "rps": self.completed / duration if duration > 0 else 0.0,
+                "errors": self.errors,
+                "error_rate": self.errors / self.completed if self.completed else 0.0,
+                "latency": self.latency.summary(),
+                "service": self.service.summary(),
+                "send_lag": self.send_lag.summary(),
+                "status_counts": dict(self.status_counts),
+                "error_counts": dict(self.error_counts),
+            }
+
+
+class LoadGenerator:
+    """Sendet einen vorbereiteten Request nach dem Fahrplan eines LoadProfile.
+
+    Jeder Request startet zu seinem geplanten Zeitpunkt als eigene Task, auch wenn
+    frühere noch laufen. Sind bereits max_in_flight Requests offen, wird der
+    geplante Request nicht gesendet, sondern als verworfen gezählt; das begrenzt
+    den Speicher, wenn der Server gar nicht mehr antwortet. Die Parallelität der
+    Engine sollte zur erwarteten Last passen (Rate × Latenz), sonst warten Requests
+    in der Engine und die Wartezeit erscheint - korrekt - als Latenz.
+    """
+
+    def __init__(self, engine, method, url, kwargs, profile, max_in_flight=10000):
+        self.engine = engine
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+        self.profile = profile
+        self.max_in_flight = max_in_flight
+        self.stats = LoadGenStats(profile)
+
+    async def run(self, stop_event=None):
+        stats = self.stats
+        loop = asyncio.get_running_loop()
+        tasks = set()
+        start = stats.start_time = time.perf_counter()
+        try:
+            for offset in self.profile.arrivals():
+                if stop_event is not None and stop_event.is_set():
+                    break
+                intended = start + offset
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if len(tasks) >= self.max_in_flight:
+                    stats.record_dropped()
+                    continue
+                task = loop.create_task(self._send(intended))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            stats.finish()
+        return stats
+
+    async def _send(self, intended):
+        sent = time.perf_counter()
+        self.stats.record_send(intended, sent)
+        try:
+            response = await self.engine.send_prepared(self.method, self.url, self.kwargs)
+        except Exception as e:
+            # Jeder Fehlschlag zählt (auch OSError einer Upload-Datei o.ä.); CancelledError ist keine Exception
+            finished = time.perf_counter()
+            self.stats.record(intended, finished, finished - sent, error=type(e).__name__)
+            return
+        self.stats.record(intended, time.perf_counter(), response.elapsed, status_code=response.status_code)
+        response.close()
+
+
+def format_report(summary, method, url):
+    """Textreport eines Laufs (auch für die GUI)"""
+    lines = [
+        f"Profil:       {summary['profile']}",
+        f"Ziel:         {method} {url}",
+        f"Dauer:        {summary['duration']:.2f} s",
+        f"Geplant:      {summary['scheduled']} / ~{summary['expected']} Requests",
+        f"Abgeschlossen:{summary['completed']:>7} ({summary['in_flight']} offen, {summary['dropped']} verworfen)",
+        f"Durchsatz:    {summary['rps']:.1f} req/s",
+        f"Fehlerrate:   {summary['error_rate'] * 100:.1f} % ({summary['errors']})",
+        "",
+        f"{'Latenz':<22}" + "".join(f"{'p' + percent:>10}" for percent in summary["latency"]["percentiles"]) + f"{'max':>10}",
+    ]
+    for key, label in (
+        ("latency", "ab geplantem Senden"),
+        ("service", "Antwortzeit Server"),
+        ("send_lag", "Sendeverzug"),
+    ):
+        histogram = summary[key]
+        values = list(histogram["percentiles"].values()) + [histogram["max"]]
+        lines.append(f"{label:<22}" + "".join(f"{value * 1000:>8.1f}ms" for value in values))
+    lines.append("")
+    lines.append("Status Codes:")
+    for status_code, count in sorted(summary["status_counts"].items()):
+        lines.append(f"  {status_code}: {count}")
+    for error, count in sorted(summary["error_counts"].items()):
+        lines.append(f"  ❌ {error}: {count}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="api_loadgen", description="Lastgenerator mit fester Ankunftsrate")
+    parser.add_argument("target", nargs="?", help="Request aus den Collections (z.B. 'My API/Users/List') oder JSON-Datei")
+    parser.add_argument("--url", help="URL statt eines gespeicherten Requests")
+    parser.add_argument("--method", default="GET", help="Methode zu --url (Standard: %(default)s)")
+    parser.add_argument("--profile", required=True, help="Lastprofil, z.B. constant:100:30s oder ramp:10:200:60s")
+    parser.add_argument("--config", default=CONFIG_FILE, help="Konfigurationsdatei (Standard: %(default)s)")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=WERT", help="Variable setzen/überschreiben")
+    parser.add_argument("--env-file", help="JSON-Datei mit zusätzlichen Variablen")
+    parser.add_argument("--concurrency", type=int, default=200, help="Parallele Requests der Engine")
+    parser.add_argument("--max-in-flight", type=int, default=10000, help="Höchstens so viele offene Requests")
+    parser.add_argument("--timeout", type=float, default=30, help="Timeout pro Request in Sekunden")
+    parser.add_argument("--http2", action="store_true", help="HTTP/2 mit Multiplexing (httpx[http2])")
+    parser.add_argument("--json", metavar="DATEI", help="Ergebnis als JSON schreiben")
+    parser.add_argument("--hdr-output", metavar="DATEI", help="Latenzverteilung im HdrHistogram-Textformat schreiben")
+    return parser.parse_args(argv)
+
+
+def find_request(node):
+    """Der einzige Request in einem Collection-Baum"""
+    if node.get("type") == "request":
+        return [node]
+    return [request for child in node.get("items", []) for request in find_request(child)]
+
+
+def main(argv=None):
+    # api_cli und api_engine erst hier, damit die Klassen oben ohne Engine importierbar bleiben
+    from api_cli import EXIT_USAGE, load_env_vars, resolve_target
+    from api_engine import HTTP2_AVAILABLE, HTTP2_MISSING, AsyncEngine, SessionManager, prepare_request
+
+    args = parse_args(argv)
+    try:
+        profile = LoadProfile.parse(args.profile)
+        config = load_config(args.config)
+        env_vars = load_env_vars(config, args)
+        if args.url:
+            spec = {"method": args.method, "url": args.url}
+        elif args.target:
+            requests_found = find_request(resolve_target(args.target, config.get("collections", [])))
+            if len(requests_found) != 1:
+                raise ValueError(f"{args.target} enthält {len(requests_found)} Requests, erwartet genau einen")
+            spec = requests_found[0].get("data", {})
+        else:
+            raise ValueError("Request (Pfad oder JSON-Datei) oder --url angeben")
+        method, url, kwargs = prepare_request(spec, env_vars, args.timeout)
+    except (LookupError, OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.http2 and not HTTP2_AVAILABLE:
+        print(f"Fehler: {HTTP2_MISSING}", file=sys.stderr)
+        return EXIT_USAGE
+
+    concurrency = max(1, args.concurrency)
+    engine = AsyncEngine(
+        concurrency=concurrency, timeout=args.timeout, session_manager=SessionManager(concurrency, http2=args.http2)
+    )
+    generator = LoadGenerator(engine, method, url, kwargs, profile, max(1, args.max_in_flight))
+    print(f"{profile.name}: ~{round(profile.expected_requests())} Requests an {method} {url}")
+    stop_event = threading.Event()
+    try:
+        asyncio.run(generator.run(stop_event))
+    except KeyboardInterrupt:
+        stop_event.set()
+    finally:
+        engine.close()
+
+    summary = generator.stats.summary()
+    print(format_report(summary, method, url))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"method": method, "url": url, **summary}, f, indent=2, ensure_ascii=False)
+    if args.hdr_output:
+        with open(args.hdr_output, "w", encoding="utf-8") as f:
+            f.write(generator.stats.latency.percentile_distribution())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+API Mock - Lokaler Mock-Server für gespeicherte Collections
+
+Jeder Request einer Collection wird zu einer Route (Methode + Pfad aus der URL).
+Die Antwort kommt aus dem Beispiel unter data["mock"]:
+
+    {"status": 200, "headers": {"Content-Type": "application/json"},
+     "body": '{"id": "{{id}}", "created": "{{$isoTimestamp}}"}',
+     "latency_ms": 50, "error_rate": 0.1, "error_status": 503}
+
+Pfadsegmente wie {{id}} oder :id passen auf beliebige Werte und stehen im Body-
+Template als Variablen zur Verfügung, ebenso query.NAME, method, path und body
+(der Request-Body). Requests ohne Beispiel antworten mit 200 und "{}".
+
+Der Server läuft auf asyncio mit Keep-Alive; Latenzen blockieren keine anderen
+Verbindungen, statische Antworten werden nur einmal kodiert:
+
+    server = MockServer(collections, port=8080).start()
+    ...
+    server.stop()
+
+Oder eigenständig: python api_mock.py --port 8080 "My API"
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http import HTTPStatus
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from api_config import CONFIG_FILE, find_node, load_config
+from api_templates import compile_template
+
+
+DEFAULT_MOCK = {"status": 200, "headers": {}, "body": "{}", "latency_ms": 0, "error_rate": 0.0, "error_status": 500}
+
+MAX_HEADER_SIZE = 64 * 1024
+# {{name}}, {{name|default}} oder :name; der Standardwert spielt für das Routing keine Rolle
+PATH_PARAM_PATTERN = re.compile(r"^(?:\{\{\s*([^{}|]+?)\s*(?:\|.*)?\}\}|:(\w+))$")
+
+
+def route_path(url):
+    """Pfad-Anteil einer Request-URL ("{{base_url}}/users/{{id}}?x=1" -> "/users/{{id}}")"""
+    url = url.strip().split("?", 1)[0].split("#", 1)[0]
+    if "://" in url:
+        url = "/" + url.split("://", 1)[1].partition("/")[2]
+    elif url.startswith("{{"):
+        # Führende Variable ist der Host-Anteil ({{base_url}})
+        end = url.find("}}")
+        url = url[end + 2 :] if end >= 0 else url
+    return "/" + url.strip("/")
+
+
+class MockRoute:
+    """Eine Route mit kompiliertem Pfad und vorbereiteter Antwort"""
+
+    def __init__(self, name, method, path, mock=None):
+        self.name = name
+        self.method = method.upper()
+        self.path = path
+        mock = {**DEFAULT_MOCK, **(mock or {})}
+        self.status = int(mock["status"])
+        self.headers = dict(mock["headers"])
+        self.latency = float(mock["latency_ms"]) / 1000
+        self.error_rate = float(mock["error_rate"])
+        self.error_status = int(mock["error_status"])
+        self.template = compile_template(str(mock["body"]))
+        self.hits = 0
+        self.errors = 0
+
+        self.params = []
+        self.static_segments = 0
+        pattern = []
+        for segment in path.strip("/").split("/"):
+            match = PATH_PARAM_PATTERN.match(segment)
+            if match:
+                self.params.append(match.group(1) or match.group(2))
+                pattern.append("([^/]+)")
+            else:
+                self.static_segments += 1
+                pattern.append(re.escape(segment))
+        self.regex = re.compile("^/" + "/".join(pattern) + "/?$")
+        self.headers.setdefault("Content-Type", "application/json")
+        # Ohne Platzhalter im Body wird die Antwort nur einmal kodiert (je mit/ohne Keep-Alive)
+        body = self.template.source.encode("utf-8")
+        self._cached = {
+            keep_alive: _encode_response(self.status, self.headers, body, keep_alive) for keep_alive in (True, False)
+        }
+
+    def match(self, method, path):
+        if method != self.method and not (method == "HEAD" and self.method == "GET"):
+            return None
+        match = self.regex.match(path)
+        if match is None:
+            return None
+        return {name: unquote(value) for name, value in zip(self.params, match.groups())}
+
+    def respond(self, params, method, path, query, body, keep_alive):
+        """Kodierte Antwort (Statuszeile, Header, Body) auf einen passenden Request"""
+        if self.template.static:
+            return self._cached[keep_alive]
+        variables = {**params, "method": method, "path": path, "body": body.decode("utf-8", "replace")}
+        variables.update((f"query.{key}", value) for key, value in query)
+        return _encode_response(self.status, self.headers, self.template.render(variables).encode("utf-8"), keep_alive)
+
+
+def _encode_response(status, headers, body, keep_alive=True):
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ""
+    lines = [f"HTTP/1.1 {status} {reason}"]
+    lines.extend(f"{key}: {value}" for key, value in headers.items() if key.lower() not in ("content-length", "connection"))
+    lines.append(f"Content-Length: {len(body)}")
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+def collect_routes(node, routes=None):
+    """Sammelt die Routen aller Requests eines Collection-Baums"""
+    routes = [] if routes is None else routes
+    if node.get("type") == "request":
+        data = node.get("data", {})
+        if data.get("url"):
+            routes.append(MockRoute(node.get("name", ""), data.get("method", "GET"), route_path(data["url"]), data.get("mock")))
+        return routes
+    for child in node.get("items", []):
+        collect_routes(child, routes)
+    return routes
+
+
+class MockServer:
+    """HTTP/1.1-Mock-Server auf einer eigenen asyncio-Eventloop im Hintergrund"""
+
+    def __init__(self, nodes, host="127.0.0.1", port=0):
+        routes = []
+        for node in nodes:
+            collect_routes(node, routes)
+        # Spezifischere Routen (mehr feste Segmente) zuerst
+        self.routes = sorted(routes, key=lambda route: (-route.static_segments, -len(route.path)))
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.unmatched = 0
+        self._random = random.Random()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._started = threading.Event()
+        self._error = None
+        self._connections = set()
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def running(self):
+        return self._server is not None
+
+    def start(self):
+        """Startet den Server und wartet, bis er Verbindungen annimmt"""
+        self._thread = threading.Thread(target=self._run, name="mock-server", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self):
+        """Beendet den Server samt offener Verbindungen"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+
+    def _run(self):
+        loop = self._loop = asyncio.new_event_loop()
+        try:
+            self._server = loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEADER_SIZE, backlog=1024)
+            )
+        except OSError as e:
+            self._error = e
+            self._started.set()
+            loop.close()
+            return
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            # Offene Verbindungen schließen; die Handler enden dann von selbst
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            tasks = asyncio.all_tasks(loop)
+            if tasks:
+                loop.run_until_complete(asyncio.wait(tasks, timeout=1))
+            self._server = None
+            loop.close()
+
+    def find_route(self, method, path):
+        for route in self.routes:
+            params = route.match(method, path)
+            if params is not None:
+                return route, params
+        return None, None
+
+    async def _handle(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    writer.write(_encode_response(400, {}, b"", keep_alive=False))
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    key, _, value = line.partition(":")
+                    if key:
+                        headers[key.strip().lower()] = value.strip()
+
+                body = await self._read_body(reader, headers)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" and (version != "HTTP/1.0" or connection == "keep-alive")
+
+                writer.write(await self._respond(method.upper(), target, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def _read_body(reader, headers):
+        if "content-length" in headers:
+            return await reader.readexactly(int(headers["content-length"]))
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    # Trailer bis zur Leerzeile überspringen
+                    while (await reader.readline()).strip():
+                        pass
+                    return b"".join(chunks)
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+        return b""
+
+    async def _respond(self, method, target, body, keep_alive):
+        self.requests += 1
+        split = urlsplit(target)
+        path = split.path or "/"
+        route, params = self.find_route(method, path)
+        if route is None:
+            self.unmatched += 1
+            payload = json.dumps({"error": "Keine Mock-Route", "method": method, "path": path}).encode("utf-8")
+            return _encode_response(404, {"Content-Type": "application/json"}, payload, keep_alive)
+
+        route.hits += 1
+        if route.latency:
+            await asyncio.sleep(route.latency)
+        if route.error_rate and self._random.random() < route.error_rate:
+            route.errors += 1
+            payload = json.dumps({"error": "Simulierter Fehler", "route": route.name}).encode("utf-8")
+            return _encode_response(route.error_status, {"Content-Type": "application/json"}, payload, keep_alive)
+
+        response = route.respond(params, method, path, parse_qsl(split.query), body, keep_alive)
+        if method == "HEAD":
+            response = response[: response.index(b"\r\n\r\n") + 4]
+        return response
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="api_mock", description="Lokaler Mock-Server für gespeicherte Collections")
+    parser.add_argument("targets", nargs="*", help="Collections/Ordner (Pfad wie 'My API/Users'); ohne Angabe alle")
+    parser.add_argument("--config", default=CONFIG_FILE, help="Konfigurationsdatei (Standard: %(default)s)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    collections = load_config(args.config).get("collections", [])
+    nodes = [find_node(collections, target) for target in args.targets] or collections
+    if not all(nodes):
+        print("Fehler: Collection nicht gefunden", file=sys.stderr)
+        return 2
+
+    server = MockServer(nodes, args.host, args.port).start()
+    print(f"Mock-Server läuft auf {server.base_url} (Strg+C beendet)")
+    for route in server.routes:
+        print(f"  {route.method:<7} {route.path:<40} -> {route.status}  {route.name}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"{server.requests} Requests, {server.unmatched} ohne passende Route")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+API Redact - Zugangsdaten vor dem Speichern unkenntlich machen
+
+History und Cassettes legen Requests und Responses auf der Platte ab. Passwörter,
+Tokens, API-Keys und Session-Cookies werden vorher durch REDACTED_VALUE ersetzt:
+
+    from api_redact import redact_headers, redact_request, sensitive_names
+
+    names = sensitive_names(spec)           # Standard-Header plus Name des API-Keys
+    spec = redact_request(spec)             # Headers, Params, URL und Auth-Daten
+    headers = redact_headers(response.headers, names)
+
+Der Name des API-Keys ist frei wählbar (z.B. "X-Token"); er wird deshalb aus den
+Auth-Daten übernommen und gilt für Header und Query-Parameter gleichermaßen.
+"""
+
+from urllib.parse import unquote_plus, urlsplit, urlunsplit
+
+
+# Header (kleingeschrieben), deren Werte nie gespeichert werden
+SENSITIVE_HEADERS = frozenset({"authorization", "proxy-authorization", "cookie", "set-cookie", "x-api-key"})
+
+# Felder in auth_data mit geheimen Werten
+SECRET_AUTH_FIELDS = ("password", "bearer_token", "api_key_value")
+
+REDACTED_VALUE = "***"
+
+
+def sensitive_names(spec=None):
+    """Kleingeschriebene Header- und Parameternamen, deren Werte nicht gespeichert werden"""
+    names = set(SENSITIVE_HEADERS)
+    spec = spec or {}
+    auth_data = spec.get("auth_data") or {}
+    if spec.get("auth_type") == "API Key" and auth_data.get("api_key_name"):
+        names.add(str(auth_data["api_key_name"]).strip().lower())
+    return frozenset(names)
+
+
+def redact_headers(headers, names=SENSITIVE_HEADERS):
+    """Kopie der Headers (bzw. Parameter) als Dict, geheime Werte ersetzt"""
+    return {key: REDACTED_VALUE if key.lower() in names else str(value) for key, value in headers.items()}
+
+
+def redact_url(url, names=SENSITIVE_HEADERS):
+    """Ersetzt die Werte geheimer Query-Parameter; der Rest der URL bleibt Zeichen für Zeichen gleich"""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = []
+    for pair in parts.query.split("&"):
+        name, separator, _ = pair.partition("=")
+        if separator and unquote_plus(name).lower() in names:
+            pair = f"{name}={REDACTED_VALUE}"
+        query.append(pair)
+    return urlunsplit(parts._replace(query="&".join(query)))
+
+
+def redact_auth(auth_data):
+    """Kopie der Auth-Daten ohne Passwort, Token und API-Key-Wert"""
+    auth_data = dict(auth_data or {})
+    for field in SECRET_AUTH_FIELDS:
+        if auth_data.get(field):
+            auth_data[field] = REDACTED_VALUE
+    return auth_data
+
+
+def redact_request(spec):
+    """Kopie einer Request-Spezifikation (Format von prepare_request()) ohne Zugangsdaten"""
+    names = sensitive_names(spec)
+    spec = dict(spec)
+    if spec.get("url"):
+        spec["url"] = redact_url(spec["url"], names)
+    for field in ("headers", "params"):
+        if spec.get(field):
+            spec[field] = redact_headers(spec[field], names)
+    if "auth_data" in spec:
+        spec["auth_data"] = redact_auth(spec["auth_data"])
+    return spec
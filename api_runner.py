@@ -0,0 +1,266 @@
+"""
+API Runner - Führt ganze Collections über die API Engine aus
+
+Unabhängige Requests laufen parallel. Requests in sequentiellen Ordnern sowie
+Requests, die Variablen aus vorherigen Responses verwenden, warten auf ihre
+Vorgänger. Collections werden als verschachtelte Dicts übergeben:
+
+    {"name": "My API", "type": "collection", "sequential": False, "items": [
+        {"name": "Login", "type": "request", "data": {..., "extract": {"token": "$.token"}}},
+        {"name": "Users", "type": "folder", "sequential": True, "items": [...]},
+    ]}
+"""
+
+import asyncio
+import json
+import re
+import time
+
+from api_engine import prepare_request
+from api_templates import template_names
+
+
+PATH_PART_PATTERN = re.compile(r"\.?([^.\[\]]+)|\[(\d+)\]")
+
+
+def run_checks(response, elapsed_time, max_json_size=None):
+    """Automatische Tests für eine Response.
+
+    Gibt eine Liste von (status, message) zurück, status ist "pass", "warn" oder "fail".
+    Bodies größer als max_json_size werden nicht als JSON geparst.
+    """
+    checks = []
+
+    # Status Code Test
+    if response.status_code < 400:
+        checks.append(("pass", "Status Code is successful"))
+    else:
+        checks.append(("fail", f"Status Code {response.status_code} indicates error"))
+
+    # Response Time Test
+    if elapsed_time < 1:
+        checks.append(("pass", f"Response time ({elapsed_time * 1000:.0f}ms) is acceptable"))
+    else:
+        checks.append(("warn", f"Response time ({elapsed_time * 1000:.0f}ms) is slow"))
+
+    # Content Type Test
+    content_type = response.headers.get("Content-Type", "")
+    if content_type:
+        checks.append(("pass", f"Content-Type header present: {content_type}"))
+    else:
+        checks.append(("warn", "No Content-Type header"))
+
+    # JSON Validity Test
+    if "json" in content_type and max_json_size is not None and response.size > max_json_size:
+        checks.append(("warn", f"JSON validation skipped (body larger than {max_json_size} bytes)"))
+    elif "json" in content_type:
+        try:
+            response.json()
+            checks.append(("pass", "Response is valid JSON"))
+        except ValueError:
+            checks.append(("fail", "Response is not valid JSON"))
+
+    return checks
+
+
+def extract_value(response, path):
+    """Liest einen Wert aus einer Response.
+
+    path ist "status", "header:Name" oder ein JSON-Pfad wie "$.data.items[0].id".
+    Löst KeyError, IndexError, TypeError oder ValueError aus, wenn der Pfad nicht passt.
+    """
+    path = path.strip()
+    if path == "status":
+        return str(response.status_code)
+    if path.lower().startswith("header:"):
+        return response.headers[path.split(":", 1)[1].strip()]
+
+    value = response.json()
+    for key, index in PATH_PART_PATTERN.findall(path.lstrip("$")):
+        value = value[int(index)] if index else value[key]
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def template_variables(value):
+    """Sammelt alle {{variablen}}, die in einem (verschachtelten) Wert vorkommen"""
+    if isinstance(value, str):
+        return template_names(value)
+    if isinstance(value, dict):
+        names = set()
+        for key, item in value.items():
+            if key != "extract":
+                names |= template_variables(item)
+        return names
+    if isinstance(value, (list, tuple)):
+        names = set()
+        for item in value:
+            names |= template_variables(item)
+        return names
+    return set()
+
+
+class RunItem:
+    """Ein Request innerhalb eines Collection-Laufs"""
+
+    def __init__(self, index, name, spec, path):
+        self.index = index
+        self.name = name
+        self.spec = spec
+        self.path = path
+        self.depends_on = set()
+
+    @property
+    def display_name(self):
+        return " / ".join(self.path + [self.name])
+
+
+class RunResult:
+    """Ergebnis eines Requests in einem Collection-Lauf.
+
+    response ist bereits geschlossen: nur Status, Header und Metadaten sind noch verfügbar.
+    """
+
+    def __init__(self, item, method, url, response=None, error=None, checks=None, extracted=None, elapsed=0.0):
+        self.item = item
+        self.method = method
+        self.url = url
+        self.response = response
+        self.error = error
+        self.checks = checks or []
+        self.extracted = extracted or {}
+        self.elapsed = elapsed
+
+    @property
+    def status_code(self):
+        return self.response.status_code if self.response is not None else None
+
+    @property
+    def http_version(self):
+        return self.response.http_version if self.response is not None else None
+
+    @property
+    def passed(self):
+        return self.error is None and all(status != "fail" for status, _ in self.checks)
+
+    @property
+    def failures(self):
+        messages = [message for status, message in self.checks if status == "fail"]
+        if self.error is not None:
+            messages.insert(0, self.error)
+        return messages
+
+
+class RunReport:
+    """Gesamtergebnis eines Collection-Laufs"""
+
+    def __init__(self, name, results, wall_time):
+        self.name = name
+        self.results = results
+        self.wall_time = wall_time
+
+    @property
+    def passed(self):
+        return sum(1 for result in self.results if result.passed)
+
+    @property
+    def failed(self):
+        return len(self.results) - self.passed
+
+    @property
+    def total_request_time(self):
+        return sum(result.elapsed for result in self.results)
+
+
+def collect_run_items(node):
+    """Flacht einen Collection-Baum in RunItems mit Abhängigkeiten ab"""
+    items = []
+
+    def walk(node, path):
+        if node.get("type") == "request":
+            item = RunItem(len(items), node.get("name", "Request"), node.get("data", {}), path)
+            items.append(item)
+            return [item.index]
+
+        child_path = path + [node.get("name", "")] if path is not None else []
+        previous = []
+        indexes = []
+        for child in node.get("items", []):
+            child_indexes = walk(child, child_path)
+            if not child_indexes:
+                continue
+            # Sequentielle Ordner: jedes Element wartet auf das vorherige
+            if node.get("sequential") and previous:
+                for index in child_indexes:
+                    items[index].depends_on.update(previous)
+            previous = child_indexes
+            indexes.extend(child_indexes)
+        return indexes
+
+    walk(node, None)
+
+    # Variablen-Abhängigkeiten: Verbraucher warten auf alle früheren Erzeuger
+    producers = {}
+    for item in items:
+        for name in template_variables(item.spec):
+            item.depends_on.update(producers.get(name, []))
+        for name in item.spec.get("extract", {}):
+            producers.setdefault(name, []).append(item.index)
+
+    return items
+
+
+class CollectionRunner:
+    """Führt alle Requests einer Collection auf einer AsyncEngine aus"""
+
+    def __init__(self, engine, env_vars=None):
+        self.engine = engine
+        self.env_vars = dict(env_vars or {})
+
+    async def run(self, node, on_result=None):
+        """Führt den Collection-Baum aus und gibt einen RunReport zurück.
+
+        on_result wird für jedes fertige Ergebnis aufgerufen (im Thread der Eventloop).
+        """
+        items = collect_run_items(node)
+        env_vars = dict(self.env_vars)
+        tasks = {}
+        start_time = time.perf_counter()
+
+        async def run_item(item):
+            if item.depends_on:
+                await asyncio.gather(*(tasks[index] for index in item.depends_on))
+            result = await self._execute(item, env_vars)
+            if on_result:
+                on_result(result)
+            return result
+
+        # Abhängigkeiten zeigen immer auf frühere Items, die Tasks existieren also bereits
+        for item in items:
+            tasks[item.index] = asyncio.ensure_future(run_item(item))
+
+        results = list(await asyncio.gather(*tasks.values()))
+        return RunReport(node.get("name", ""), results, time.perf_counter() - start_time)
+
+    async def _execute(self, item, env_vars):
+        method = item.spec.get("method", "GET")
+        url = item.spec.get("url", "")
+        start_time = time.perf_counter()
+
+        try:
+            method, url, kwargs = prepare_request(item.spec, env_vars, self.engine.timeout)
+            response = await self.engine.send_prepared(method, url, kwargs)
+        except Exception as e:
+            return RunResult(item, method, url, error=f"{type(e).__name__}: {e}", elapsed=time.perf_counter() - start_time)
+
+        checks = run_checks(response, response.elapsed)
+
+        extracted = {}
+        for name, path in item.spec.get("extract", {}).items():
+            try:
+                extracted[name] = env_vars[name] = extract_value(response, path)
+            except (KeyError, IndexError, TypeError, ValueError):
+                checks.append(("fail", f"Extract '{name}' ({path}) fehlgeschlagen"))
+
+        # Der Body wird nach Tests und Extraktion nicht mehr gebraucht; Status und Protokoll bleiben lesbar
+        response.close()
+        return RunResult(item, method, url, response, checks=checks, extracted=extracted, elapsed=response.elapsed)
@@ -0,0 +1,205 @@
+"""
+API Templates - Ersetzung von {{variablen}} in Requests
+
+Templates werden einmal in Literale und Platzhalter zerlegt (kurze Quelltexte
+werden dabei zwischengespeichert) und dann in einem einzigen Durchlauf gefüllt:
+
+    from api_templates import render_template
+
+    missing = set()
+    url = render_template("{{base_url}}/users/{{id|1}}", env_vars, missing)
+
+Unterstützt werden:
+
+    {{name}}                Variable; ihr Wert darf selbst wieder Variablen enthalten
+    {{name|default}}        Standardwert, wenn die Variable nicht definiert ist
+    {{base_{{env}}}}        verschachtelte Platzhalter im Variablennamen
+    {{$timestamp}}          Unix-Zeit in Sekunden ($isoTimestamp: ISO 8601, UTC)
+    {{$uuid}}               zufällige UUID (v4)
+    {{$randomInt}}          Zufallszahl 0-1000
+
+Nicht auflösbare Namen bleiben unverändert im Text und werden in missing gesammelt.
+"""
+
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+
+
+# Wie tief Variablenwerte wiederum Variablen enthalten dürfen (schützt vor Zyklen)
+MAX_DEPTH = 10
+
+# Längere Quelltexte (ganze Request- oder Mock-Bodies) werden nicht zwischengespeichert,
+# sonst blieben bis zu 4096 davon samt ihrer Teile für die Laufzeit des Prozesses im Speicher
+MAX_CACHED_SOURCE = 4 * 1024
+
+DYNAMIC_VALUES = {
+    "$timestamp": lambda: str(int(time.time())),
+    "$isoTimestamp": lambda: datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+    "$uuid": lambda: str(uuid.uuid4()),
+    "$randomInt": lambda: str(random.randint(0, 1000)),
+}
+
+
+class UnresolvedVariablesError(ValueError):
+    """Ein Request verwendet Variablen, die nicht definiert sind"""
+
+    def __init__(self, names):
+        self.names = sorted(names)
+        super().__init__(f"Nicht definierte Variablen: {', '.join(self.names)}")
+
+
+class _Placeholder:
+    """Ein {{...}}-Platzhalter; name und default sind selbst kompilierte Templates"""
+
+    __slots__ = ("source", "name", "default")
+
+    def __init__(self, source, name, default):
+        self.source = source
+        self.name = name
+        self.default = default
+
+
+class Template:
+    """Kompiliertes Template: abwechselnd Literale (str) und Platzhalter"""
+
+    def __init__(self, source):
+        self.source = source
+        self.parts = _parse(source)
+        self.static = all(isinstance(part, str) for part in self.parts)
+
+    @property
+    def names(self):
+        """Alle statisch bekannten Variablennamen (ohne dynamische $-Werte)"""
+        names = set()
+        for part in self.parts:
+            if isinstance(part, str):
+                continue
+            if part.name.static:
+                name = part.name.source.strip()
+                if not name.startswith("$"):
+                    names.add(name)
+            names |= part.name.names
+            if part.default is not None:
+                names |= part.default.names
+        return names
+
+    def render(self, variables, missing=None, depth=0):
+        """Füllt das Template; nicht auflösbare Namen landen in missing (falls übergeben)"""
+        if self.static:
+            return self.source
+        out = []
+        for part in self.parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+
+            name = part.name.render(variables, missing, depth).strip()
+            if name in variables:
+                value = str(variables[name])
+                if "{{" in value:
+                    if depth >= MAX_DEPTH:
+                        if missing is not None:
+                            missing.add(name)
+                        out.append(part.source)
+                        continue
+                    value = compile_template(value).render(variables, missing, depth + 1)
+                out.append(value)
+            elif name in DYNAMIC_VALUES:
+                out.append(DYNAMIC_VALUES[name]())
+            elif part.default is not None:
+                out.append(part.default.render(variables, missing, depth))
+            else:
+                if missing is not None:
+                    missing.add(name)
+                out.append(part.source)
+        return "".join(out)
+
+
+def _parse(source):
+    # Zerlegt den Text in Literale und Platzhalter; "{{" ohne passendes "}}" bleibt Text
+    parts = []
+    position = 0
+    literal_start = 0
+    length = len(source)
+    while True:
+        start = source.find("{{", position)
+        if start < 0:
+            break
+        end = _find_close(source, start + 2)
+        if end < 0:
+            break
+        if start > literal_start:
+            parts.append(source[literal_start:start])
+        inner = source[start + 2 : end]
+        name, separator, default = _split_default(inner)
+        parts.append(
+            _Placeholder(
+                source[start : end + 2],
+                compile_template(name),
+                compile_template(default.strip()) if separator else None,
+            )
+        )
+        position = literal_start = end + 2
+    if literal_start < length:
+        parts.append(source[literal_start:])
+    return parts
+
+
+def _find_close(source, position):
+    # Passendes "}}" unter Berücksichtigung verschachtelter "{{ }}"
+    depth = 0
+    while True:
+        close = source.find("}}", position)
+        if close < 0:
+            return -1
+        nested = source.find("{{", position, close)
+        if nested >= 0:
+            depth += 1
+            position = nested + 2
+        elif depth:
+            depth -= 1
+            position = close + 2
+        else:
+            return close
+
+
+def _split_default(inner):
+    # Trennt "name|default" am ersten "|" außerhalb verschachtelter Platzhalter
+    depth = 0
+    for i, char in enumerate(inner):
+        if inner.startswith("{{", i):
+            depth += 1
+        elif inner.startswith("}}", i) and depth:
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return inner[:i], "|", inner[i + 1 :]
+    return inner, "", ""
+
+
+@lru_cache(maxsize=4096)
+def _compile_cached(source):
+    return Template(source)
+
+
+def compile_template(source):
+    """Kompiliert ein Template (zwischengespeichert nach Quelltext, sofern nicht länger als MAX_CACHED_SOURCE)"""
+    if len(source) > MAX_CACHED_SOURCE:
+        return Template(source)
+    return _compile_cached(source)
+
+
+def render_template(text, variables, missing=None):
+    """Ersetzt alle Platzhalter in text in einem Durchlauf"""
+    if "{{" not in text:
+        return text
+    return compile_template(text).render(variables, missing)
+
+
+def template_names(text):
+    """Variablennamen, die in text verwendet werden"""
+    if "{{" not in text:
+        return set()
+    return compile_template(text).names
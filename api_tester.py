@@ -3,20 +3,491 @@ API Tester Tool - Ein umfangreiches API-Testing-Tool
 Erstellt mit Python, Tkinter und ttkbootstrap
 """
 
+import time
+
+# Startzeitpunkt vor allen weiteren Imports (für den Startzeit-Report)
+STARTUP_TIME = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
+import tkinter.font as tkfont
 import ttkbootstrap as ttkb
 from ttkbootstrap.constants import *
-from ttkbootstrap.scrolled import ScrolledFrame
-import requests
+import importlib
+import importlib.util
 import json
-import time
+import math
+import sys
 import threading
 from datetime import datetime
 import os
-import base64
-from urllib.parse import urlencode
-import xml.dom.minidom as minidom
+import queue
+
+# api_engine und api_runner (und damit requests) werden erst bei Bedarf importiert,
+# nach dem ersten Anzeigen des Fensters lädt sie PRELOAD_MODULES im Hintergrund vor
+from api_config import load_config, save_config
+from api_formatters import RenderWorker, iter_pretty_json, iter_pretty_xml
+from api_history import HistoryStore
+from api_templates import UnresolvedVariablesError
+
+PRELOAD_MODULES = ("api_engine", "api_runner")
+
+CHECK_ICONS = {"pass": "✅", "warn": "⚠️", "fail": "❌"}
+# Auswahl für Accept-Encoding; br und zstd nur, wenn brotli bzw. zstandard installiert ist
+ACCEPT_ENCODING_DEFAULT = "Standard"
+OPTIONAL_ENCODINGS = {"br": ("brotli", "brotlicffi"), "zstd": ("zstandard",)}
+# cache_status einer Response -> (Text, Farbe) in der Statusleiste
+CACHE_LABELS = {"hit": ("✅ Hit", "success"), "revalidated": ("🔄 Revalidiert", "info"), "miss": ("⬇ Miss", "default")}
+METHOD_ICONS = {"GET": "🟢", "POST": "🟡", "PUT": "🟠", "PATCH": "🟣", "DELETE": "🔴"}
+
+HISTORY_FILE = os.path.join(os.path.dirname(__file__), "api_tester_history.db")
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "api_tester_cache")
+HISTORY_SEARCH_DELAY = 150  # ms Ruhe nach der letzten Eingabe, bevor gesucht wird
+MOCK_BODY_LIMIT = 1024 * 1024  # größere Responses werden nicht als Mock-Beispiel übernommen
+
+# (Schlüssel, Beschriftung, Farbe) der Phasen im Wasserfall
+WATERFALL_PHASES = [
+    ("dns", "DNS", "#6f42c1"),
+    ("connect", "TCP Connect", "#fd7e14"),
+    ("tls", "TLS Handshake", "#e83e8c"),
+    ("ttfb", "Warten (TTFB)", "#20c997"),
+    ("download", "Download", "#17a2b8"),
+    ("render", "Rendern", "#ffc107"),
+]
+
+
+def format_size(size):
+    """Formatiert eine Byte-Anzahl lesbar"""
+    if size < 1024:
+        return f"{size:.0f} B"
+    elif size < 1024 * 1024:
+        return f"{size / 1024:.2f} KB"
+    else:
+        return f"{size / (1024 * 1024):.2f} MB"
+
+
+class StartupProfile:
+    """Misst, wo die Startzeit bleibt (Hilfe → Startzeiten)"""
+
+    def __init__(self, start):
+        self.start = start
+        self.last = start
+        self.phases = []
+        self.deferred = []
+
+    def mark(self, name):
+        """Schließt eine Phase ab, die beim letzten mark() begonnen hat"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def record(self, name, duration):
+        """Nimmt eine nach dem Start (z.B. beim ersten Öffnen eines Tabs) gemessene Phase auf"""
+        self.deferred.append((name, duration))
+
+    def report(self):
+        lines = [f"{duration * 1000:8.1f} ms  {name}" for name, duration in self.phases]
+        lines.append(f"{(self.last - self.start) * 1000:8.1f} ms  Gesamt bis zur ersten Anzeige")
+        if self.deferred:
+            lines.append("")
+            lines.append("Später bei Bedarf:")
+            lines.extend(f"{duration * 1000:8.1f} ms  {name}" for name, duration in self.deferred)
+        return "\n".join(lines)
+
+
+class PagedTextView(ttkb.Frame):
+    """Read-only Text-Viewer, der nur den sichtbaren Ausschnitt im Widget hält.
+
+    Der komplette Text liegt zeilenweise außerhalb des Widgets; gerendert werden
+    nur die sichtbaren Zeilen plus ein Rand. Beim Scrollen wird nachgeladen, große
+    Texte werden stückweise eingelesen, damit der erste Paint sofort erfolgt.
+    """
+
+    MAX_LINE_LENGTH = 2000  # längere Zeilen werden für die Anzeige umbrochen
+    MARGIN = 300  # gerenderte Zeilen ober- und unterhalb des sichtbaren Bereichs
+    SLICE_SIZE = 256 * 1024  # Zeichen pro Schritt beim Einlesen großer Texte
+
+    def __init__(self, parent, **text_options):
+        super().__init__(parent)
+        self._lines = []
+        self._soft_breaks = set()
+        self._open_line = False
+        self._win_start = 0
+        self._win_end = 0
+        self._rendered_total = 0
+        self._dirty = False
+        self._pending_text = None
+        self._pending_pos = 0
+        self._index_job = None
+        self._refresh_job = None
+        self._render_job = None
+        self._search_term = ""
+        self._match = None
+
+        self.scrollbar = ttkb.Scrollbar(self, orient=VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+
+        self.text = tk.Text(self, yscrollcommand=self._on_text_scroll, state=DISABLED, **text_options)
+        self.text.pack(side=LEFT, fill=BOTH, expand=True)
+        self.text.tag_config("highlight", background="yellow", foreground="black")
+        self.text.tag_config("current", background="orange", foreground="black")
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.text.bind(sequence, self._on_mousewheel)
+        self.text.bind("<Configure>", lambda e: self._schedule_refresh())
+
+    # ---- Inhalt ----
+
+    @property
+    def line_count(self):
+        return len(self._lines)
+
+    def clear(self):
+        if self._index_job:
+            self.after_cancel(self._index_job)
+            self._index_job = None
+        self._lines = []
+        self._soft_breaks = set()
+        self._open_line = False
+        self._pending_text = None
+        self._match = None
+        self._render(0)
+
+    def set_text(self, text):
+        """Ersetzt den Inhalt; große Texte werden stückweise im Hintergrund indiziert"""
+        self.clear()
+        self._pending_text = text
+        self._pending_pos = 0
+        self._index_step()
+
+    def _index_step(self):
+        self._index_job = None
+        text, pos = self._pending_text, self._pending_pos
+        self.append(text[pos : pos + self.SLICE_SIZE])
+        self._pending_pos = pos + self.SLICE_SIZE
+        if self._pending_pos < len(text):
+            self._index_job = self.after(1, self._index_step)
+        else:
+            self._pending_text = None
+
+    def append(self, text):
+        """Hängt Text an (Zeilen dürfen über mehrere Aufrufe verteilt sein)"""
+        if not text:
+            return
+
+        parts = text.split("\n")
+        continued = False
+        if self._open_line and self._lines:
+            last = len(self._lines) - 1
+            continued = last in self._soft_breaks
+            self._soft_breaks.discard(last)
+            parts[0] = self._lines.pop() + parts[0]
+
+        for i, part in enumerate(parts):
+            self._add_line(part, continued and i == 0)
+        self._open_line = True
+        self._dirty = True
+        self._schedule_refresh()
+
+    def _add_line(self, line, continued=False):
+        while True:
+            if continued:
+                self._soft_breaks.add(len(self._lines))
+            if len(line) <= self.MAX_LINE_LENGTH:
+                self._lines.append(line)
+                return
+            self._lines.append(line[: self.MAX_LINE_LENGTH])
+            line = line[self.MAX_LINE_LENGTH :]
+            continued = True
+
+    def get_text(self):
+        """Liefert den kompletten Text (inkl. noch nicht indizierter Teile)"""
+        if self._soft_breaks:
+            pieces = []
+            for i, line in enumerate(self._lines):
+                if i and i not in self._soft_breaks:
+                    pieces.append("\n")
+                pieces.append(line)
+            text = "".join(pieces)
+        else:
+            text = "\n".join(self._lines)
+        if self._pending_text is not None:
+            text += self._pending_text[self._pending_pos :]
+        return text
+
+    # ---- Rendering ----
+
+    def _visible_line_count(self):
+        top = int(self.text.index("@0,0").split(".")[0])
+        bottom = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        return max(bottom - top + 1, 50)
+
+    def _top_line(self):
+        return self._win_start + int(self.text.index("@0,0").split(".")[0]) - 1
+
+    def _render(self, top):
+        self._render_job = None
+        total = len(self._lines)
+        visible = self._visible_line_count()
+        top = max(0, min(top, total - 1))
+        start = max(0, top - self.MARGIN)
+        end = min(total, top + visible + self.MARGIN)
+
+        self.text.config(state=NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(self._lines[start:end]))
+        self._win_start, self._win_end, self._rendered_total = start, end, total
+        self._highlight_window()
+        self.text.config(state=DISABLED)
+        self.text.yview(f"{top - start + 1}.0")
+
+    def _schedule_refresh(self):
+        if not self._refresh_job:
+            self._refresh_job = self.after_idle(self._refresh)
+
+    def _refresh(self):
+        self._refresh_job = None
+        # Neu rendern, wenn das Fenster das (gewachsene) Ende zeigt, sonst nur Scrollbar anpassen
+        if self._dirty and self._win_end >= self._rendered_total:
+            self._render(self._top_line())
+        else:
+            self._on_text_scroll()
+        self._dirty = False
+
+    def _on_text_scroll(self, *args):
+        total = len(self._lines)
+        if not total:
+            self.scrollbar.set(0, 1)
+            return
+
+        top = self._top_line()
+        visible = self._visible_line_count()
+        self.scrollbar.set(top / total, min(1.0, (top + visible) / total))
+
+        # Rand des gerenderten Fensters erreicht -> nachladen
+        near_start = self._win_start > 0 and top - self._win_start < self.MARGIN // 3
+        near_end = self._win_end < total and top + visible > self._win_end - self.MARGIN // 3
+        if (near_start or near_end) and not self._render_job:
+            self._render_job = self.after_idle(self._render, top)
+
+    def _scroll_to(self, top):
+        top = max(0, min(top, len(self._lines) - 1))
+        if self._win_start <= top and top + self._visible_line_count() <= self._win_end:
+            self.text.yview(f"{top - self._win_start + 1}.0")
+        else:
+            self._render(top)
+
+    def _on_scrollbar(self, *args):
+        if not self._lines:
+            return
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self._lines)))
+        elif args[0] == "scroll":
+            step = self._visible_line_count() if args[2] == "pages" else 1
+            self._scroll_to(self._top_line() + int(args[1]) * step)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            lines = -3
+        elif event.num == 5:
+            lines = 3
+        else:
+            lines = -3 if event.delta > 0 else 3
+        self._scroll_to(self._top_line() + lines)
+        return "break"
+
+    # ---- Navigation & Suche ----
+
+    def goto_line(self, line_number):
+        """Springt zu einer (1-basierten) Zeile"""
+        self._render(line_number - 1)
+
+    def find_next(self, term):
+        """Sucht term ab dem letzten Treffer bzw. der obersten sichtbaren Zeile.
+
+        Gibt die (1-basierte) Zeile des Treffers zurück oder None.
+        """
+        if term != self._search_term:
+            self._search_term = term
+            self._match = None
+        if not term or not self._lines:
+            self._highlight_window()
+            return None
+
+        if self._match:
+            start_line, start_col = self._match[0], self._match[1] + 1
+        else:
+            start_line, start_col = self._top_line(), 0
+
+        total = len(self._lines)
+        for offset in range(total + 1):
+            index = (start_line + offset) % total
+            col = self._lines[index].find(term, start_col if offset == 0 else 0)
+            if col >= 0:
+                self._match = (index, col)
+                self._render(max(0, index - 5))
+                return index + 1
+        self._match = None
+        self._highlight_window()
+        return None
+
+    def _highlight_window(self):
+        self.text.tag_remove("highlight", "1.0", tk.END)
+        self.text.tag_remove("current", "1.0", tk.END)
+        term = self._search_term
+        if not term:
+            return
+
+        start = "1.0"
+        while True:
+            pos = self.text.search(term, start, stopindex=tk.END)
+            if not pos:
+                break
+            end = f"{pos}+{len(term)}c"
+            self.text.tag_add("highlight", pos, end)
+            start = end
+
+        if self._match and self._win_start <= self._match[0] < self._win_end:
+            pos = f"{self._match[0] - self._win_start + 1}.{self._match[1]}"
+            self.text.tag_add("current", pos, f"{pos}+{len(term)}c")
+
+
+class VirtualListbox(ttkb.Frame):
+    """Listbox über eine (lange) Liste von IDs, die nur die sichtbaren Zeilen enthält.
+
+    fetch(ids) liefert die Einträge zu den IDs, format_row(eintrag) den Anzeigetext.
+    Formatierte Zeilen werden begrenzt zwischengespeichert.
+    """
+
+    CACHE_SIZE = 2000
+
+    def __init__(self, parent, fetch, format_row, **listbox_options):
+        super().__init__(parent)
+        self.fetch = fetch
+        self.format_row = format_row
+        self.ids = []
+        self.offset = 0
+        self._rows = {}
+        self._line_height = None
+        self._selected = None
+
+        self.scrollbar = ttkb.Scrollbar(self, orient=VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+
+        self.listbox = tk.Listbox(self, **listbox_options)
+        self.listbox.pack(side=LEFT, fill=BOTH, expand=True)
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.listbox.bind(sequence, self._on_mousewheel)
+        for sequence in ("<Up>", "<Down>", "<Prior>", "<Next>"):
+            self.listbox.bind(sequence, self._on_key)
+        self.listbox.bind("<Configure>", lambda e: self._render())
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+
+    def bind_row(self, sequence, callback):
+        self.listbox.bind(sequence, callback)
+
+    def set_ids(self, ids):
+        """Ersetzt den Inhalt (z.B. nach einer Suche) und springt an den Anfang"""
+        self.ids = list(ids)
+        self.offset = 0
+        self._render()
+
+    def insert_first(self, entry):
+        """Fügt einen neuen Eintrag oben ein"""
+        self._remember(entry["id"], self.format_row(entry))
+        self.ids.insert(0, entry["id"])
+        # Beim Scrollen in der Liste bleibt der sichtbare Ausschnitt stehen
+        if self.offset:
+            self.offset += 1
+        self._render()
+
+    def remove(self, entry_id):
+        if entry_id in self._rows:
+            del self._rows[entry_id]
+        if entry_id in self.ids:
+            self.ids.remove(entry_id)
+            self._render()
+
+    def selected_id(self):
+        return self._selected if self._selected in self.ids else None
+
+    def select_at(self, y):
+        """Wählt die Zeile an Position y aus (z.B. für Kontextmenüs)"""
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(self.listbox.nearest(y))
+        self._on_select()
+
+    def _on_select(self, event=None):
+        selection = self.listbox.curselection()
+        if selection and self.offset + selection[0] < len(self.ids):
+            self._selected = self.ids[self.offset + selection[0]]
+
+    def _remember(self, entry_id, row):
+        self._rows[entry_id] = row
+        if len(self._rows) > self.CACHE_SIZE:
+            # Älteste Hälfte verwerfen (dicts behalten die Einfügereihenfolge)
+            for key in list(self._rows)[: self.CACHE_SIZE // 2]:
+                del self._rows[key]
+
+    def _visible_rows(self):
+        if self._line_height is None:
+            self._line_height = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace") + 1
+        return max(self.listbox.winfo_height() // self._line_height, 1)
+
+    def _render(self):
+        visible = self._visible_rows()
+        self.offset = max(0, min(self.offset, len(self.ids) - visible))
+        window = self.ids[self.offset : self.offset + visible]
+
+        missing = [entry_id for entry_id in window if entry_id not in self._rows]
+        if missing:
+            for entry in self.fetch(missing):
+                self._remember(entry["id"], self.format_row(entry))
+
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *(self._rows.get(entry_id, "…") for entry_id in window))
+        if self._selected in window:
+            self.listbox.selection_set(window.index(self._selected))
+
+        total = len(self.ids) or 1
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + visible) / total))
+
+    def _scroll_to(self, offset):
+        self.offset = offset
+        self._render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self.ids)))
+        elif args[0] == "scroll":
+            step = self._visible_rows() if args[2] == "pages" else 1
+            self._scroll_to(self.offset + int(args[1]) * step)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            lines = -3
+        elif event.num == 5:
+            lines = 3
+        else:
+            lines = -3 if event.delta > 0 else 3
+        self._scroll_to(self.offset + lines)
+        return "break"
+
+    def _on_key(self, event):
+        # Auswahl über den sichtbaren Ausschnitt hinaus bewegen
+        selection = self.listbox.curselection()
+        index = self.offset + (selection[0] if selection else 0)
+        step = {"Up": -1, "Down": 1, "Prior": -self._visible_rows(), "Next": self._visible_rows()}[event.keysym]
+        index = max(0, min(index + step, len(self.ids) - 1))
+        visible = self._visible_rows()
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + visible:
+            self.offset = index - visible + 1
+        self._selected = self.ids[index] if self.ids else None
+        self._render()
+        return "break"
 
 
 class HeaderManager(ttkb.Toplevel):
@@ -210,27 +681,742 @@ class EnvironmentManager(ttkb.Toplevel):
         self.destroy()
 
 
+class LoadTestStats:
+    """Sammelt Ergebnisse eines Load Tests (thread-sicher)"""
+
+    def __init__(self, iterations, concurrency):
+        self.iterations = iterations
+        self.concurrency = concurrency
+        self.latencies = []
+        self.errors = 0
+        self.status_counts = {}
+        self.error_counts = {}
+        self.start_time = time.perf_counter()
+        self.end_time = None
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_time, status_code=None, error=None):
+        with self._lock:
+            self.latencies.append(elapsed_time)
+            if error is not None:
+                self.errors += 1
+                self.error_counts[error] = self.error_counts.get(error, 0) + 1
+            else:
+                self.status_counts[status_code] = self.status_counts.get(status_code, 0) + 1
+                if status_code >= 400:
+                    self.errors += 1
+
+    def finish(self):
+        self.end_time = time.perf_counter()
+
+    @staticmethod
+    def percentile(sorted_values, percent):
+        """Perzentil nach Nearest-Rank Methode"""
+        if not sorted_values:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+        return sorted_values[min(rank, len(sorted_values)) - 1]
+
+    def summary(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+            errors = self.errors
+            status_counts = dict(self.status_counts)
+            error_counts = dict(self.error_counts)
+
+        completed = len(latencies)
+        duration = (self.end_time or time.perf_counter()) - self.start_time
+        return {
+            "completed": completed,
+            "duration": duration,
+            "rps": completed / duration if duration > 0 else 0.0,
+            "errors": errors,
+            "error_rate": errors / completed if completed else 0.0,
+            "p50": self.percentile(latencies, 50),
+            "p90": self.percentile(latencies, 90),
+            "p99": self.percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+            "status_counts": status_counts,
+            "error_counts": error_counts,
+        }
+
+
+class LoadTestDialog(ttkb.Toplevel):
+    """Dialog zur Konfiguration eines Load Tests.
+
+    Geschlossen: N Requests mit C Workern. Offen: Requests nach einem Lastprofil mit
+    fester Ankunftsrate (api_loadgen), C begrenzt dabei die parallelen Requests der Engine.
+    """
+
+    def __init__(self, parent, iterations=100, concurrency=10, profile="constant:50:30s"):
+        super().__init__(parent)
+        self.title("Load Test")
+        self.geometry("460x300")
+        self.result = None
+
+        form = ttkb.Frame(self)
+        form.pack(fill=BOTH, expand=True, padx=10, pady=10)
+
+        self.mode_var = tk.StringVar(value="closed")
+        ttkb.Radiobutton(
+            form, text="Geschlossen: N Iterationen", variable=self.mode_var, value="closed"
+        ).grid(row=0, column=0, columnspan=2, padx=5, pady=5, sticky=W)
+
+        ttkb.Label(form, text="Iterationen (N):").grid(row=1, column=0, padx=25, pady=5, sticky=W)
+        self.iterations_entry = ttkb.Entry(form, width=12)
+        self.iterations_entry.grid(row=1, column=1, padx=5, pady=5, sticky=W)
+        self.iterations_entry.insert(0, str(iterations))
+
+        ttkb.Radiobutton(
+            form, text="Offen: feste Ankunftsrate (Latenz ab geplantem Senden)", variable=self.mode_var, value="open"
+        ).grid(row=2, column=0, columnspan=2, padx=5, pady=5, sticky=W)
+
+        ttkb.Label(form, text="Lastprofil:").grid(row=3, column=0, padx=25, pady=5, sticky=W)
+        self.profile_entry = ttkb.Entry(form, width=28)
+        self.profile_entry.grid(row=3, column=1, padx=5, pady=5, sticky=W)
+        self.profile_entry.insert(0, profile)
+        ttkb.Label(
+            form,
+            text="constant:RATE:DAUER | ramp:START:ZIEL:DAUER\n"
+            "step:START:SCHRITT:STUFENDAUER:STUFEN\nspike:BASIS:SPITZE:DAUER:BEGINN:SPITZENDAUER",
+            font=("Consolas", 8),
+            bootstyle="secondary",
+        ).grid(row=4, column=0, columnspan=2, padx=25, sticky=W)
+
+        ttkb.Label(form, text="Concurrency (C):").grid(row=5, column=0, padx=5, pady=5, sticky=W)
+        self.concurrency_entry = ttkb.Entry(form, width=12)
+        self.concurrency_entry.grid(row=5, column=1, padx=5, pady=5, sticky=W)
+        self.concurrency_entry.insert(0, str(concurrency))
+
+        btn_frame = ttkb.Frame(self)
+        btn_frame.pack(fill=X, padx=10, pady=10)
+
+        ttkb.Button(btn_frame, text="▶️ Start", command=self.start, bootstyle="success").pack(side=RIGHT)
+        ttkb.Button(btn_frame, text="Abbrechen", command=self.destroy, bootstyle="secondary").pack(side=RIGHT, padx=5)
+
+        self.transient(parent)
+        self.grab_set()
+
+    def start(self):
+        try:
+            iterations = int(self.iterations_entry.get())
+            concurrency = int(self.concurrency_entry.get())
+        except ValueError:
+            messagebox.showerror("Fehler", "Bitte ganze Zahlen eingeben!", parent=self)
+            return
+        if iterations < 1 or concurrency < 1:
+            messagebox.showerror("Fehler", "Werte müssen größer als 0 sein!", parent=self)
+            return
+        if self.mode_var.get() == "open":
+            from api_loadgen import LoadProfile
+
+            try:
+                profile = LoadProfile.parse(self.profile_entry.get())
+            except ValueError as e:
+                messagebox.showerror("Fehler", str(e), parent=self)
+                return
+            self.result = ("open", profile, concurrency)
+        else:
+            self.result = ("closed", iterations, concurrency)
+        self.destroy()
+
+
+class CollectionRunnerWindow(ttkb.Toplevel):
+    """Fenster zum Ausführen aller Requests einer Collection oder eines Ordners"""
+
+    def __init__(self, parent, node, env_vars, keep_alive=True, cassette=None, http2=False):
+        super().__init__(parent)
+        self.title(f"Collection Runner - {node.get('name', '')}")
+        self.geometry("950x600")
+        self.node = node
+        self.env_vars = env_vars
+        self.keep_alive = keep_alive
+        self.http2 = http2
+        self.cassette = cassette
+        from api_runner import collect_run_items
+
+        self.items = collect_run_items(node)
+        self.rows = {}
+        self.results = queue.Queue()
+        self.engine = None
+        self.future = None
+
+        self.create_widgets()
+        self.reset_rows()
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def create_widgets(self):
+        toolbar = ttkb.Frame(self)
+        toolbar.pack(fill=X, padx=10, pady=5)
+
+        ttkb.Label(toolbar, text="Concurrency:").pack(side=LEFT)
+        self.concurrency_entry = ttkb.Entry(toolbar, width=6)
+        self.concurrency_entry.pack(side=LEFT, padx=5)
+        self.concurrency_entry.insert(0, "10")
+
+        self.start_btn = ttkb.Button(toolbar, text="▶️ Start", command=self.toggle_run, bootstyle="success")
+        self.start_btn.pack(side=LEFT, padx=5)
+
+        columns = ("index", "name", "method", "url", "status", "protocol", "time", "result")
+        self.tree = ttkb.Treeview(self, columns=columns, show="headings", height=20)
+        self.tree.heading("index", text="#")
+        self.tree.heading("name", text="Request")
+        self.tree.heading("method", text="Method")
+        self.tree.heading("url", text="URL")
+        self.tree.heading("status", text="Status")
+        self.tree.heading("protocol", text="Protokoll")
+        self.tree.heading("time", text="Time")
+        self.tree.heading("result", text="Result")
+
+        self.tree.column("index", width=40, anchor=CENTER)
+        self.tree.column("name", width=200)
+        self.tree.column("method", width=70, anchor=CENTER)
+        self.tree.column("url", width=280)
+        self.tree.column("status", width=60, anchor=CENTER)
+        self.tree.column("protocol", width=70, anchor=CENTER)
+        self.tree.column("time", width=80, anchor=E)
+        self.tree.column("result", width=200)
+
+        self.tree.pack(fill=BOTH, expand=True, padx=10, pady=5)
+
+        self.summary_label = ttkb.Label(self, text=f"{len(self.items)} Requests", font=("Consolas", 10))
+        self.summary_label.pack(fill=X, padx=10, pady=10)
+
+    def reset_rows(self):
+        for row in self.tree.get_children():
+            self.tree.delete(row)
+        for item in self.items:
+            values = (item.index + 1, item.display_name, item.spec.get("method", "GET"), item.spec.get("url", ""))
+            self.rows[item.index] = self.tree.insert("", END, values=values + ("", "", "", "⏳ Pending"))
+
+    def toggle_run(self):
+        if self.future:
+            self.future.cancel()
+            return
+
+        try:
+            concurrency = max(1, int(self.concurrency_entry.get()))
+        except ValueError:
+            messagebox.showerror("Fehler", "Concurrency muss eine Zahl sein!", parent=self)
+            return
+
+        self.reset_rows()
+        from api_engine import AsyncEngine, SessionManager
+        from api_runner import CollectionRunner
+
+        self.engine = AsyncEngine(
+            concurrency=concurrency,
+            session_manager=SessionManager(concurrency, self.keep_alive, self.http2),
+            cassette=self.cassette,
+        )
+        runner = CollectionRunner(self.engine, self.env_vars)
+        self.future = self.engine.submit(runner.run(self.node, on_result=self.results.put))
+        self.start_time = time.perf_counter()
+        self.start_btn.config(text="⏹ Stop", bootstyle="danger")
+        self._poll()
+
+    def _poll(self):
+        if not self.winfo_exists():
+            return
+
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self._show_result(result)
+
+        if not self.future.done():
+            self.summary_label.config(text=f"⏳ Läuft... {time.perf_counter() - self.start_time:.2f}s")
+            self.after(100, self._poll)
+            return
+
+        if self.future.cancelled():
+            self.summary_label.config(text=f"⏹ Abgebrochen nach {time.perf_counter() - self.start_time:.2f}s")
+        else:
+            report = self.future.result()
+            self.summary_label.config(
+                text=f"{len(report.results)} Requests | ✅ {report.passed} | ❌ {report.failed} | "
+                f"Wall time: {report.wall_time:.2f}s | Σ Request-Zeit: {report.total_request_time:.2f}s"
+            )
+        self._finish()
+
+    def _show_result(self, result):
+        if result.passed:
+            outcome = "✅ Passed"
+        else:
+            outcome = f"❌ {result.failures[0]}"
+        status = result.status_code if result.status_code is not None else "--"
+        values = (
+            result.item.index + 1,
+            result.item.display_name,
+            result.method,
+            result.url,
+            status,
+            result.http_version or "--",
+            f"{result.elapsed * 1000:.0f}ms",
+            outcome,
+        )
+        self.tree.item(self.rows[result.item.index], values=values)
+
+    def _finish(self):
+        self.future = None
+        if self.engine:
+            self.engine.close()
+            self.engine = None
+        self.start_btn.config(text="▶️ Start", bootstyle="success")
+
+    def close(self):
+        if self.future:
+            self.future.cancel()
+        self._finish()
+        self.destroy()
+
+
+class CassetteDialog(ttkb.Toplevel):
+    """Dialog zum Starten einer Cassette (Datei, Modus, Vergleichsfelder)"""
+
+    MODES = [
+        ("record", "Aufnehmen (Datei wird ersetzt)"),
+        ("replay", "Abspielen (ohne Netz, fehlende Aufnahme = Fehler)"),
+        ("auto", "Abspielen, fehlende Requests aufnehmen"),
+    ]
+    MATCH_FIELDS = [("method", "Methode"), ("url", "URL"), ("body", "Body"), ("headers", "Headers")]
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Cassette")
+        self.geometry("480x360")
+        self.result = None
+
+        self.create_widgets()
+
+        self.transient(parent)
+        self.grab_set()
+
+    def create_widgets(self):
+        file_frame = ttkb.Frame(self)
+        file_frame.pack(fill=X, padx=10, pady=10)
+        ttkb.Label(file_frame, text="Datei:").pack(side=LEFT)
+        self.path_entry = ttkb.Entry(file_frame)
+        self.path_entry.pack(side=LEFT, fill=X, expand=True, padx=5)
+        ttkb.Button(file_frame, text="…", command=self.browse, bootstyle="secondary-outline").pack(side=LEFT)
+
+        self.mode_var = tk.StringVar(value="record")
+        mode_frame = ttkb.Labelframe(self, text="Modus", padding=5)
+        mode_frame.pack(fill=X, padx=10, pady=5)
+        for mode, label in self.MODES:
+            ttkb.Radiobutton(mode_frame, text=label, variable=self.mode_var, value=mode).pack(anchor=W, pady=2)
+
+        match_frame = ttkb.Labelframe(self, text="Requests vergleichen nach", padding=5)
+        match_frame.pack(fill=X, padx=10, pady=5)
+        self.match_vars = {}
+        for field, label in self.MATCH_FIELDS:
+            var = tk.BooleanVar(value=field in ("method", "url"))
+            ttkb.Checkbutton(match_frame, text=label, variable=var).pack(side=LEFT, padx=5)
+            self.match_vars[field] = var
+
+        btn_frame = ttkb.Frame(self)
+        btn_frame.pack(fill=X, padx=10, pady=10)
+
+        ttkb.Button(btn_frame, text="Starten", command=self.start, bootstyle="success").pack(side=RIGHT)
+        ttkb.Button(btn_frame, text="Abbrechen", command=self.destroy, bootstyle="secondary").pack(side=RIGHT, padx=5)
+
+    def browse(self):
+        filetypes = [("Cassette", "*.cassette"), ("Alle Dateien", "*.*")]
+        if self.mode_var.get() == "record":
+            path = filedialog.asksaveasfilename(parent=self, defaultextension=".cassette", filetypes=filetypes)
+        else:
+            path = filedialog.askopenfilename(parent=self, filetypes=filetypes)
+        if path:
+            self.path_entry.delete(0, tk.END)
+            self.path_entry.insert(0, path)
+
+    def start(self):
+        path = self.path_entry.get().strip()
+        match_on = [field for field, var in self.match_vars.items() if var.get()]
+        if not path:
+            messagebox.showwarning("Warnung", "Bitte eine Datei wählen!", parent=self)
+            return
+        if not match_on:
+            messagebox.showwarning("Warnung", "Bitte mindestens ein Vergleichsfeld wählen!", parent=self)
+            return
+        self.result = (path, self.mode_var.get(), match_on)
+        self.destroy()
+
+
+class MockDialog(ttkb.Toplevel):
+    """Dialog für die Beispiel-Antwort eines Requests im Mock-Server"""
+
+    # (Schlüssel, Beschriftung, Typ)
+    FIELDS = [
+        ("status", "Status:", int),
+        ("latency_ms", "Latenz (ms):", float),
+        ("error_rate", "Fehlerquote (0-1):", float),
+        ("error_status", "Status bei Fehler:", int),
+    ]
+
+    def __init__(self, parent, name, mock):
+        super().__init__(parent)
+        self.title(f"Mock-Antwort - {name}")
+        self.geometry("650x550")
+        self.mock = mock
+        self.vars = {}
+        self.result = None
+
+        self.create_widgets()
+
+        self.transient(parent)
+        self.grab_set()
+
+    def create_widgets(self):
+        form = ttkb.Frame(self)
+        form.pack(fill=X, padx=10, pady=5)
+
+        for row, (key, label, kind) in enumerate(self.FIELDS):
+            var = tk.StringVar(value=str(self.mock.get(key, "")))
+            ttkb.Label(form, text=label).grid(row=row // 2, column=(row % 2) * 2, padx=5, pady=5, sticky=W)
+            ttkb.Entry(form, textvariable=var, width=12).grid(row=row // 2, column=(row % 2) * 2 + 1, padx=5, pady=5)
+            self.vars[key] = (var, kind)
+
+        ttkb.Label(self, text="Headers (JSON):").pack(anchor=W, padx=10)
+        self.headers_text = scrolledtext.ScrolledText(self, height=4, font=("Consolas", 10))
+        self.headers_text.pack(fill=X, padx=10, pady=5)
+        self.headers_text.insert("1.0", json.dumps(self.mock.get("headers", {}), indent=2))
+
+        ttkb.Label(self, text="Body ({{id}} aus dem Pfad, {{query.x}}, {{body}}, {{$uuid}}, ...):").pack(
+            anchor=W, padx=10
+        )
+        self.body_text = scrolledtext.ScrolledText(self, height=12, font=("Consolas", 10))
+        self.body_text.pack(fill=BOTH, expand=True, padx=10, pady=5)
+        self.body_text.insert("1.0", self.mock.get("body", ""))
+
+        btn_frame = ttkb.Frame(self)
+        btn_frame.pack(fill=X, padx=10, pady=10)
+
+        ttkb.Button(btn_frame, text="Speichern", command=self.save, bootstyle="success").pack(side=RIGHT)
+        ttkb.Button(btn_frame, text="Abbrechen", command=self.destroy, bootstyle="secondary").pack(side=RIGHT, padx=5)
+
+    def save(self):
+        result = {}
+        for key, (var, kind) in self.vars.items():
+            try:
+                result[key] = kind(var.get())
+            except ValueError:
+                messagebox.showerror("Fehler", f"Ungültiger Wert für '{key}'", parent=self)
+                return
+        try:
+            result["headers"] = json.loads(self.headers_text.get("1.0", tk.END).strip() or "{}")
+        except ValueError as e:
+            messagebox.showerror("Fehler", f"Headers sind kein gültiges JSON: {e}", parent=self)
+            return
+        result["body"] = self.body_text.get("1.0", "end-1c")
+        self.result = result
+        self.destroy()
+
+
+class MockServerWindow(ttkb.Toplevel):
+    """Startet einen lokalen Mock-Server für die gespeicherten Collections"""
+
+    def __init__(self, parent, nodes):
+        super().__init__(parent)
+        self.title("Mock Server")
+        self.geometry("900x500")
+        self.nodes = nodes
+        self.server = None
+        self.rows = {}
+
+        self.create_widgets()
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def create_widgets(self):
+        toolbar = ttkb.Frame(self)
+        toolbar.pack(fill=X, padx=10, pady=5)
+
+        ttkb.Label(toolbar, text="Port:").pack(side=LEFT)
+        self.port_entry = ttkb.Entry(toolbar, width=8)
+        self.port_entry.pack(side=LEFT, padx=5)
+        self.port_entry.insert(0, "8080")
+
+        self.start_btn = ttkb.Button(toolbar, text="▶️ Start", command=self.toggle_server, bootstyle="success")
+        self.start_btn.pack(side=LEFT, padx=5)
+
+        self.url_label = ttkb.Label(toolbar, text="Gestoppt", font=("Consolas", 10))
+        self.url_label.pack(side=LEFT, padx=10)
+
+        columns = ("method", "path", "status", "latency", "error_rate", "hits", "name")
+        self.tree = ttkb.Treeview(self, columns=columns, show="headings", height=18)
+        self.tree.heading("method", text="Method")
+        self.tree.heading("path", text="Pfad")
+        self.tree.heading("status", text="Status")
+        self.tree.heading("latency", text="Latenz")
+        self.tree.heading("error_rate", text="Fehler")
+        self.tree.heading("hits", text="Aufrufe")
+        self.tree.heading("name", text="Request")
+
+        self.tree.column("method", width=70, anchor=CENTER)
+        self.tree.column("path", width=260)
+        self.tree.column("status", width=60, anchor=CENTER)
+        self.tree.column("latency", width=70, anchor=E)
+        self.tree.column("error_rate", width=70, anchor=E)
+        self.tree.column("hits", width=90, anchor=E)
+        self.tree.column("name", width=200)
+
+        self.tree.pack(fill=BOTH, expand=True, padx=10, pady=5)
+
+        self.summary_label = ttkb.Label(
+            self, text="Routen aus allen Collections; Beispiel-Antworten über das Kontextmenü", font=("Consolas", 10)
+        )
+        self.summary_label.pack(fill=X, padx=10, pady=10)
+
+    def toggle_server(self):
+        if self.server is not None:
+            self._stop()
+            return
+
+        try:
+            port = int(self.port_entry.get())
+        except ValueError:
+            messagebox.showerror("Fehler", "Port muss eine Zahl sein!", parent=self)
+            return
+
+        from api_mock import MockServer
+
+        try:
+            self.server = MockServer(self.nodes, port=port).start()
+        except (OSError, ValueError) as e:
+            self.server = None
+            messagebox.showerror("Fehler", f"Mock-Server konnte nicht starten:\n{e}", parent=self)
+            return
+
+        for row in self.tree.get_children():
+            self.tree.delete(row)
+        self.rows = {}
+        for route in self.server.routes:
+            self.rows[route] = self.tree.insert("", END)
+        self.url_label.config(text=self.server.base_url)
+        self.start_btn.config(text="⏹ Stop", bootstyle="danger")
+        self._poll()
+
+    def _poll(self):
+        if self.server is None or not self.winfo_exists():
+            return
+        for route, row in self.rows.items():
+            values = (
+                route.method,
+                route.path,
+                route.status,
+                f"{route.latency * 1000:.0f}ms",
+                f"{route.error_rate:.0%}",
+                f"{route.hits} ({route.errors} ✗)" if route.errors else route.hits,
+                route.name,
+            )
+            self.tree.item(row, values=values)
+        self.summary_label.config(
+            text=f"{len(self.rows)} Routen | {self.server.requests} Requests | {self.server.unmatched} ohne Route"
+        )
+        self.after(500, self._poll)
+
+    def _stop(self):
+        self.server.stop()
+        self.server = None
+        self.url_label.config(text="Gestoppt")
+        self.start_btn.config(text="▶️ Start", bootstyle="success")
+
+    def close(self):
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
+        self.destroy()
+
+
+class SettingsDialog(ttkb.Toplevel):
+    """Dialog für Programmeinstellungen"""
+
+    # (Schlüssel, Beschriftung, Typ)
+    FIELDS = [
+        ("pool_size", "Verbindungen pro Host (Pool-Größe):", int),
+        ("keep_alive", "Keep-Alive Verbindungen verwenden", bool),
+        ("http2", "HTTP/2 mit Multiplexing (benötigt httpx[http2])", bool),
+        ("preview_kb", "Vorschau-Größe im Response-Viewer (KB):", int),
+        ("pretty_max_lines", "Max. Zeilen beim Formatieren großer JSON-Bodies:", int),
+        ("history_max_entries", "History: max. Einträge (0 = unbegrenzt):", int),
+        ("history_max_days", "History: max. Alter in Tagen (0 = unbegrenzt):", int),
+        ("history_body_mb", "History: Speicher für Bodies (MB, 0 = unbegrenzt):", int),
+        ("http_cache", "HTTP-Cache für GET-Requests (Cache-Control, ETag)", bool),
+        ("cache_mb", "HTTP-Cache: Speicher auf der Platte (MB):", int),
+    ]
+
+    def __init__(self, parent, settings):
+        super().__init__(parent)
+        self.title("Einstellungen")
+        self.geometry("480x520")
+        self.settings = settings
+        self.vars = {}
+        self.result = None
+
+        self.create_widgets()
+
+        self.transient(parent)
+        self.grab_set()
+
+    def create_widgets(self):
+        form = ttkb.Frame(self)
+        form.pack(fill=BOTH, expand=True, padx=10, pady=10)
+
+        for row, (key, label, kind) in enumerate(self.FIELDS):
+            if kind is bool:
+                var = tk.BooleanVar(value=bool(self.settings.get(key)))
+                ttkb.Checkbutton(form, text=label, variable=var, bootstyle="round-toggle").grid(
+                    row=row, column=0, columnspan=2, padx=5, pady=5, sticky=W
+                )
+            else:
+                var = tk.StringVar(value=str(self.settings.get(key, "")))
+                ttkb.Label(form, text=label).grid(row=row, column=0, padx=5, pady=5, sticky=W)
+                ttkb.Entry(form, textvariable=var, width=20).grid(row=row, column=1, padx=5, pady=5, sticky=W)
+            self.vars[key] = (var, kind)
+
+        btn_frame = ttkb.Frame(self)
+        btn_frame.pack(fill=X, padx=10, pady=10)
+
+        ttkb.Button(btn_frame, text="Speichern", command=self.save_settings, bootstyle="success").pack(side=RIGHT)
+        ttkb.Button(btn_frame, text="Abbrechen", command=self.destroy, bootstyle="secondary").pack(side=RIGHT, padx=5)
+
+    def save_settings(self):
+        result = {}
+        for key, (var, kind) in self.vars.items():
+            try:
+                result[key] = kind(var.get())
+            except (ValueError, tk.TclError):
+                messagebox.showerror("Fehler", f"Ungültiger Wert für '{key}'", parent=self)
+                return
+        self.result = result
+        self.destroy()
+
+
 class APITester(ttkb.Window):
     """Haupt-Anwendungsfenster"""
 
     def __init__(self):
+        profile = StartupProfile(STARTUP_TIME)
+        profile.mark("Module importieren")
         super().__init__(themename="darkly")
+        self.startup_profile = profile
+        profile.mark("Fenster und Theme")
 
         self.title("🚀 API Tester Pro")
         self.geometry("1400x900")
 
         # Daten
-        self.history = []
         self.collections = {}
         self.current_response = None
+        self.mock_window = None
+        self.cassette = None
+        self.response_cache = None
         self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
         self.env_vars = {"base_url": "https://api.example.com", "api_key": "your-api-key"}
         self.auth_type = "none"
         self.auth_data = {}
+        self.settings = {
+            "pool_size": 10,
+            "keep_alive": True,
+            "preview_kb": 1024,
+            "pretty_max_lines": 100000,
+            "history_max_entries": 10000,
+            "history_max_days": 30,
+            "history_body_mb": 200,
+            "http_cache": False,
+            "cache_mb": 100,
+            "http2": False,
+        }
+        self.history_store = HistoryStore(
+            HISTORY_FILE,
+            self.settings["history_max_entries"],
+            self.settings["history_max_days"],
+            self.settings["history_body_mb"] * 1024 * 1024,
+        )
+        self.current_history_id = None
+        # Suchen in der History laufen im Hintergrund, damit das Tippen flüssig bleibt
+        self.history_worker = RenderWorker()
+        self.history_search_job = None
+        self.history_search_generation = None
+        self.history_polling = False
+        profile.mark("History-Datenbank öffnen")
+
+        # Engine wird beim ersten Zugriff angelegt (siehe engine)
+        self._engine = None
+        self.active_request = None
+        self.download_progress = None
+        self.load_test = None
+        self.renderer = RenderWorker()
+        self.render_generation = None
+        self.render_polling = False
+        self.render_started = None
+        # Tabs, deren Inhalt erst beim ersten Öffnen gebaut wird: Frame-Name -> (Frame, Builder, Titel)
+        self.lazy_tabs = {}
+        # Zuletzt gerenderte Headers/Cookies/Tests (für Tabs, die erst später gebaut werden)
+        self.response_sections = {}
 
         self.create_menu()
+        profile.mark("Menü")
         self.create_widgets()
+        profile.mark("Widgets")
         self.load_saved_data()
+        profile.mark("Gespeicherte Daten laden")
+        self.after_idle(self._startup_finished)
+
+    @property
+    def engine(self):
+        """Request-Engine; wird erst beim ersten Request angelegt (importiert dann requests)"""
+        if self._engine is None:
+            from api_engine import AsyncEngine
+
+            self._engine = AsyncEngine(
+                session_manager=self._create_session_manager(self.settings["pool_size"]),
+                cassette=self.cassette,
+                cache=self._configure_cache(),
+            )
+        return self._engine
+
+    def _create_session_manager(self, pool_size):
+        """SessionManager gemäß Einstellungen (HTTP/2 nur, wenn httpx[http2] installiert ist)"""
+        from api_engine import HTTP2_AVAILABLE, SessionManager
+
+        return SessionManager(pool_size, self.settings["keep_alive"], self.settings["http2"] and HTTP2_AVAILABLE)
+
+    def _configure_cache(self):
+        """HTTP-Cache gemäß Einstellungen (None, wenn abgeschaltet)"""
+        if not self.settings["http_cache"]:
+            return None
+        budget = self.settings["cache_mb"] * 1024 * 1024
+        if self.response_cache is None:
+            from api_cache import ResponseCache
+
+            self.response_cache = ResponseCache(CACHE_DIR, budget)
+        else:
+            self.response_cache.configure(budget)
+        return self.response_cache
+
+    @property
+    def session_manager(self):
+        return self.engine.sessions
+
+    def _startup_finished(self):
+        """Erste Anzeige ist erfolgt: Report ausgeben und Module im Hintergrund vorladen"""
+        self.startup_profile.mark("Erste Anzeige")
+        if "--startup-report" in sys.argv:
+            print(self.startup_profile.report())
+        threading.Thread(target=self._preload_modules, name="preload", daemon=True).start()
+
+    @staticmethod
+    def _preload_modules():
+        for name in PRELOAD_MODULES:
+            importlib.import_module(name)
+
+    def show_startup_report(self):
+        messagebox.showinfo("Startzeiten", self.startup_profile.report())
 
     def create_menu(self):
         """Erstellt das Hauptmenü"""
@@ -252,6 +1438,11 @@ class APITester(ttkb.Window):
         edit_menu = tk.Menu(menubar, tearoff=0)
         edit_menu.add_command(label="Headers verwalten", command=self.manage_headers)
         edit_menu.add_command(label="Environment Variables", command=self.manage_env_vars)
+        edit_menu.add_command(label="Einstellungen", command=self.manage_settings)
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Verbindungen zurücksetzen", command=self.reset_connections)
+        edit_menu.add_command(label="Cookies löschen", command=self.clear_cookies)
+        edit_menu.add_command(label="HTTP-Cache leeren", command=self.clear_cache)
         edit_menu.add_separator()
         edit_menu.add_command(label="History löschen", command=self.clear_history)
         menubar.add_cascade(label="Bearbeiten", menu=edit_menu)
@@ -261,6 +1452,10 @@ class APITester(ttkb.Window):
         tools_menu.add_command(label="JSON Formatter", command=self.format_json)
         tools_menu.add_command(label="Base64 Encoder/Decoder", command=self.base64_tool)
         tools_menu.add_command(label="URL Encoder/Decoder", command=self.url_encode_tool)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Mock Server", command=self.open_mock_server)
+        tools_menu.add_command(label="📼 Cassette starten…", command=self.start_cassette)
+        tools_menu.add_command(label="📼 Cassette beenden", command=self.stop_cassette)
         menubar.add_cascade(label="Tools", menu=tools_menu)
 
         # Themes-Menü
@@ -284,6 +1479,7 @@ class APITester(ttkb.Window):
         help_menu = tk.Menu(menubar, tearoff=0)
         help_menu.add_command(label="Über", command=self.show_about)
         help_menu.add_command(label="Tastenkürzel", command=self.show_shortcuts)
+        help_menu.add_command(label="Startzeiten", command=self.show_startup_report)
         menubar.add_cascade(label="Hilfe", menu=help_menu)
 
         self.config(menu=menubar)
@@ -342,6 +1538,9 @@ class APITester(ttkb.Window):
         ttkb.Button(
             coll_toolbar, text="🗑️", width=3, command=self.delete_collection_item, bootstyle="danger-outline"
         ).pack(side=LEFT, padx=2)
+        ttkb.Button(coll_toolbar, text="▶️", width=3, command=self.run_collection, bootstyle="primary-outline").pack(
+            side=LEFT, padx=2
+        )
 
         # Collections Treeview
         self.collections_tree = ttkb.Treeview(collections_frame, show="tree", height=15)
@@ -355,6 +1554,13 @@ class APITester(ttkb.Window):
         self.collection_menu.add_separator()
         self.collection_menu.add_command(label="✏️ Rename", command=self.rename_collection_item)
         self.collection_menu.add_command(label="🗑️ Delete", command=self.delete_collection_item)
+        self.collection_menu.add_separator()
+        self.collection_menu.add_command(label="▶️ Run", command=self.run_collection)
+        self.collection_menu.add_command(label="🎭 Mock-Antwort bearbeiten…", command=self.edit_mock_response)
+        self.sequential_var = tk.BooleanVar(value=False)
+        self.collection_menu.add_checkbutton(
+            label="⇅ Sequentiell ausführen", variable=self.sequential_var, command=self.toggle_sequential
+        )
         self.collections_tree.bind("<Button-3>", self.show_collection_menu)
 
         # History Tab
@@ -369,12 +1575,19 @@ class APITester(ttkb.Window):
         self.history_search.pack(fill=X)
         self.history_search.bind("<KeyRelease>", self.filter_history)
 
-        # History Liste
-        self.history_listbox = tk.Listbox(
-            history_frame, height=20, bg="#2b3e50", fg="white", selectbackground="#375a7f", font=("Consolas", 9)
+        # History Liste (virtualisiert, Einträge werden seitenweise aus der Datenbank geladen)
+        self.history_list = VirtualListbox(
+            history_frame,
+            fetch=self.history_store.get_many,
+            format_row=self._history_display,
+            height=20,
+            bg="#2b3e50",
+            fg="white",
+            selectbackground="#375a7f",
+            font=("Consolas", 9),
         )
-        self.history_listbox.pack(fill=BOTH, expand=True, padx=5, pady=5)
-        self.history_listbox.bind("<Double-1>", self.load_from_history)
+        self.history_list.pack(fill=BOTH, expand=True, padx=5, pady=5)
+        self.history_list.bind_row("<Double-1>", self.load_from_history)
 
         # History Context Menu
         self.history_menu = tk.Menu(self, tearoff=0)
@@ -382,7 +1595,7 @@ class APITester(ttkb.Window):
         self.history_menu.add_command(label="Save to Collection", command=self.save_history_to_collection)
         self.history_menu.add_separator()
         self.history_menu.add_command(label="Delete", command=self.delete_history_item)
-        self.history_listbox.bind("<Button-3>", self.show_history_menu)
+        self.history_list.bind_row("<Button-3>", self.show_history_menu)
 
     def create_request_area(self, parent):
         """Erstellt den Request-Bereich"""
@@ -414,6 +1627,12 @@ class APITester(ttkb.Window):
         self.send_btn = ttkb.Button(url_frame, text="🚀 Send", command=self.send_request, bootstyle="success", width=12)
         self.send_btn.pack(side=RIGHT, padx=(5, 0))
 
+        # Load Test Button
+        self.load_btn = ttkb.Button(
+            url_frame, text="📈 Load", command=self.toggle_load_test, bootstyle="info-outline", width=10
+        )
+        self.load_btn.pack(side=RIGHT, padx=(5, 0))
+
         # Request Notebook (Params, Headers, Body, Auth)
         self.request_notebook = ttkb.Notebook(request_frame)
         self.request_notebook.pack(fill=BOTH, expand=True, pady=10)
@@ -433,15 +1652,38 @@ class APITester(ttkb.Window):
         self.request_notebook.add(body_frame, text="📦 Body")
         self.create_body_tab(body_frame)
 
-        # Auth Tab
-        auth_frame = ttkb.Frame(self.request_notebook)
-        self.request_notebook.add(auth_frame, text="🔐 Auth")
-        self.create_auth_tab(auth_frame)
+        # Auth Tab (Inhalt beim ersten Öffnen oder Laden eines Requests mit Auth)
+        self.auth_type_var = tk.StringVar(value="none")
+        self.auth_tab = self._add_lazy_tab(self.request_notebook, "🔐 Auth", self.create_auth_tab)
+
+        # Extract Tab
+        extract_frame = ttkb.Frame(self.request_notebook)
+        self.request_notebook.add(extract_frame, text="🧲 Extract")
+        self.create_extract_tab(extract_frame)
 
         # Pre-Request Script Tab
-        script_frame = ttkb.Frame(self.request_notebook)
-        self.request_notebook.add(script_frame, text="📜 Pre-Request")
-        self.create_script_tab(script_frame)
+        self._add_lazy_tab(self.request_notebook, "📜 Pre-Request", self.create_script_tab)
+        self.request_notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+    def _add_lazy_tab(self, notebook, text, builder):
+        """Legt einen Tab an, dessen Inhalt builder(frame) erst beim ersten Öffnen baut"""
+        frame = ttkb.Frame(notebook)
+        notebook.add(frame, text=text)
+        self.lazy_tabs[str(frame)] = (frame, builder, text)
+        return frame
+
+    def _on_tab_changed(self, event):
+        self._build_tab(event.widget.select())
+
+    def _build_tab(self, frame):
+        """Baut einen verzögerten Tab (falls noch nicht geschehen)"""
+        entry = self.lazy_tabs.pop(str(frame), None)
+        if entry is None:
+            return
+        frame, builder, text = entry
+        start = time.perf_counter()
+        builder(frame)
+        self.startup_profile.record(f"Tab {text} (beim ersten Öffnen)", time.perf_counter() - start)
 
     def create_params_tab(self, parent):
         """Query Parameters Tab"""
@@ -524,10 +1766,49 @@ class APITester(ttkb.Window):
             type_frame, text="GraphQL", variable=self.body_type, value="graphql", command=self.on_body_type_change
         ).pack(side=LEFT, padx=5)
 
+        # Kompression: Accept-Encoding der Response und gzip für große Request-Bodies
+        compression_frame = ttkb.Frame(parent)
+        compression_frame.pack(fill=X, pady=(0, 5))
+
+        encodings = ["gzip", "deflate"] + [
+            name
+            for name, modules in OPTIONAL_ENCODINGS.items()
+            if any(importlib.util.find_spec(module) for module in modules)
+        ]
+        ttkb.Label(compression_frame, text="Accept-Encoding:").pack(side=LEFT, padx=5)
+        self.accept_encoding_var = tk.StringVar(value=ACCEPT_ENCODING_DEFAULT)
+        ttkb.Combobox(
+            compression_frame,
+            textvariable=self.accept_encoding_var,
+            values=[ACCEPT_ENCODING_DEFAULT, ", ".join(encodings), *encodings, "identity"],
+            width=24,
+        ).pack(side=LEFT, padx=5)
+
+        self.compress_body_var = tk.BooleanVar(value=False)
+        ttkb.Checkbutton(
+            compression_frame,
+            text="Body gzip-komprimiert senden (ab 1 KB)",
+            variable=self.compress_body_var,
+            bootstyle="round-toggle",
+        ).pack(side=LEFT, padx=15)
+
         # Body Content Container
         self.body_container = ttkb.Frame(parent)
         self.body_container.pack(fill=BOTH, expand=True, pady=5)
 
+        # Raw Body aus Datei statt Text (wird beim Senden gestreamt)
+        self.body_file_var = tk.StringVar()
+        self.body_file_frame = ttkb.Frame(self.body_container)
+        ttkb.Button(
+            self.body_file_frame, text="📄 Body aus Datei…", bootstyle="secondary-outline", command=self.choose_body_file
+        ).pack(side=LEFT, padx=5)
+        self.body_file_label = ttkb.Label(self.body_file_frame, text="", bootstyle="info")
+        self.body_file_label.pack(side=LEFT, padx=5)
+        self.body_file_clear_btn = ttkb.Button(
+            self.body_file_frame, text="✕", width=3, bootstyle="danger-link", command=lambda: self.set_body_file("")
+        )
+        self.body_file_frame.pack(fill=X, pady=(0, 5))
+
         # Raw Body Text
         self.body_text = scrolledtext.ScrolledText(
             self.body_container, font=("Consolas", 10), height=8, wrap=tk.WORD, bg="#1a1a2e", fg="#00ff00"
@@ -549,8 +1830,12 @@ class APITester(ttkb.Window):
         self.form_tree.column("value", width=250)
         self.form_tree.column("type", width=80)
 
-        ttkb.Button(self.form_tree_frame, text="➕ Add Field", command=self.add_form_field).pack(anchor=W, pady=5)
+        form_toolbar = ttkb.Frame(self.form_tree_frame)
+        form_toolbar.pack(fill=X, pady=5)
+        ttkb.Button(form_toolbar, text="➕ Add Field", command=self.add_form_field).pack(side=LEFT)
+        ttkb.Button(form_toolbar, text="📎 Add File", command=self.add_form_file).pack(side=LEFT, padx=5)
         self.form_tree.pack(fill=BOTH, expand=True)
+        self.form_tree.bind("<Double-1>", self.edit_form_field)
 
     def create_auth_tab(self, parent):
         """Authentication Tab"""
@@ -559,7 +1844,6 @@ class APITester(ttkb.Window):
 
         ttkb.Label(auth_type_frame, text="Auth Type:").pack(side=LEFT, padx=5)
 
-        self.auth_type_var = tk.StringVar(value="none")
         auth_types = ["none", "Basic Auth", "Bearer Token", "API Key", "OAuth 2.0"]
 
         self.auth_combo = ttkb.Combobox(
@@ -606,6 +1890,29 @@ class APITester(ttkb.Window):
         self.api_key_location.grid(row=2, column=1, padx=5, pady=5, sticky=W)
         self.api_key_location.current(0)
 
+        self.on_auth_type_change()
+
+    def create_extract_tab(self, parent):
+        """Extract Tab - Variablen aus der Response für Collection-Läufe"""
+        toolbar = ttkb.Frame(parent)
+        toolbar.pack(fill=X, pady=5)
+
+        ttkb.Button(toolbar, text="➕ Add Variable", command=self.add_extract_var, bootstyle="success-outline").pack(
+            side=LEFT
+        )
+        ttkb.Label(toolbar, text="Pfad: $.data.token, header:X-Token oder status").pack(side=LEFT, padx=10)
+
+        columns = ("variable", "path")
+        self.extract_tree = ttkb.Treeview(parent, columns=columns, show="headings", height=5)
+        self.extract_tree.heading("variable", text="Variable")
+        self.extract_tree.heading("path", text="Pfad")
+
+        self.extract_tree.column("variable", width=150)
+        self.extract_tree.column("path", width=350)
+
+        self.extract_tree.pack(fill=BOTH, expand=True, pady=5)
+        self.extract_tree.bind("<Double-1>", self.edit_extract_var)
+
     def create_script_tab(self, parent):
         """Pre-Request Script Tab"""
         info = ttkb.Label(parent, text="Pre-Request Script (JavaScript-ähnliche Syntax - zur Demo)")
@@ -637,6 +1944,18 @@ class APITester(ttkb.Window):
         self.size_label = ttkb.Label(status_frame, text="Size: --", font=("Consolas", 10))
         self.size_label.pack(side=LEFT, padx=10)
 
+        self.conn_label = ttkb.Label(status_frame, text="Conn: --", font=("Consolas", 10))
+        self.conn_label.pack(side=LEFT, padx=10)
+
+        self.cache_label = ttkb.Label(status_frame, text="Cache: --", font=("Consolas", 10))
+        self.cache_label.pack(side=LEFT, padx=10)
+
+        self.progress_label = ttkb.Label(status_frame, text="", font=("Consolas", 10))
+        self.progress_label.pack(side=LEFT, padx=10)
+
+        self.cassette_label = ttkb.Label(status_frame, text="", font=("Consolas", 10), bootstyle="danger")
+        self.cassette_label.pack(side=RIGHT, padx=10)
+
         # Response Notebook
         self.response_notebook = ttkb.Notebook(response_frame)
         self.response_notebook.pack(fill=BOTH, expand=True)
@@ -670,7 +1989,13 @@ class APITester(ttkb.Window):
             side=RIGHT, padx=5
         )
 
-        self.response_text = scrolledtext.ScrolledText(
+        # Sprung zu Zeile
+        self.goto_entry = ttkb.Entry(format_frame, width=8)
+        self.goto_entry.pack(side=RIGHT, padx=(0, 5))
+        self.goto_entry.bind("<Return>", self.goto_response_line)
+        ttkb.Label(format_frame, text="Zeile:").pack(side=RIGHT)
+
+        self.response_text = PagedTextView(
             body_resp_frame, font=("Consolas", 10), height=15, wrap=tk.WORD, bg="#1a1a2e", fg="#00ff00"
         )
         self.response_text.pack(fill=BOTH, expand=True, pady=5)
@@ -684,102 +2009,288 @@ class APITester(ttkb.Window):
         )
         self.response_headers_text.pack(fill=BOTH, expand=True, pady=5)
 
-        # Cookies Tab
-        cookies_frame = ttkb.Frame(self.response_notebook)
-        self.response_notebook.add(cookies_frame, text="🍪 Cookies")
-
-        self.cookies_text = scrolledtext.ScrolledText(
-            cookies_frame, font=("Consolas", 10), height=15, wrap=tk.WORD, bg="#1a1a2e", fg="#e0e0e0"
-        )
-        self.cookies_text.pack(fill=BOTH, expand=True, pady=5)
-
-        # Test Results Tab
-        tests_frame = ttkb.Frame(self.response_notebook)
-        self.response_notebook.add(tests_frame, text="✅ Tests")
-
-        self.tests_text = scrolledtext.ScrolledText(
-            tests_frame, font=("Consolas", 10), height=15, wrap=tk.WORD, bg="#1a1a2e", fg="#e0e0e0"
+        # Cookies und Test Results Tabs (Inhalt beim ersten Öffnen)
+        self.section_texts = {}
+        self._add_lazy_tab(self.response_notebook, "🍪 Cookies", lambda frame: self.create_section_tab(frame, "cookies"))
+        self._add_lazy_tab(self.response_notebook, "✅ Tests", lambda frame: self.create_section_tab(frame, "tests"))
+        self.response_notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+        # Timing Tab (Wasserfall)
+        timing_frame = ttkb.Frame(self.response_notebook)
+        self.response_notebook.add(timing_frame, text="⏱ Timing")
+
+        self.waterfall_timings = {}
+        self.waterfall_canvas = tk.Canvas(timing_frame, bg="#1a1a2e", highlightthickness=0, height=200)
+        self.waterfall_canvas.pack(fill=BOTH, expand=True, pady=5)
+        self.waterfall_canvas.bind("<Configure>", lambda e: self._draw_waterfall())
+
+    def create_section_tab(self, parent, kind):
+        """Textansicht für Cookies bzw. Tests der aktuellen Response"""
+        text = scrolledtext.ScrolledText(
+            parent, font=("Consolas", 10), height=15, wrap=tk.WORD, bg="#1a1a2e", fg="#e0e0e0"
         )
-        self.tests_text.pack(fill=BOTH, expand=True, pady=5)
+        text.pack(fill=BOTH, expand=True, pady=5)
+        text.insert("1.0", self.response_sections.get(kind, ""))
+        self.section_texts[kind] = text
 
     # ========================
     # Event Handlers & Methods
     # ========================
 
     def send_request(self):
-        """Sendet den HTTP Request"""
-        url = self.url_entry.get().strip()
-        if not url:
-            messagebox.showwarning("Warnung", "Bitte URL eingeben!")
+        """Sendet den HTTP Request (oder bricht den laufenden ab)"""
+        if self.active_request:
+            self.active_request.cancel()
             return
 
-        # Environment Variables ersetzen
-        url = self.replace_env_vars(url)
+        data = self.get_current_request_data()
+        if not data["url"].strip():
+            messagebox.showwarning("Warnung", "Bitte URL eingeben!")
+            return
 
-        # Query Parameters hinzufügen
-        params = self.get_query_params()
-        if params:
-            url = f"{url}?{urlencode(params)}"
+        from api_engine import prepare_request
 
-        method = self.method_var.get()
-        headers = self.get_request_headers()
-        body = self.get_request_body()
-        auth = self.get_auth()
+        try:
+            method, url, kwargs = prepare_request(data, self.env_vars)
+        except UnresolvedVariablesError as e:
+            self._show_error(str(e))
+            return
+        except json.JSONDecodeError as e:
+            self._show_error(f"JSON Parse Error: {str(e)}")
+            return
+        except OSError as e:
+            self._show_error(f"Datei nicht lesbar: {e}")
+            return
 
-        # UI Update
-        self.send_btn.config(state="disabled", text="⏳ Sending...")
+        # UI Update (noch laufendes Rendern der vorherigen Response verwerfen)
+        self.renderer.cancel()
+        self.send_btn.config(text="⏹ Cancel", bootstyle="danger")
         self.status_label.config(text="Status: Sending...", bootstyle="warning")
 
-        # Request in Thread ausführen
-        thread = threading.Thread(target=self._execute_request, args=(method, url, headers, body, auth))
-        thread.daemon = True
-        thread.start()
-
-    def _execute_request(self, method, url, headers, body, auth):
-        """Führt den Request aus (in separatem Thread)"""
-        start_time = time.time()
+        # Fortschritt wird vom Worker-Thread geschrieben und per Polling angezeigt
+        progress = {"bytes": 0, "total": None, "start": time.perf_counter(), "sent": 0, "upload_total": 0}
+        self.download_progress = progress
 
-        try:
-            kwargs = {"headers": headers, "timeout": 30, "verify": True}
+        def on_progress(done, total):
+            if not progress["bytes"]:
+                progress["download_start"] = time.perf_counter()
+            progress["bytes"] = done
+            progress["total"] = total
 
-            if auth:
-                kwargs["auth"] = auth
+        def on_upload_progress(sent, total):
+            progress["sent"] = sent
+            progress["upload_total"] = total
+            progress["upload_end"] = time.perf_counter()
 
-            if body and method in ["POST", "PUT", "PATCH"]:
-                body_type = self.body_type.get()
-                if body_type == "json":
-                    kwargs["json"] = json.loads(body) if isinstance(body, str) else body
-                elif body_type in ["form-data", "urlencoded"]:
-                    kwargs["data"] = body
-                else:
-                    kwargs["data"] = body
-
-            response = requests.request(method, url, **kwargs)
-            elapsed_time = time.time() - start_time
+        # Request auf der Engine ausführen
+        future = self.engine.submit(
+            self.engine.send_prepared(method, url, kwargs, progress=on_progress, upload_progress=on_upload_progress)
+        )
+        self.active_request = future
+        future.add_done_callback(lambda f: self.after(0, lambda: self._on_request_done(f, method, url, data)))
+        self._poll_download_progress(future)
 
-            self.current_response = response
+    def _poll_download_progress(self, future):
+        """Zeigt Bytes und Durchsatz des laufenden Up- bzw. Downloads an"""
+        if future is not self.active_request:
+            return
 
-            # UI Update im Main Thread
-            self.after(0, lambda: self._update_response_ui(response, elapsed_time))
+        progress = self.download_progress
+        if progress["bytes"]:
+            rate = progress["bytes"] / max(time.perf_counter() - progress["download_start"], 0.001)
+            text = f"⬇ {format_size(progress['bytes'])}"
+            if progress["total"]:
+                text += f" / {format_size(progress['total'])}"
+            self.progress_label.config(text=f"{text} @ {format_size(rate)}/s")
+        elif progress["sent"]:
+            rate = progress["sent"] / max(time.perf_counter() - progress["start"], 0.001)
+            text = f"⬆ {format_size(progress['sent'])} / {format_size(progress['upload_total'])}"
+            self.progress_label.config(text=f"{text} @ {format_size(rate)}/s")
+
+        self.after(100, self._poll_download_progress, future)
+
+    def _on_request_done(self, future, method, url, data=None):
+        """Verarbeitet das Ergebnis eines Requests (im Main Thread)"""
+        if future is self.active_request:
+            self.active_request = None
+            self.send_btn.config(text="🚀 Send", bootstyle="success")
+
+        if future.cancelled():
+            self._show_error("Request abgebrochen")
+            return
 
-            # History speichern
-            self.after(0, lambda: self._add_to_history(method, url, response.status_code, elapsed_time))
+        import requests
 
+        try:
+            response = future.result()
         except requests.exceptions.Timeout:
-            self.after(0, lambda: self._show_error("Timeout - Server antwortet nicht"))
+            self._show_error("Timeout - Server antwortet nicht")
+            return
         except requests.exceptions.ConnectionError as e:
-            error_msg = f"Verbindungsfehler: {str(e)}"
-            self.after(0, lambda msg=error_msg: self._show_error(msg))
-        except json.JSONDecodeError as e:
-            error_msg = f"JSON Parse Error: {str(e)}"
-            self.after(0, lambda msg=error_msg: self._show_error(msg))
+            self._show_error(f"Verbindungsfehler: {str(e)}")
+            return
         except Exception as e:
-            error_msg = f"Fehler: {str(e)}"
-            self.after(0, lambda msg=error_msg: self._show_error(msg))
+            self._show_error(f"Fehler: {str(e)}")
+            return
+
+        if self.current_response:
+            self.current_response.close()
+        self.current_response = response
+        text = f"⬇ {format_size(response.size / max(response.elapsed, 0.001))}/s"
+        progress = self.download_progress
+        if progress and progress["sent"]:
+            upload_time = max(progress["upload_end"] - progress["start"], 0.001)
+            text = f"⬆ {format_size(progress['sent'] / upload_time)}/s  {text}"
+        self.progress_label.config(text=text)
+        self._update_response_ui(response, response.elapsed, response.connection_reused)
+
+        # History speichern
+        self._add_to_history(method, url, response.status_code, response.elapsed, response.timings, data, response)
+
+    def toggle_load_test(self):
+        """Startet einen Load Test oder bricht den laufenden ab"""
+        if self.load_test:
+            self.load_test["stop"].set()
+            self.load_btn.config(state="disabled", text="⏳ Stopping...")
+            return
+
+        data = self.get_current_request_data()
+        if not data["url"].strip():
+            messagebox.showwarning("Warnung", "Bitte URL eingeben!")
+            return
+
+        from api_engine import AsyncEngine, prepare_request
+
+        try:
+            method, url, kwargs = prepare_request(data, self.env_vars)
+        except UnresolvedVariablesError as e:
+            messagebox.showerror("Fehler", str(e))
+            return
+        except json.JSONDecodeError as e:
+            messagebox.showerror("Fehler", f"JSON Parse Error: {e}")
+            return
+        except OSError as e:
+            messagebox.showerror("Fehler", f"Datei nicht lesbar: {e}")
+            return
+
+        dialog = LoadTestDialog(self)
+        self.wait_window(dialog)
+        if not dialog.result:
+            return
+        mode, amount, concurrency = dialog.result
+        stop_event = threading.Event()
+
+        # Eigene Engine mit einer Verbindung pro Worker
+        engine = AsyncEngine(concurrency=concurrency, session_manager=self._create_session_manager(concurrency))
+        if mode == "open":
+            from api_loadgen import LoadGenerator
+
+            generator = LoadGenerator(engine, method, url, kwargs, amount)
+            stats = generator.stats
+            engine.submit(generator.run(stop_event))
+        else:
+            stats = LoadTestStats(amount, concurrency)
+            engine.submit(self._execute_load_test(engine, method, url, kwargs, stats, stop_event))
+
+        self.load_test = {"stats": stats, "stop": stop_event, "engine": engine, "method": method, "url": url}
+        self.load_btn.config(text="⏹ Stop", bootstyle="danger-outline")
+
+        self._show_load_tab()
+        self._poll_load_test()
+
+    @staticmethod
+    async def _execute_load_test(engine, method, url, kwargs, stats, stop_event):
+        """Führt N Requests mit C Workern auf der Engine aus"""
+        import asyncio
+        import requests
+
+        issued = 0
+
+        async def worker():
+            nonlocal issued
+            while not stop_event.is_set() and issued < stats.iterations:
+                issued += 1
+                start_time = time.perf_counter()
+                try:
+                    response = await engine.send_prepared(method, url, kwargs)
+                    stats.record(response.elapsed, status_code=response.status_code)
+                except requests.exceptions.RequestException as e:
+                    stats.record(time.perf_counter() - start_time, error=type(e).__name__)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(stats.concurrency)))
         finally:
-            self.after(0, lambda: self.send_btn.config(state="normal", text="🚀 Send"))
+            stats.finish()
+
+    def _show_load_tab(self):
+        """Legt den Load-Tab im Response-Bereich an (einmalig) und wählt ihn aus"""
+        if not hasattr(self, "load_text"):
+            load_frame = ttkb.Frame(self.response_notebook)
+            self.response_notebook.add(load_frame, text="📈 Load")
+
+            self.load_text = scrolledtext.ScrolledText(
+                load_frame, font=("Consolas", 10), height=15, wrap=tk.WORD, bg="#1a1a2e", fg="#e0e0e0"
+            )
+            self.load_text.pack(fill=BOTH, expand=True, pady=5)
+            self.load_frame = load_frame
+
+        self.response_notebook.select(self.load_frame)
+
+    def _poll_load_test(self):
+        """Aktualisiert den Load-Tab, bis der Test beendet ist"""
+        load_test = self.load_test
+        if not load_test:
+            return
+
+        stats = load_test["stats"]
+        finished = stats.end_time is not None
+        if isinstance(stats, LoadTestStats):
+            self._render_load_report(load_test["method"], load_test["url"], stats.summary(), stats, finished)
+        else:
+            self._render_open_load_report(load_test["method"], load_test["url"], stats.summary(), finished)
 
-    def _update_response_ui(self, response, elapsed_time):
+        if finished:
+            self.load_test = None
+            load_test["engine"].close()
+            self.load_btn.config(state="normal", text="📈 Load", bootstyle="info-outline")
+        else:
+            self.after(250, self._poll_load_test)
+
+    def _render_load_report(self, method, url, summary, stats, finished):
+        state = "✅ Abgeschlossen" if finished else "⏳ Läuft..."
+        lines = [
+            f"📈 Load Test: {method} {url}",
+            f"Iterationen: {stats.iterations} | Concurrency: {stats.concurrency} | {state}",
+            "",
+            f"Fortschritt:  {summary['completed']} / {stats.iterations}",
+            f"Dauer:        {summary['duration']:.2f} s",
+            f"Durchsatz:    {summary['rps']:.1f} req/s",
+            f"Fehlerrate:   {summary['error_rate'] * 100:.1f} % ({summary['errors']})",
+            "",
+            "Latenz:",
+            f"  p50:  {summary['p50'] * 1000:.0f}ms",
+            f"  p90:  {summary['p90'] * 1000:.0f}ms",
+            f"  p99:  {summary['p99'] * 1000:.0f}ms",
+            f"  max:  {summary['max'] * 1000:.0f}ms",
+            "",
+            "Status Codes:",
+        ]
+        for status_code, count in sorted(summary["status_counts"].items()):
+            lines.append(f"  {status_code}: {count}")
+        for error, count in sorted(summary["error_counts"].items()):
+            lines.append(f"  ❌ {error}: {count}")
+
+        self.load_text.delete("1.0", tk.END)
+        self.load_text.insert("1.0", "\n".join(lines))
+
+    def _render_open_load_report(self, method, url, summary, finished):
+        from api_loadgen import format_report
+
+        state = "✅ Abgeschlossen" if finished else f"⏳ Läuft... Ziel {summary['target_rate']:.0f} req/s"
+        self.load_text.delete("1.0", tk.END)
+        self.load_text.insert("1.0", f"📈 Load Test (offenes Modell) | {state}\n\n{format_report(summary, method, url)}")
+
+    def _update_response_ui(self, response, elapsed_time, reused=False):
         """Aktualisiert die Response-Anzeige"""
         # Status
         status_code = response.status_code
@@ -799,103 +2310,231 @@ class APITester(ttkb.Window):
         # Time
         self.time_label.config(text=f"Time: {elapsed_time * 1000:.0f}ms")
 
-        # Size
-        size = len(response.content)
-        if size < 1024:
-            size_str = f"{size} B"
-        elif size < 1024 * 1024:
-            size_str = f"{size / 1024:.2f} KB"
+        # Size: dekodiert und tatsächlich übertragen
+        size_text = f"Size: {format_size(response.size)}"
+        if response.wire_size != response.size:
+            size_text += f" | Wire: {format_size(response.wire_size)}"
+            if response.size:
+                size_text += f" ({1 - response.wire_size / response.size:.0%} gespart)"
+        if response.decode_time:
+            size_text += f" | Dekomprimieren: {response.decode_time * 1000:.1f}ms"
+        self.size_label.config(text=size_text)
+
+        # Verbindung
+        if response.replayed:
+            self.conn_label.config(text="Conn: 📼 Cassette", bootstyle="secondary")
+        elif reused:
+            self.conn_label.config(text=f"Conn: ♻️ warm · {response.http_version}", bootstyle="success")
+        else:
+            self.conn_label.config(text=f"Conn: 🆕 neu · {response.http_version}", bootstyle="info")
+
+        # HTTP-Cache
+        if response.cache_status:
+            text, bootstyle = CACHE_LABELS[response.cache_status]
+            if response.bytes_saved:
+                text += f" ({format_size(response.bytes_saved)} gespart)"
+            self.cache_label.config(text=f"Cache: {text}", bootstyle=bootstyle)
         else:
-            size_str = f"{size / (1024 * 1024):.2f} MB"
-        self.size_label.config(text=f"Size: {size_str}")
+            self.cache_label.config(text="Cache: --", bootstyle="default")
 
         # Response Body
-        self.response_text.delete("1.0", tk.END)
-        try:
-            content_type = response.headers.get("Content-Type", "")
-            if "json" in content_type:
-                formatted = json.dumps(response.json(), indent=2, ensure_ascii=False)
-                self.response_text.insert("1.0", formatted)
-            elif "xml" in content_type:
-                try:
-                    dom = minidom.parseString(response.text)
-                    formatted = dom.toprettyxml(indent="  ")
-                    self.response_text.insert("1.0", formatted)
-                except:
-                    self.response_text.insert("1.0", response.text)
-            else:
-                self.response_text.insert("1.0", response.text)
-        except:
-            self.response_text.insert("1.0", response.text)
-
-        # Response Headers
-        self.response_headers_text.delete("1.0", tk.END)
-        headers_str = "\n".join([f"{k}: {v}" for k, v in response.headers.items()])
-        self.response_headers_text.insert("1.0", headers_str)
-
-        # Cookies
-        self.cookies_text.delete("1.0", tk.END)
-        cookies_str = "\n".join([f"{k}: {v}" for k, v in response.cookies.items()])
-        self.cookies_text.insert("1.0", cookies_str if cookies_str else "No cookies")
-
-        # Automatische Tests
-        self._run_automatic_tests(response, elapsed_time)
-
-    def _run_automatic_tests(self, response, elapsed_time):
-        """Führt automatische Tests durch"""
-        self.tests_text.delete("1.0", tk.END)
+        # Body, Headers, Cookies und Tests werden im Render-Worker aufbereitet
+        self.response_format.set("pretty")
+        self._show_body(response, elapsed_time)
+        self._draw_waterfall(response.timings)
 
-        tests = []
-
-        # Status Code Test
-        if response.status_code < 400:
-            tests.append("✅ Status Code is successful")
-        else:
-            tests.append(f"❌ Status Code {response.status_code} indicates error")
+    def _show_body(self, response, elapsed_time=None):
+        """Startet das Rendern des Bodys im gewählten Format (mit elapsed_time auch Headers, Cookies, Tests)"""
+        fmt = self.response_format.get()
+        preview_limit = self._preview_limit()
+        max_lines = self.settings["pretty_max_lines"]
+        self.response_text.clear()
+        if elapsed_time is not None:
+            self.response_sections.clear()
+            for widget in (self.response_headers_text, *self.section_texts.values()):
+                widget.delete("1.0", tk.END)
+
+        def job():
+            yield from self._render_body(response, fmt, preview_limit, max_lines)
+            if elapsed_time is None:
+                return
 
-        # Response Time Test
-        if elapsed_time < 1:
-            tests.append(f"✅ Response time ({elapsed_time * 1000:.0f}ms) is acceptable")
+            yield "headers", "\n".join(f"{k}: {v}" for k, v in response.headers.items())
+            cookies_str = "\n".join(f"{k}: {v}" for k, v in response.cookies.items())
+            yield "cookies", cookies_str if cookies_str else "No cookies"
+
+            from api_runner import run_checks
+
+            checks = run_checks(response, elapsed_time, max_json_size=preview_limit)
+            yield "tests", "\n".join(f"{CHECK_ICONS[status]} {message}" for status, message in checks)
+
+        self.render_generation = self.renderer.submit(job)
+        # Client-seitige Render-Zeit wird nur für die erste vollständige Anzeige gemessen
+        self.render_started = (response, time.perf_counter()) if elapsed_time is not None else None
+        if not self.render_polling:
+            self.render_polling = True
+            self._poll_render()
+
+    @staticmethod
+    def _render_body(response, fmt, preview_limit, max_lines):
+        """Erzeugt den Body-Text stückweise (läuft im Render-Worker)"""
+        slice_size = PagedTextView.SLICE_SIZE
+        if response.size <= preview_limit:
+            # Formatierungen sind in der Response zwischengespeichert, Umschalten parst nicht neu
+            text = response.render(fmt)
+            if fmt == "pretty" and response.format_error:
+                yield "body", f"⚠️ {response.format_error} - Rohtext wird angezeigt\n\n"
+            for pos in range(0, len(text), slice_size):
+                yield "body", text[pos : pos + slice_size]
+        elif fmt == "pretty" and ("json" in response.content_type or "xml" in response.content_type):
+            if "json" in response.content_type:
+                chunks = iter_pretty_json(response.iter_bytes(), max_lines=max_lines, encoding=response.encoding)
+            else:
+                chunks = iter_pretty_xml(response.iter_bytes(), max_lines=max_lines)
+            lines = 1
+            try:
+                for chunk in chunks:
+                    lines += chunk.count("\n")
+                    yield "body", chunk
+            except ValueError as e:
+                yield "body", f"\n\n… Formatierung abgebrochen: {e}"
+                return
+            if lines >= max_lines:
+                yield "body", f"\n\n… nach {max_lines} Zeilen gekürzt - 💾 Save speichert die vollständige Response"
         else:
-            tests.append(f"⚠️ Response time ({elapsed_time * 1000:.0f}ms) is slow")
+            yield "body", response.preview_text(preview_limit)
+            yield "body", (
+                f"\n\n… Vorschau: {format_size(preview_limit)} von {format_size(response.size)} "
+                "- 💾 Save speichert die vollständige Response"
+            )
 
-        # Content Type Test
-        content_type = response.headers.get("Content-Type", "")
-        if content_type:
-            tests.append(f"✅ Content-Type header present: {content_type}")
+    def _poll_render(self):
+        """Übernimmt fertige Render-Ergebnisse in die Widgets"""
+        targets = {"headers": self.response_headers_text, **self.section_texts}
+        # Pro Durchlauf nur eine begrenzte Menge übernehmen, damit die GUI bedienbar bleibt
+        for _ in range(32):
+            try:
+                generation, kind, data = self.renderer.results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.renderer.generation:
+                continue
+            if kind == "body":
+                self.response_text.append(data)
+            elif kind in ("headers", "cookies", "tests"):
+                # Merken für Tabs, die erst später gebaut werden
+                self.response_sections[kind] = data
+                if kind in targets:
+                    targets[kind].insert("1.0", data)
+            elif kind == "done":
+                self.render_generation = None
+                if data is not None:
+                    self.response_text.append(f"\n\n… Anzeige fehlgeschlagen: {data}")
+                if self.render_started:
+                    response, start = self.render_started
+                    self.render_started = None
+                    response.timings["render"] = time.perf_counter() - start
+                    self._draw_waterfall(response.timings)
+                    if response is self.current_response and self.current_history_id:
+                        self.history_store.update_timings(self.current_history_id, response.timings)
+
+        # Weiter pollen, solange der aktuelle Auftrag weder fertig noch abgebrochen ist
+        if self.render_generation is not None and self.render_generation == self.renderer.generation:
+            self.after(20, self._poll_render)
         else:
-            tests.append("⚠️ No Content-Type header")
+            self.render_polling = False
+
+    def _preview_limit(self):
+        return self.settings["preview_kb"] * 1024
+
+    def _exceeds_preview(self, response):
+        return response.size > self._preview_limit()
+
+    def _draw_waterfall(self, timings=None):
+        """Zeichnet die Phasen eines Requests als Wasserfall (ohne Argument: neu zeichnen)"""
+        if timings is not None:
+            self.waterfall_timings = timings
+        timings = self.waterfall_timings
+        canvas = self.waterfall_canvas
+        canvas.delete("all")
+        if not timings:
+            canvas.create_text(20, 20, text="Keine Timing-Daten", fill="#e0e0e0", anchor=W)
+            return
 
-        # JSON Validity Test
-        if "json" in content_type:
-            try:
-                response.json()
-                tests.append("✅ Response is valid JSON")
-            except:
-                tests.append("❌ Response is not valid JSON")
+        total = sum(timings.get(key, 0.0) for key, _, _ in WATERFALL_PHASES) or 0.001
+        label_width, value_width, row_height = 130, 90, 26
+        bar_width = max(canvas.winfo_width() - label_width - value_width - 20, 50)
+        offset = 0.0
+        for row, (key, label, color) in enumerate(WATERFALL_PHASES):
+            duration = timings.get(key, 0.0)
+            y = 15 + row * row_height
+            x = label_width + offset / total * bar_width
+            canvas.create_text(10, y + 8, text=label, fill="#e0e0e0", anchor=W)
+            canvas.create_rectangle(x, y, x + max(duration / total * bar_width, 1), y + 16, fill=color, width=0)
+            canvas.create_text(
+                label_width + bar_width + 10, y + 8, text=f"{duration * 1000:.1f}ms", fill="#e0e0e0", anchor=W
+            )
+            offset += duration
 
-        self.tests_text.insert("1.0", "\n".join(tests))
+        y = 15 + len(WATERFALL_PHASES) * row_height
+        canvas.create_text(10, y + 8, text=f"Gesamt: {total * 1000:.1f}ms", fill="#e0e0e0", anchor=W)
 
     def _show_error(self, message):
         """Zeigt Fehlermeldung an"""
         self.status_label.config(text=f"Status: Error", bootstyle="danger")
-        self.response_text.delete("1.0", tk.END)
-        self.response_text.insert("1.0", f"Error: {message}")
+        self.renderer.cancel()
+        self.response_text.set_text(f"Error: {message}")
+
+    def _add_to_history(self, method, url, status_code, elapsed_time, timings=None, request=None, response=None):
+        """Fügt Request zur History hinzu (wird im Hintergrund in die Datenbank geschrieben)"""
+        entry = self.history_store.add(
+            {
+                "method": method,
+                "url": url,
+                "status": status_code,
+                "time": elapsed_time,
+                "timings": dict(timings or {}),
+                "request": request or {},
+            },
+            response,
+        )
+        self.current_history_id = entry["id"]
 
-    def _add_to_history(self, method, url, status_code, elapsed_time):
-        """Fügt Request zur History hinzu"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        entry = {"timestamp": timestamp, "method": method, "url": url, "status": status_code, "time": elapsed_time}
-        self.history.insert(0, entry)
+        # Nur anzeigen, wenn kein Suchfilter aktiv ist
+        if not self.history_search.get().strip():
+            self.history_list.insert_first(entry)
 
-        # History UI aktualisieren
-        display = f"[{timestamp}] {method} {url[:50]}... → {status_code}"
-        self.history_listbox.insert(0, display)
+    @staticmethod
+    def _history_display(entry):
+        timestamp = datetime.fromtimestamp(entry["created"]).strftime("%d.%m. %H:%M:%S")
+        return f"[{timestamp}] {entry['method']} {entry['url'][:50]}... → {entry['status']}"
 
-        # Max 100 Einträge
-        if len(self.history) > 100:
-            self.history.pop()
-            self.history_listbox.delete(100)
+    def refresh_history(self):
+        """Sucht die passenden History-IDs im Hintergrund und zeigt sie an"""
+        text = self.history_search.get()
+
+        def job():
+            yield "ids", self.history_store.ids(text)
+
+        self.history_search_generation = self.history_worker.submit(job)
+        if not self.history_polling:
+            self.history_polling = True
+            self._poll_history_search()
+
+    def _poll_history_search(self):
+        while True:
+            try:
+                generation, kind, data = self.history_worker.results.get_nowait()
+            except queue.Empty:
+                self.after(20, self._poll_history_search)
+                return
+            if generation != self.history_search_generation:
+                continue
+            if kind == "ids":
+                self.history_list.set_ids(data)
+            elif kind == "done":
+                self.history_polling = False
+                return
 
     def get_query_params(self):
         """Holt Query Parameters aus dem Tree"""
@@ -903,7 +2542,7 @@ class APITester(ttkb.Window):
         for item in self.params_tree.get_children():
             values = self.params_tree.item(item)["values"]
             if values[0] == "✓" and values[1]:
-                params[values[1]] = self.replace_env_vars(str(values[2]))
+                params[values[1]] = str(values[2])
         return params
 
     def get_request_headers(self):
@@ -912,9 +2551,18 @@ class APITester(ttkb.Window):
         for item in self.headers_tree.get_children():
             values = self.headers_tree.item(item)["values"]
             if values[0] == "✓":
-                headers[values[1]] = self.replace_env_vars(str(values[2]))
+                headers[values[1]] = str(values[2])
         return headers
 
+    def get_extract_vars(self):
+        """Holt die Extract-Definitionen (Variable -> Pfad) aus dem Tree"""
+        extract = {}
+        for item in self.extract_tree.get_children():
+            values = self.extract_tree.item(item)["values"]
+            if values[0]:
+                extract[str(values[0])] = str(values[1])
+        return extract
+
     def get_request_body(self):
         """Holt den Request Body"""
         body_type = self.body_type.get()
@@ -922,38 +2570,32 @@ class APITester(ttkb.Window):
         if body_type == "none":
             return None
         elif body_type in ["json", "xml", "graphql"]:
-            return self.replace_env_vars(self.body_text.get("1.0", tk.END).strip())
+            return self.body_text.get("1.0", tk.END).strip()
         elif body_type in ["form-data", "urlencoded"]:
             data = {}
             for item in self.form_tree.get_children():
                 values = self.form_tree.item(item)["values"]
-                if values[0] == "✓":
-                    data[values[1]] = self.replace_env_vars(str(values[2]))
+                if values[0] == "✓" and values[3] != "file":
+                    data[values[1]] = str(values[2])
             return data
         return None
 
-    def get_auth(self):
-        """Holt Authentication Daten"""
-        auth_type = self.auth_type_var.get()
-
-        if auth_type == "Basic Auth":
-            username = self.auth_username.get()
-            password = self.auth_password.get()
-            return (username, password)
-        elif auth_type == "Bearer Token":
-            token = self.bearer_token.get()
-            # Bearer Token wird in Headers gesetzt
-            return None
-        elif auth_type == "API Key":
-            # API Key wird in Headers/Params gesetzt
-            return None
-        return None
+    def get_form_files(self):
+        """Datei-Felder des form-data Bodys ({Feld: Pfad})"""
+        if self.body_type.get() != "form-data":
+            return {}
+        files = {}
+        for item in self.form_tree.get_children():
+            values = self.form_tree.item(item)["values"]
+            if values[0] == "✓" and values[3] == "file":
+                files[str(values[1])] = str(values[2])
+        return files
 
     def replace_env_vars(self, text):
         """Ersetzt Environment Variables in Text"""
-        for var, value in self.env_vars.items():
-            text = text.replace(f"{{{{{var}}}}}", str(value))
-        return text
+        from api_templates import render_template
+
+        return render_template(text, self.env_vars)
 
     def refresh_headers_tree(self):
         """Aktualisiert Headers Tree"""
@@ -975,12 +2617,14 @@ class APITester(ttkb.Window):
         body_type = self.body_type.get()
 
         # Alle Body-Widgets verstecken
+        self.body_file_frame.pack_forget()
         self.body_text.pack_forget()
         self.form_tree_frame.pack_forget()
 
         if body_type in ["none"]:
             pass
         elif body_type in ["json", "xml", "graphql"]:
+            self.body_file_frame.pack(fill=X, pady=(0, 5))
             self.body_text.pack(fill=BOTH, expand=True)
             if body_type == "json" and not self.body_text.get("1.0", tk.END).strip():
                 self.body_text.insert("1.0", '{\n  "key": "value"\n}')
@@ -991,6 +2635,8 @@ class APITester(ttkb.Window):
 
     def on_auth_type_change(self, event=None):
         """Handler für Auth-Type-Änderung"""
+        if str(self.auth_tab) in self.lazy_tabs:
+            return  # Tab noch nicht gebaut, er zeigt beim Bauen den aktuellen Typ an
         auth_type = self.auth_type_var.get()
 
         # Alle Auth-Frames verstecken
@@ -1023,6 +2669,15 @@ class APITester(ttkb.Window):
             else:
                 EditDialog(self, self.params_tree, item[0], col)
 
+    def add_extract_var(self):
+        self.extract_tree.insert("", END, values=("variable", "$.id"))
+
+    def edit_extract_var(self, event):
+        item = self.extract_tree.selection()
+        if item:
+            col = self.extract_tree.identify_column(event.x)
+            EditDialog(self, self.extract_tree, item[0], col)
+
     def add_header(self):
         self.headers_tree.insert("", END, values=("✓", "Header-Name", "value"))
 
@@ -1040,6 +2695,51 @@ class APITester(ttkb.Window):
     def add_form_field(self):
         self.form_tree.insert("", END, values=("✓", "key", "value", "text"))
 
+    def add_form_file(self):
+        path = filedialog.askopenfilename(title="Datei für form-data")
+        if path:
+            self.form_tree.insert("", END, values=("✓", "file", path, "file"))
+
+    def edit_form_field(self, event):
+        item = self.form_tree.selection()
+        if item:
+            col = self.form_tree.identify_column(event.x)
+            values = list(self.form_tree.item(item[0])["values"])
+            if col == "#1":
+                values[0] = "" if values[0] == "✓" else "✓"
+                self.form_tree.item(item[0], values=values)
+            elif col == "#4":
+                values[3] = "text" if values[3] == "file" else "file"
+                self.form_tree.item(item[0], values=values)
+            elif col == "#3" and values[3] == "file":
+                path = filedialog.askopenfilename(title="Datei für form-data")
+                if path:
+                    values[2] = path
+                    self.form_tree.item(item[0], values=values)
+            else:
+                EditDialog(self, self.form_tree, item[0], col)
+
+    def choose_body_file(self):
+        path = filedialog.askopenfilename(title="Body aus Datei")
+        if path:
+            self.set_body_file(path)
+
+    def set_body_file(self, path):
+        """Setzt die Datei, deren Inhalt statt des Body-Texts gesendet wird ("" = Text senden)"""
+        self.body_file_var.set(path)
+        if not path:
+            self.body_file_label.config(text="")
+            self.body_file_clear_btn.pack_forget()
+            self.body_text.config(state="normal")
+            return
+        try:
+            size = format_size(os.path.getsize(path))
+        except OSError:
+            size = "nicht gefunden"
+        self.body_file_label.config(text=f"{os.path.basename(path)} ({size}) - wird statt des Texts gesendet")
+        self.body_file_clear_btn.pack(side=LEFT)
+        self.body_text.config(state="disabled")
+
     def show_common_headers(self):
         """Zeigt Common Headers Dialog"""
         common = {
@@ -1071,34 +2771,60 @@ class APITester(ttkb.Window):
         self.headers_tree.insert("", END, values=("✓", header, value))
 
     def filter_history(self, event=None):
-        """Filtert History nach Suchbegriff"""
-        search = self.history_search.get().lower()
-        self.history_listbox.delete(0, tk.END)
+        """Filtert die History nach Suchbegriff (verzögert, erst wenn die Eingabe kurz ruht)"""
+        if self.history_search_job:
+            self.after_cancel(self.history_search_job)
+        self.history_search_job = self.after(HISTORY_SEARCH_DELAY, self._run_history_search)
 
-        for entry in self.history:
-            display = f"[{entry['timestamp']}] {entry['method']} {entry['url'][:50]}... → {entry['status']}"
-            if search in display.lower():
-                self.history_listbox.insert(tk.END, display)
+    def _run_history_search(self):
+        self.history_search_job = None
+        self.refresh_history()
 
     def load_from_history(self, event=None):
         """Lädt Request aus History"""
-        selection = self.history_listbox.curselection()
-        if not selection:
+        entry_id = self.history_list.selected_id()
+        entries = self.history_store.get_many([entry_id]) if entry_id else []
+        if not entries:
             return
-
-        # Finde entsprechenden History-Eintrag
-        idx = selection[0]
-        if idx < len(self.history):
-            entry = self.history[idx]
+        entry = entries[0]
+
+        request = self.history_store.load_request(entry)
+        if request.pop("body_missing", False):
+            messagebox.showwarning(
+                "History",
+                "Der Request-Body dieses Eintrags wurde aus dem Speicherbudget der History verdrängt.\n"
+                "Der Request wird ohne Body geladen.",
+            )
+        if request:
+            self.load_request_data(request)
+        else:
+            # Einträge ohne Request-Daten: nur die (aufgelöste) URL und Methode
             self.url_entry.delete(0, tk.END)
             self.url_entry.insert(0, entry["url"])
             self.method_var.set(entry["method"])
 
+        response = self.history_store.load_response(entry)
+        if response is None:
+            # Body bereits verdrängt (oder Eintrag ohne Response): nur die Timings anzeigen
+            if entry.get("response_body"):
+                self.renderer.cancel()
+                self.response_text.set_text(
+                    "Der Response-Body dieses Eintrags wurde aus dem Speicherbudget der History verdrängt."
+                )
+            self._draw_waterfall(entry.get("timings", {}))
+            return
+        self.renderer.cancel()
+        if self.current_response:
+            self.current_response.close()
+        self.current_response = response
+        # Erneutes Rendern soll die gespeicherten Timings nicht überschreiben
+        self.current_history_id = None
+        self._update_response_ui(response, response.elapsed)
+
     def show_history_menu(self, event):
         """Zeigt Context Menu für History"""
         try:
-            self.history_listbox.selection_clear(0, tk.END)
-            self.history_listbox.selection_set(self.history_listbox.nearest(event.y))
+            self.history_list.select_at(event.y)
             self.history_menu.tk_popup(event.x_root, event.y_root)
         finally:
             self.history_menu.grab_release()
@@ -1108,8 +2834,7 @@ class APITester(ttkb.Window):
 
     def save_history_to_collection(self):
         """Speichert History-Eintrag in Collection"""
-        selection = self.history_listbox.curselection()
-        if not selection:
+        if self.history_list.selected_id() is None:
             return
 
         # Lade zuerst den History-Eintrag
@@ -1119,35 +2844,28 @@ class APITester(ttkb.Window):
 
     def delete_history_item(self):
         """Löscht History-Eintrag"""
-        selection = self.history_listbox.curselection()
-        if selection:
-            idx = selection[0]
-            self.history_listbox.delete(idx)
-            if idx < len(self.history):
-                self.history.pop(idx)
+        entry_id = self.history_list.selected_id()
+        if entry_id is not None:
+            self.history_store.delete(entry_id)
+            self.history_list.remove(entry_id)
 
     def format_response(self):
         """Formatiert Response basierend auf Auswahl"""
         if not self.current_response:
             return
 
-        fmt = self.response_format.get()
-        self.response_text.delete("1.0", tk.END)
+        self._show_body(self.current_response)
 
-        if fmt == "pretty":
-            try:
-                formatted = json.dumps(self.current_response.json(), indent=2, ensure_ascii=False)
-                self.response_text.insert("1.0", formatted)
-            except:
-                self.response_text.insert("1.0", self.current_response.text)
-        elif fmt == "raw":
-            self.response_text.insert("1.0", self.current_response.text)
-        else:
-            self.response_text.insert("1.0", self.current_response.text)
+    def goto_response_line(self, event=None):
+        """Springt im Response-Body zur eingegebenen Zeile"""
+        try:
+            self.response_text.goto_line(int(self.goto_entry.get()))
+        except ValueError:
+            pass
 
     def copy_response(self):
         """Kopiert Response in Zwischenablage"""
-        content = self.response_text.get("1.0", tk.END)
+        content = self.response_text.get_text()
         self.clipboard_clear()
         self.clipboard_append(content)
         messagebox.showinfo("Info", "Response in Zwischenablage kopiert!")
@@ -1158,8 +2876,15 @@ class APITester(ttkb.Window):
             defaultextension=".json", filetypes=[("JSON", "*.json"), ("Text", "*.txt"), ("All", "*.*")]
         )
         if filename:
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(self.response_text.get("1.0", tk.END))
+            # Bei gekürzter Vorschau den vollständigen Body direkt aus dem Download speichern
+            if self.current_response and self._exceeds_preview(self.current_response):
+                self.current_response.save(filename)
+            elif self.current_response:
+                with open(filename, "w", encoding="utf-8") as f:
+                    f.write(self.current_response.render(self.response_format.get()))
+            else:
+                with open(filename, "w", encoding="utf-8") as f:
+                    f.write(self.response_text.get_text())
             messagebox.showinfo("Info", f"Response gespeichert: {filename}")
 
     def search_response(self):
@@ -1172,26 +2897,15 @@ class APITester(ttkb.Window):
         search_entry = ttkb.Entry(search_dialog, width=40)
         search_entry.pack(pady=5)
 
-        def do_search():
-            term = search_entry.get()
-            content = self.response_text.get("1.0", tk.END)
-
-            # Tags zurücksetzen
-            self.response_text.tag_remove("highlight", "1.0", tk.END)
-
-            if term:
-                start = "1.0"
-                while True:
-                    pos = self.response_text.search(term, start, stopindex=tk.END)
-                    if not pos:
-                        break
-                    end = f"{pos}+{len(term)}c"
-                    self.response_text.tag_add("highlight", pos, end)
-                    start = end
+        result_label = ttkb.Label(search_dialog, text="")
 
-                self.response_text.tag_config("highlight", background="yellow", foreground="black")
+        def do_search():
+            line = self.response_text.find_next(search_entry.get())
+            result_label.config(text=f"Treffer in Zeile {line}" if line else "Nicht gefunden")
 
-        ttkb.Button(search_dialog, text="Suchen", command=do_search).pack(pady=5)
+        search_entry.bind("<Return>", lambda e: do_search())
+        ttkb.Button(search_dialog, text="Weitersuchen", command=do_search).pack(pady=5)
+        result_label.pack()
 
     # ========================
     # Menu Actions
@@ -1201,12 +2915,18 @@ class APITester(ttkb.Window):
         """Neuer Request"""
         self.url_entry.delete(0, tk.END)
         self.method_var.set("GET")
+        self.set_body_file("")
         self.body_text.delete("1.0", tk.END)
-        self.response_text.delete("1.0", tk.END)
+        self.renderer.cancel()
+        self.response_text.clear()
         self.response_headers_text.delete("1.0", tk.END)
         self.status_label.config(text="Status: --")
         self.time_label.config(text="Time: --")
         self.size_label.config(text="Size: --")
+        self.conn_label.config(text="Conn: --", bootstyle="default")
+        self.cache_label.config(text="Cache: --", bootstyle="default")
+        self.progress_label.config(text="")
+        self._draw_waterfall({})
 
     def import_request(self):
         """Importiert Request aus Datei"""
@@ -1303,7 +3023,12 @@ class APITester(ttkb.Window):
             "headers": self.get_request_headers(),
             "body": self.get_request_body(),
             "body_type": self.body_type.get(),
+            "body_file": self.body_file_var.get(),
+            "files": self.get_form_files(),
+            "accept_encoding": self._accept_encoding(),
+            "compress_body": self.compress_body_var.get(),
             "params": self.get_query_params(),
+            "extract": self.get_extract_vars(),
             "auth_type": self.auth_type_var.get(),
             "auth_data": {
                 "username": self.auth_username.get() if hasattr(self, "auth_username") else "",
@@ -1311,9 +3036,14 @@ class APITester(ttkb.Window):
                 "bearer_token": self.bearer_token.get() if hasattr(self, "bearer_token") else "",
                 "api_key_name": self.api_key_name.get() if hasattr(self, "api_key_name") else "",
                 "api_key_value": self.api_key_value.get() if hasattr(self, "api_key_value") else "",
+                "api_key_location": self.api_key_location.get() if hasattr(self, "api_key_location") else "Header",
             },
         }
 
+    def _accept_encoding(self):
+        value = self.accept_encoding_var.get().strip()
+        return "" if value == ACCEPT_ENCODING_DEFAULT else value
+
     def save_request_to_collection(self):
         """Speichert aktuellen Request in ausgewählte Collection/Folder"""
         selected = self.collections_tree.selection()
@@ -1397,8 +3127,7 @@ class APITester(ttkb.Window):
 
         # Request zum Tree hinzufügen
         method = request_data["method"]
-        method_colors = {"GET": "🟢", "POST": "🟡", "PUT": "🟠", "PATCH": "🟣", "DELETE": "🔴"}
-        color = method_colors.get(method, "⚪")
+        color = METHOD_ICONS.get(method, "⚪")
 
         request_node = self.collections_tree.insert(node_id, END, text=f"{color} {method} {name}")
 
@@ -1421,8 +3150,11 @@ class APITester(ttkb.Window):
         if item.get("type") != "request":
             return
 
-        data = item.get("data", {})
+        self.load_request_data(item.get("data", {}))
+        messagebox.showinfo("Geladen", f"Request geladen!")
 
+    def load_request_data(self, data):
+        """Überträgt Request-Daten (Format von get_current_request_data) in die Eingabefelder"""
         # URL laden
         self.url_entry.delete(0, tk.END)
         self.url_entry.insert(0, data.get("url", ""))
@@ -1433,14 +3165,32 @@ class APITester(ttkb.Window):
         # Body Type setzen
         self.body_type.set(data.get("body_type", "none"))
         self.on_body_type_change()
+        self.accept_encoding_var.set(data.get("accept_encoding") or ACCEPT_ENCODING_DEFAULT)
+        self.compress_body_var.set(bool(data.get("compress_body")))
 
         # Body laden
         body = data.get("body", "")
-        if body and isinstance(body, (dict, list)):
-            body = json.dumps(body, indent=2)
+        self.set_body_file("")
         self.body_text.delete("1.0", tk.END)
-        if body:
-            self.body_text.insert("1.0", str(body))
+        for item in self.form_tree.get_children():
+            self.form_tree.delete(item)
+        if data.get("body_type") in ["form-data", "urlencoded"] and isinstance(body, str) and body.startswith("{"):
+            # Aus der History kommen Formularfelder als JSON-Text zurück
+            try:
+                body = json.loads(body)
+            except json.JSONDecodeError:
+                pass
+        if data.get("body_type") in ["form-data", "urlencoded"] and isinstance(body, dict):
+            for key, value in body.items():
+                self.form_tree.insert("", END, values=("✓", key, value, "text"))
+            for key, path in (data.get("files") or {}).items():
+                self.form_tree.insert("", END, values=("✓", key, path, "file"))
+        else:
+            if body and isinstance(body, (dict, list)):
+                body = json.dumps(body, indent=2)
+            if body:
+                self.body_text.insert("1.0", str(body))
+            self.set_body_file(data.get("body_file", ""))
 
         # Headers laden
         headers = data.get("headers", {})
@@ -1456,9 +3206,19 @@ class APITester(ttkb.Window):
         for key, value in params.items():
             self.params_tree.insert("", END, values=("✓", key, value, ""))
 
-        # Auth laden
+        # Extract-Definitionen laden
+        for item in self.extract_tree.get_children():
+            self.extract_tree.delete(item)
+        for name, path in data.get("extract", {}).items():
+            self.extract_tree.insert("", END, values=(name, path))
+
+        # Auth laden (der Auth-Tab wird dafür nur gebaut, wenn der Request Auth verwendet)
         auth_type = data.get("auth_type", "none")
         self.auth_type_var.set(auth_type)
+        if auth_type != "none":
+            self._build_tab(self.auth_tab)
+        if str(self.auth_tab) in self.lazy_tabs:
+            return
         self.on_auth_type_change()
 
         auth_data = data.get("auth_data", {})
@@ -1471,16 +3231,184 @@ class APITester(ttkb.Window):
         if auth_data.get("bearer_token"):
             self.bearer_token.delete(0, tk.END)
             self.bearer_token.insert(0, auth_data["bearer_token"])
-
-        messagebox.showinfo("Geladen", f"Request geladen!")
+        if auth_data.get("api_key_name"):
+            self.api_key_name.delete(0, tk.END)
+            self.api_key_name.insert(0, auth_data["api_key_name"])
+        if auth_data.get("api_key_value"):
+            self.api_key_value.delete(0, tk.END)
+            self.api_key_value.insert(0, auth_data["api_key_value"])
+        if auth_data.get("api_key_location"):
+            self.api_key_location.set(auth_data["api_key_location"])
 
     def show_collection_menu(self, event):
         """Zeigt Context Menu für Collections"""
         item = self.collections_tree.identify_row(event.y)
         if item:
             self.collections_tree.selection_set(item)
+            self.sequential_var.set(self.collections.get(item, {}).get("sequential", False))
             self.collection_menu.tk_popup(event.x_root, event.y_root)
 
+    def toggle_sequential(self):
+        """Markiert Collection/Ordner für sequentielle Ausführung im Runner"""
+        selected = self.collections_tree.selection()
+        if not selected or selected[0] not in self.collections:
+            return
+        item = self.collections[selected[0]]
+        if item.get("type") == "request":
+            messagebox.showwarning("Warnung", "Nur Collections und Ordner können sequentiell laufen!")
+            self.sequential_var.set(False)
+            return
+        item["sequential"] = self.sequential_var.get()
+
+    def _collection_node_tree(self, node_id):
+        """Baut den verschachtelten Collection-Baum für den Runner"""
+        item = self.collections.get(node_id, {})
+        if item.get("type") == "request":
+            return {"name": item.get("name", "Request"), "type": "request", "data": item.get("data", {})}
+
+        name = item.get("name") or self.collections_tree.item(node_id)["text"][2:].strip()
+        return {
+            "name": name,
+            "type": item.get("type", "folder"),
+            "sequential": item.get("sequential", False),
+            "items": [self._collection_node_tree(child) for child in self.collections_tree.get_children(node_id)],
+        }
+
+    def _restore_collection_node(self, parent, node):
+        """Fügt einen gespeicherten Collection-Baum in den Tree ein"""
+        name = node.get("name", "")
+        if node.get("type") == "request":
+            method = node.get("data", {}).get("method", "GET")
+            node_id = self.collections_tree.insert(
+                parent, END, text=f"{METHOD_ICONS.get(method, '⚪')} {method} {name}"
+            )
+            self.collections[node_id] = {"name": name, "type": "request", "data": node.get("data", {})}
+            return
+
+        icon = "📁" if node.get("type") == "collection" else "📂"
+        node_id = self.collections_tree.insert(parent, END, text=f"{icon} {name}")
+        self.collections[node_id] = {
+            "name": name,
+            "type": node.get("type", "folder"),
+            "sequential": node.get("sequential", False),
+            "items": {},
+        }
+        for child in node.get("items", []):
+            self._restore_collection_node(node_id, child)
+
+    def run_collection(self):
+        """Öffnet den Collection Runner für die ausgewählte Collection/den Ordner"""
+        selected = self.collections_tree.selection()
+        if not selected:
+            messagebox.showwarning("Warnung", "Bitte Collection oder Ordner auswählen!")
+            return
+
+        node_id = selected[0]
+        # Bei einem Request wird der umgebende Ordner ausgeführt
+        if self.collections.get(node_id, {}).get("type") == "request":
+            node_id = self.collections_tree.parent(node_id)
+
+        from api_runner import collect_run_items
+
+        node = self._collection_node_tree(node_id)
+        if not collect_run_items(node):
+            messagebox.showwarning("Warnung", "Keine Requests zum Ausführen gefunden!")
+            return
+
+        from api_engine import HTTP2_AVAILABLE
+
+        CollectionRunnerWindow(
+            self, node, self.env_vars, self.settings["keep_alive"], self.cassette, self.settings["http2"] and HTTP2_AVAILABLE
+        )
+
+    def edit_mock_response(self):
+        """Bearbeitet die Beispiel-Antwort, die der Mock-Server für den Request liefert"""
+        selected = self.collections_tree.selection()
+        item = self.collections.get(selected[0], {}) if selected else {}
+        if item.get("type") != "request":
+            messagebox.showwarning("Warnung", "Bitte einen Request auswählen!")
+            return
+
+        data = item.setdefault("data", {})
+        mock = data.get("mock")
+        if mock is None:
+            from api_mock import DEFAULT_MOCK
+
+            mock = dict(DEFAULT_MOCK)
+            # Vorbelegung mit der aktuellen Response, falls sie zu diesem Request gehört
+            response = self.current_response
+            if response is not None and response.method == data.get("method") and response.size <= MOCK_BODY_LIMIT:
+                mock["status"] = response.status_code
+                mock["body"] = response.text
+                if response.content_type:
+                    mock["headers"] = {"Content-Type": response.content_type}
+
+        dialog = MockDialog(self, item.get("name", ""), mock)
+        self.wait_window(dialog)
+        if dialog.result is not None:
+            data["mock"] = dialog.result
+            if self.mock_window is not None and self.mock_window.winfo_exists():
+                self.mock_window.nodes = self._mock_nodes()
+
+    def _mock_nodes(self):
+        return [
+            self._collection_node_tree(node_id)
+            for node_id in self.collections_tree.get_children()
+            if node_id in self.collections
+        ]
+
+    def open_mock_server(self):
+        """Öffnet das Mock-Server-Fenster für alle gespeicherten Collections"""
+        if self.mock_window is not None and self.mock_window.winfo_exists():
+            self.mock_window.lift()
+            return
+        nodes = self._mock_nodes()
+        if not nodes:
+            messagebox.showwarning("Warnung", "Keine Collections vorhanden!")
+            return
+        self.mock_window = MockServerWindow(self, nodes)
+
+    def start_cassette(self):
+        """Startet Aufnahme oder Wiedergabe einer Cassette für alle folgenden Requests"""
+        dialog = CassetteDialog(self)
+        self.wait_window(dialog)
+        if dialog.result is None:
+            return
+        path, mode, match_on = dialog.result
+
+        from api_cassette import Cassette
+
+        try:
+            cassette = Cassette(path, mode, match_on)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Fehler", f"Cassette konnte nicht geöffnet werden:\n{e}")
+            return
+
+        self.stop_cassette(quiet=True)
+        self.cassette = cassette
+        if self._engine is not None:
+            self._engine.cassette = cassette
+        labels = {"record": "📼 REC", "replay": "📼 PLAY", "auto": "📼 PLAY+REC"}
+        self.cassette_label.config(text=f"{labels[mode]} {os.path.basename(path)}")
+
+    def stop_cassette(self, quiet=False):
+        """Beendet die aktive Cassette und speichert neue Aufnahmen"""
+        cassette = self.cassette
+        if cassette is None:
+            return
+        self.cassette = None
+        if self._engine is not None:
+            self._engine.cassette = None
+        self.cassette_label.config(text="")
+        try:
+            if cassette.dirty:
+                cassette.save()
+        except OSError as e:
+            messagebox.showerror("Fehler", f"Cassette konnte nicht gespeichert werden:\n{e}")
+            return
+        if not quiet:
+            messagebox.showinfo("Cassette", f"{os.path.basename(cassette.path)}: {cassette.summary()}")
+
     def delete_collection_item(self):
         """Löscht ausgewähltes Element aus Collection"""
         selected = self.collections_tree.selection()
@@ -1535,11 +3463,57 @@ class APITester(ttkb.Window):
         if dialog.result:
             self.env_vars = dialog.result
 
+    def manage_settings(self):
+        """Öffnet die Einstellungen"""
+        dialog = SettingsDialog(self, self.settings)
+        self.wait_window(dialog)
+        if dialog.result:
+            self.settings.update(dialog.result)
+            if self.settings["http2"]:
+                from api_engine import HTTP2_AVAILABLE, HTTP2_MISSING
+
+                if not HTTP2_AVAILABLE:
+                    messagebox.showwarning("HTTP/2", HTTP2_MISSING)
+                    self.settings["http2"] = False
+            # Eine noch nicht angelegte Engine übernimmt die Einstellungen beim Anlegen
+            if self._engine is not None:
+                self.session_manager.configure(
+                    self.settings["pool_size"], self.settings["keep_alive"], self.settings["http2"]
+                )
+                self._engine.cache = self._configure_cache()
+            self.history_store.configure(
+                self.settings["history_max_entries"],
+                self.settings["history_max_days"],
+                self.settings["history_body_mb"] * 1024 * 1024,
+            )
+
+    def reset_connections(self):
+        """Schließt alle gepoolten Verbindungen"""
+        if self._engine is not None:
+            self.session_manager.reset()
+        self.conn_label.config(text="Conn: --", bootstyle="default")
+        messagebox.showinfo("Info", "Alle Verbindungen wurden geschlossen!")
+
+    def clear_cookies(self):
+        """Leert den persistenten Cookie-Jar"""
+        if messagebox.askyesno("Bestätigung", "Alle gespeicherten Cookies löschen?") and self._engine is not None:
+            self.session_manager.clear_cookies()
+
+    def clear_cache(self):
+        """Verwirft alle Einträge des HTTP-Caches"""
+        if messagebox.askyesno("Bestätigung", "HTTP-Cache leeren?"):
+            if self.response_cache is None and os.path.isdir(CACHE_DIR):
+                from api_cache import ResponseCache
+
+                self.response_cache = ResponseCache(CACHE_DIR, self.settings["cache_mb"] * 1024 * 1024)
+            if self.response_cache is not None:
+                self.response_cache.clear()
+
     def clear_history(self):
         """Löscht gesamte History"""
         if messagebox.askyesno("Bestätigung", "Gesamte History löschen?"):
-            self.history.clear()
-            self.history_listbox.delete(0, tk.END)
+            self.history_store.clear()
+            self.history_list.set_ids([])
 
     def format_json(self):
         """JSON Formatter Tool"""
@@ -1582,6 +3556,8 @@ class APITester(ttkb.Window):
 
     def base64_tool(self):
         """Base64 Encoder/Decoder"""
+        import base64
+
         dialog = ttkb.Toplevel(self)
         dialog.title("Base64 Encoder/Decoder")
         dialog.geometry("500x400")
@@ -1679,27 +3655,50 @@ class APITester(ttkb.Window):
 
     def load_saved_data(self):
         """Lädt gespeicherte Daten"""
-        config_file = os.path.join(os.path.dirname(__file__), "api_tester_config.json")
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self.env_vars = data.get("env_vars", self.env_vars)
-                    self.headers = data.get("headers", self.headers)
-                    self.refresh_headers_tree()
-            except:
-                pass
+        try:
+            data = load_config()
+            self.env_vars = data.get("env_vars", self.env_vars)
+            self.headers = data.get("headers", self.headers)
+            self.settings.update(data.get("settings", {}))
+            self.refresh_headers_tree()
+            self.history_store.configure(
+                self.settings["history_max_entries"],
+                self.settings["history_max_days"],
+                self.settings["history_body_mb"] * 1024 * 1024,
+            )
+            for node in data.get("collections", []):
+                self._restore_collection_node("", node)
+        except:
+            pass
+        self.refresh_history()
 
     def save_data(self):
         """Speichert Daten"""
-        config_file = os.path.join(os.path.dirname(__file__), "api_tester_config.json")
-        data = {"env_vars": self.env_vars, "headers": self.headers}
-        with open(config_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        # Nur Collections aus dem Tree speichern (importierte Postman-Collections haben ein anderes Format)
+        collections = [
+            self._collection_node_tree(node_id)
+            for node_id in self.collections_tree.get_children()
+            if node_id in self.collections
+        ]
+        data = {
+            "env_vars": self.env_vars,
+            "headers": self.headers,
+            "settings": self.settings,
+            "collections": collections,
+        }
+        save_config(data)
 
     def destroy(self):
         """Cleanup beim Beenden"""
         self.save_data()
+        self.stop_cassette(quiet=True)
+        self.renderer.close()
+        self.history_worker.close()
+        if self._engine is not None:
+            self._engine.close()
+        if self.mock_window is not None and self.mock_window.winfo_exists():
+            self.mock_window.close()
+        self.history_store.close()
         super().destroy()
 
 
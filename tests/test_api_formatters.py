@@ -0,0 +1,100 @@
+"""Tests für die Streaming-JSON-Formatierung (python -m pytest)"""
+
+import json
+import time
+import unittest
+
+from api_formatters import OUTPUT_CHUNK_SIZE, iter_pretty_json
+
+
+def pretty(text, chunk_size=None, **kwargs):
+    data = text.encode("utf-8")
+    if chunk_size is None:
+        chunks = [data]
+    else:
+        chunks = [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)]
+    return "".join(iter_pretty_json(chunks, **kwargs))
+
+
+class PrettyJsonTest(unittest.TestCase):
+    VALID = [
+        "{}",
+        "[]",
+        '"text"',
+        "42",
+        " [ 1 , 2 ] ",
+        '{"a": {}, "b": [], "c": [{}]}',
+        '{"a": 1, "b": [true, false, null, -1.5e+3, 0, 0.25], "c": {"d": "x\\"y\\\\z \\u00e4 ü"}}',
+    ]
+
+    INVALID = [
+        '{"a"}',
+        '{"a", "b"}',
+        "{1: 2}",
+        '{"a": foo}',
+        '{"a"::1}',
+        "[nul]",
+        "[tru]",
+        "[1,]",
+        '{"a": 1,}',
+        "[1 2]",
+        '{"a": 1 "b": 2}',
+        "[01]",
+        "[+1]",
+        "[1.]",
+        "[.5]",
+        '["\\x"]',
+        '["\\u12"]',
+        '["a\x01"]',
+        "1 2",
+        "{}}",
+        "]",
+        '{"a": 1',
+        '"abc',
+        "[1, 'a']",
+    ]
+
+    def test_formats_like_json_dumps(self):
+        for text in self.VALID:
+            with self.subTest(text=text):
+                expected = json.dumps(json.loads(text), indent=2, ensure_ascii=False)
+                # json.dumps schreibt leere Container ebenfalls als {} bzw. [], Escapes bleiben bei uns roh
+                self.assertEqual(json.loads(pretty(text)), json.loads(text))
+                self.assertEqual(pretty(text).count("\n"), expected.count("\n"))
+
+    def test_chunk_boundaries(self):
+        # Jede mögliche Trennstelle: in Strings, Escapes, Literalen und Multibyte-Zeichen
+        for text in self.VALID:
+            expected = pretty(text)
+            for chunk_size in (1, 2, 3, 5, 7):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    self.assertEqual(pretty(text, chunk_size), expected)
+
+    def test_rejects_invalid_json(self):
+        for text in self.INVALID:
+            for chunk_size in (None, 1, 2):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    with self.assertRaises(ValueError):
+                        pretty(text, chunk_size)
+
+    def test_empty_body_gives_no_output(self):
+        self.assertEqual(pretty(""), "")
+        self.assertEqual(pretty(" \n"), "")
+
+    def test_max_lines(self):
+        text = json.dumps([[0, 1, 2]] * 5)
+        self.assertEqual(pretty(text, max_lines=4), "[\n  [\n    0,\n    1,")
+
+    def test_long_string_is_linear_and_streamed(self):
+        data = b'{"data": "' + b"A" * (8 << 20) + b'"}'
+        chunks = (data[i : i + 64 * 1024] for i in range(0, len(data), 64 * 1024))
+        start = time.perf_counter()
+        pieces = list(iter_pretty_json(chunks))
+        self.assertLess(time.perf_counter() - start, 5)
+        # Der String kommt stückweise heraus, der Render-Worker kann also zwischendurch abbrechen
+        self.assertGreater(len(pieces), (8 << 20) // OUTPUT_CHUNK_SIZE // 2)
+        self.assertEqual(len("".join(pieces)), len(data) + 4)
+
+
+if __name__ == "__main__":
+    unittest.main()